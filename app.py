@@ -1,435 +1,763 @@
 import dash
+import flask
 from dash import html, dcc, dash_table
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from functools import lru_cache
+import json
 import os
 
-# Cargar datos
-print("Cargando datos...")
-
-# Datos de mortalidad no fetal 2019
-df_mortality = pd.read_excel('Anexos/Anexo1.NoFetal2019_CE_15-03-23.xlsx')
-
-# Códigos de causas de muerte - ajustar según estructura real
-try:
-    df_codes = pd.read_excel('Anexos/Anexo2.CodigosDeMuerte_CE_15-03-23.xlsx')
-    print(f"Códigos de causas cargados: {len(df_codes)} registros")
-except Exception as e:
-    print(f"Error cargando códigos de causas: {e}")
-    df_codes = pd.DataFrame()  # DataFrame vacío como fallback
-
-# División político-administrativa
-df_divipola = pd.read_excel('Anexos/Divipola_CE_.xlsx')
-
-print("Datos cargados exitosamente")
-print(f"Registros de mortalidad: {len(df_mortality)}")
-print(f"Registros Divipola: {len(df_divipola)}")
-
-# Ajustar nombres de columnas en df_mortality
-df_mortality = df_mortality.rename(columns={
-    'COD_DEPARTAMENTO': 'COD_DPTO',
-    'COD_MUNICIPIO': 'COD_MUNIC',
-    'AO': 'ANO',
-    'COD_MUERTE': 'CAUSA_DEFUNCION'
-})
-
-# Renombrar columnas para consistencia
-df_divipola = df_divipola.rename(columns={
-    'COD_DEPARTAMENTO': 'COD_DPTO',
-    'DEPARTAMENTO': 'NOM_DPTO',
-    'COD_MUNICIPIO': 'COD_MUNIC',
-    'MUNICIPIO': 'NOM_MUNIC'
-})
-
-# Agregar columnas de nombres de departamento y municipio desde Divipola
-df_mortality = df_mortality.merge(df_divipola[['COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC']].drop_duplicates(),
-                                 left_on=['COD_DPTO', 'COD_MUNIC'],
-                                 right_on=['COD_DPTO', 'COD_MUNIC'],
-                                 how='left')
-
-# Manejar valores NaN en NOM_DPTO
-df_mortality['NOM_DPTO'] = df_mortality['NOM_DPTO'].fillna('Desconocido')
-df_mortality['NOM_MUNIC'] = df_mortality['NOM_MUNIC'].fillna('Desconocido')
-
-# Estilos CSS personalizados
-external_stylesheets = [
-    'https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css',
-    'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css'
-]
-
-# Crear aplicación Dash
-app = dash.Dash(__name__, title='Análisis de Mortalidad Colombia 2019',
+from mortality import api, config, figures, vendor
+from mortality.aggregates import SelectionAggregates
+from mortality.cause_table import parse_filter, parse_sort
+from mortality.cube import COUNT
+from mortality.dimensions import MUNICIPALITY_SLOTS, department_key, municipality_key
+from mortality.filters import ALL, canonical, normalize
+from mortality.geometry import align, feature_keys, geometry_version, load_geometry
+from mortality.labels import AGE_GROUPS, month_names
+from mortality.metrics import install as install_metrics, instrument
+from mortality.partitions import load_partitions
+from mortality.prerender import open_store
+from mortality.readiness import DataLoader, install as install_readiness
+from mortality.responses import install as install_responses
+from mortality.result_cache import create_cache, make_key
+
+# Bootstrap y Font Awesome se sirven desde assets/vendor/ (python -m mortality.vendor);
+# si no se han descargado, se usan los CDN
+external_stylesheets = vendor.stylesheets()
+if external_stylesheets:
+    print(f"Hojas de estilo desde CDN (falta assets/vendor/): {', '.join(external_stylesheets)}")
+
+# Crear aplicación Dash (el título con los años se completa al cargar los datos)
+app = dash.Dash(__name__, title='Análisis de Mortalidad Colombia',
                 external_stylesheets=external_stylesheets,
                 suppress_callback_exceptions=True)
 
+def load_data():
+    """Carga los anexos y prepara lo que depende de ellos: cachés, mapa, filtros y layout."""
+    global partitions, dataset, df_mortality, df_codes, df_divipola, cause_catalog, geography
+    global GEO_DEPARTAMENTOS, GEO_MUNICIPIOS, OUTPUT_VERSION, result_cache, prerendered
+    global YEARS, YEAR_SPAN, DEPARTAMENTOS, GRUPOS_EDAD, MAP_FIGURE, MAP_LOCATIONS, LAYOUT
+    global municipalities
+    # Cargar datos una sola vez por proceso (en el maestro de gunicorn si se
+    # usa --preload, ver gunicorn.conf.py). Cada año es una partición que se
+    # carga a demanda; al iniciar solo se carga el año por defecto.
+    partitions = load_partitions()
+    dataset = partitions.get(partitions.default_year)
+    df_mortality = dataset.mortality
+    df_codes = dataset.codes
+    df_divipola = dataset.divipola
+    cause_catalog = dataset.cause_catalog
+    geography = dataset.geography
+    # Búsqueda de municipios del filtro (Divipola, común a todos los años)
+    municipalities = partitions.reference.municipality_index
+
+    # Geometría simplificada del mapa (None si no hay GeoJSON en Anexos/geo, ver
+    # mortality/geometry.py). Las salidas del mapa dependen de ella, así que su
+    # versión forma parte de la versión de las salidas.
+    GEO_DEPARTAMENTOS = load_geometry('departamentos', config.MAP_DETAIL_DEPARTMENTS)
+    GEO_MUNICIPIOS = load_geometry('municipios', config.MAP_DETAIL_MUNICIPALITIES) if GEO_DEPARTAMENTOS else None
+    OUTPUT_VERSION = f'{partitions.version}-{geometry_version()}-{figures.FORMAT_VERSION}'
+
+    # Caché de resultados por combinación de filtros y versión de los datos
+    result_cache = create_cache(config.RESULT_CACHE, path=config.RESULT_CACHE_PATH,
+                                max_entries=config.RESULT_CACHE_MAX_ENTRIES,
+                                ttl=config.RESULT_CACHE_TTL)
+
+    # Salidas precalculadas para todas las combinaciones (si existen para estos datos)
+    prerendered = open_store(config.PRERENDER_PATH, OUTPUT_VERSION)
+
+    # Valores de los filtros del Panel de Control
+    YEARS = partitions.years
+    YEAR_SPAN = f'{YEARS[0]}–{YEARS[-1]}' if len(YEARS) > 1 else f'{YEARS[0]}'
+    DEPARTAMENTOS = sorted(dataset.cube.labels['NOM_DPTO'])
+    GRUPOS_EDAD = sorted(df_mortality['GRUPO_EDAD1'].dropna().unique())
+
+    MAP_FIGURE = map_figure()
+    # Códigos DIVIPOLA de cada capa, en el orden de las trazas del mapa
+    MAP_LOCATIONS = [feature_keys(layer) for layer in (GEO_DEPARTAMENTOS, GEO_MUNICIPIOS) if layer is not None]
+
+    app.title = f'Análisis de Mortalidad Colombia {YEAR_SPAN}'
+    LAYOUT = build_layout()
+
+# Valores fijos del filtro de sexo
+SEXOS = ['1', '2', '3']
+
+def filter_combinations():
+    """Todas las combinaciones (departamento, sexo, edad, año) del Panel de Control."""
+    return [(departamento, sexo, edad, year)
+            for year in YEARS
+            for departamento in ['all'] + list(DEPARTAMENTOS)
+            for sexo in ['all'] + SEXOS
+            for edad in ['all'] + list(GRUPOS_EDAD)]
+
+def map_figure():
+    """Figura inicial del mapa, con la geometría; los callbacks solo envían los conteos."""
+    if GEO_DEPARTAMENTOS is None:
+        return None
+    dept_keys = feature_keys(GEO_DEPARTAMENTOS)
+    fig = go.Figure(go.Choropleth(
+        geojson=GEO_DEPARTAMENTOS,
+        locations=dept_keys,
+        z=np.zeros(len(dept_keys), dtype=int),
+        text=pd.Series(geography.department_names(dept_keys)).fillna('Desconocido'),
+        hovertemplate='%{text}<br>Muertes: %{z:,}<extra></extra>',
+        colorscale='Reds',
+        colorbar_title='Muertes',
+        marker_line_width=0.5
+    ))
+    if GEO_MUNICIPIOS is not None:
+        munic_keys = feature_keys(GEO_MUNICIPIOS)
+        dpto, munic = np.divmod(munic_keys, MUNICIPALITY_SLOTS)
+        names = pd.Series(geography.municipality_names(dpto, munic)).fillna('Desconocido')
+        fig.add_trace(go.Choropleth(
+            geojson=GEO_MUNICIPIOS,
+            locations=munic_keys,
+            z=np.zeros(len(munic_keys), dtype=int),
+            text=names + ' (' + geography.municipality_departments(dpto, munic) + ')',
+            hovertemplate='%{text}<br>Muertes: %{z:,}<extra></extra>',
+            colorscale='Reds',
+            colorbar_title='Muertes',
+            marker_line_width=0.2,
+            visible=False
+        ))
+    fig.update_geos(fitbounds='locations', visible=False)
+    fig.update_layout(title='Distribución de Muertes por Departamento', margin={'l': 0, 'r': 0, 'b': 0})
+    return fig
+
+def client_config():
+    """Parámetros del callback en el navegador (assets/mortalidad.js)."""
+    from mortality.clientside import figure_style
+
+    return {
+        'url': app.get_relative_path('/data/cliente/'),
+        'default_year': partitions.default_year,
+        'map': MAP_FIGURE is not None,
+        'map_locations': [keys.tolist() for keys in MAP_LOCATIONS],
+        'style': figure_style(),
+    }
+
 # Layout organizado
-app.layout = html.Div([
-    # Header
-    html.Div([
+def build_layout():
+    """Layout del tablero (requiere los datos cargados)."""
+    return html.Div([
+        # Configuración del modo de filtros en el navegador (MORTALIDAD_CLIENTSIDE=1)
+        dcc.Store(id='cliente-config', data=client_config() if config.CLIENTSIDE else None),
+
+        # Header
         html.Div([
-            html.H1('📊 Análisis de Mortalidad en Colombia 2019', style={
-                'color': '#2c3e50',
-                'textAlign': 'center',
-                'marginBottom': '10px',
-                'fontSize': '2.8rem',
-                'fontWeight': 'bold'
-            }),
-            html.P('Basado en Datos Oficiales del DANE', style={
-                'color': '#7f8c8d',
-                'textAlign': 'center',
-                'fontSize': '1.2rem',
-                'marginBottom': '30px'
-            })
-        ], className='col-12')
-    ], className='row justify-content-center mb-5'),
-
-    # Panel de Control - Filtros Interactivos
-    html.Div([
+            html.Div([
+                html.H1(f'📊 Análisis de Mortalidad en Colombia {YEAR_SPAN}', style={
+                    'color': '#2c3e50',
+                    'textAlign': 'center',
+                    'marginBottom': '10px',
+                    'fontSize': '2.8rem',
+                    'fontWeight': 'bold'
+                }),
+                html.P('Basado en Datos Oficiales del DANE', style={
+                    'color': '#7f8c8d',
+                    'textAlign': 'center',
+                    'fontSize': '1.2rem',
+                    'marginBottom': '30px'
+                })
+            ], className='col-12')
+        ], className='row justify-content-center mb-5'),
+
+        # Panel de Control - Filtros Interactivos
         html.Div([
             html.Div([
-                html.H4('🎛️ Panel de Control', className='text-primary mb-4'),
                 html.Div([
+                    html.H4('🎛️ Panel de Control', className='text-primary mb-4'),
                     html.Div([
-                        html.Label('🏛️ Filtrar por Departamento:', className='form-label fw-bold'),
-                        dcc.Dropdown(
-                            id='departamento-filter',
-                            options=[{'label': '📍 Todos los Departamentos', 'value': 'all'}] +
-                                   [{'label': f'📍 {dept}', 'value': dept} for dept in sorted(df_mortality['NOM_DPTO'].dropna().unique())],
-                            value='all',
-                            className='mb-3',
-                            style={'fontSize': '14px'}
-                        ),
-                    ], className='col-md-4 mb-3'),
-                    html.Div([
-                        html.Label('👥 Filtrar por Sexo:', className='form-label fw-bold'),
-                        dcc.Dropdown(
-                            id='sexo-filter',
-                            options=[
-                                {'label': '👥 Todos los Sexos', 'value': 'all'},
-                                {'label': '👨 Masculino', 'value': '1'},
-                                {'label': '👩 Femenino', 'value': '2'},
-                                {'label': '⚧ Indeterminado', 'value': '3'}
-                            ],
-                            value='all',
-                            className='mb-3',
-                            style={'fontSize': '14px'}
-                        ),
-                    ], className='col-md-4 mb-3'),
-                    html.Div([
-                        html.Label([
-                            '🎂 Filtrar por Grupo de Edad:',
-                            html.I(className="fas fa-info-circle ml-2", id="edad-tooltip",
-                                   style={'cursor': 'pointer', 'color': '#007bff'})
-                        ], className='form-label fw-bold d-flex align-items-center'),
-                        dcc.Dropdown(
-                            id='edad-filter',
-                            options=[{'label': '🎂 Todos los Grupos', 'value': 'all'}] +
-                                   [{'label': f'🎂 {grupo}', 'value': grupo} for grupo in sorted(df_mortality['GRUPO_EDAD1'].dropna().unique())],
-                            value='all',
-                            className='mb-3',
-                            style={'fontSize': '14px'}
-                        ),
-                        html.Div(id="tooltip-modal", children=[
-                            html.Div([
+                        html.Div([
+                            html.Label('📅 Año:', className='form-label fw-bold'),
+                            dcc.Dropdown(
+                                id='anio-filter',
+                                options=[{'label': f'📅 {year}', 'value': year} for year in YEARS],
+                                value=partitions.default_year,
+                                clearable=False,
+                                className='mb-3',
+                                style={'fontSize': '14px'}
+                            ),
+                        ], className='col-md-3 mb-3'),
+                        html.Div([
+                            html.Label('🏛️ Filtrar por Departamento:', className='form-label fw-bold'),
+                            dcc.Dropdown(
+                                id='departamento-filter',
+                                options=[{'label': f'📍 {dept}', 'value': dept} for dept in DEPARTAMENTOS],
+                                value=[],
+                                multi=True,
+                                placeholder='📍 Todos los Departamentos',
+                                className='mb-3',
+                                style={'fontSize': '14px'}
+                            ),
+                        ], className='col-md-3 mb-3'),
+                        # Municipios: opciones a demanda según lo que se escribe (municipality_options)
+                        html.Div([
+                            html.Label('🏘️ Filtrar por Municipio:', className='form-label fw-bold'),
+                            dcc.Dropdown(
+                                id='municipio-filter',
+                                options=[],
+                                value=[],
+                                multi=True,
+                                placeholder='🏘️ Escriba para buscar un municipio',
+                                className='mb-3',
+                                style={'fontSize': '14px'}
+                            ),
+                        ], className='col-md-3 mb-3', style={'display': 'none'} if config.CLIENTSIDE else {}),
+                        html.Div([
+                            html.Label('👥 Filtrar por Sexo:', className='form-label fw-bold'),
+                            dcc.Dropdown(
+                                id='sexo-filter',
+                                options=[
+                                    {'label': '👨 Masculino', 'value': '1'},
+                                    {'label': '👩 Femenino', 'value': '2'},
+                                    {'label': '⚧ Indeterminado', 'value': '3'}
+                                ],
+                                value=[],
+                                multi=True,
+                                placeholder='👥 Todos los Sexos',
+                                className='mb-3',
+                                style={'fontSize': '14px'}
+                            ),
+                        ], className='col-md-3 mb-3'),
+                        html.Div([
+                            html.Label([
+                                '🎂 Filtrar por Grupo de Edad:',
+                                html.I(className="fas fa-info-circle ml-2", id="edad-tooltip",
+                                       style={'cursor': 'pointer', 'color': '#007bff'})
+                            ], className='form-label fw-bold d-flex align-items-center'),
+                            dcc.Dropdown(
+                                id='edad-filter',
+                                options=[{'label': f'🎂 {grupo}', 'value': grupo} for grupo in GRUPOS_EDAD],
+                                value=[],
+                                multi=True,
+                                placeholder='🎂 Todos los Grupos',
+                                className='mb-3',
+                                style={'fontSize': '14px'}
+                            ),
+                            html.Div(id="tooltip-modal", children=[
                                 html.Div([
-                                    html.Button("×", id="close-tooltip", style={
-                                        'position': 'absolute',
-                                        'top': '10px',
-                                        'right': '15px',
-                                        'background': 'none',
-                                        'border': 'none',
-                                        'fontSize': '24px',
-                                        'cursor': 'pointer',
-                                        'color': '#666',
-                                        'zIndex': '1001'
-                                    }),
-                                    html.H5("Referencia de Grupos de Edad", style={
-                                        'marginBottom': '20px',
-                                        'color': '#333',
-                                        'textAlign': 'center'
-                                    }),
-                                    html.Table([
-                                        html.Tr([html.Th("Código"), html.Th("Categoría"), html.Th("Rango de Edad")]),
-                                        html.Tr([html.Td("0-4"), html.Td("Mortalidad neonatal"), html.Td("Menor de 1 mes")]),
-                                        html.Tr([html.Td("5-6"), html.Td("Mortalidad infantil"), html.Td("1 a 11 meses")]),
-                                        html.Tr([html.Td("7-8"), html.Td("Primera infancia"), html.Td("1 a 4 años")]),
-                                        html.Tr([html.Td("9-10"), html.Td("Niñez"), html.Td("5 a 14 años")]),
-                                        html.Tr([html.Td("11"), html.Td("Adolescencia"), html.Td("15 a 19 años")]),
-                                        html.Tr([html.Td("12-13"), html.Td("Juventud"), html.Td("20 a 29 años")]),
-                                        html.Tr([html.Td("14-16"), html.Td("Adultez temprana"), html.Td("30 a 44 años")]),
-                                        html.Tr([html.Td("17-19"), html.Td("Adultez intermedia"), html.Td("45 a 59 años")]),
-                                        html.Tr([html.Td("20-24"), html.Td("Vejez"), html.Td("60 a 84 años")]),
-                                        html.Tr([html.Td("25-28"), html.Td("Longevidad/Centenarios"), html.Td("85 a 100+ años")]),
-                                        html.Tr([html.Td("29"), html.Td("Edad desconocida"), html.Td("Sin información")]),
-                                    ], className="table table-sm table-bordered", style={'fontSize': '14px'})
+                                    html.Div([
+                                        html.Button("×", id="close-tooltip", style={
+                                            'position': 'absolute',
+                                            'top': '10px',
+                                            'right': '15px',
+                                            'background': 'none',
+                                            'border': 'none',
+                                            'fontSize': '24px',
+                                            'cursor': 'pointer',
+                                            'color': '#666',
+                                            'zIndex': '1001'
+                                        }),
+                                        html.H5("Referencia de Grupos de Edad", style={
+                                            'marginBottom': '20px',
+                                            'color': '#333',
+                                            'textAlign': 'center'
+                                        }),
+                                        html.Table([
+                                            html.Tr([html.Th("Código"), html.Th("Categoría"), html.Th("Rango de Edad")]),
+                                            html.Tr([html.Td("0-4"), html.Td("Mortalidad neonatal"), html.Td("Menor de 1 mes")]),
+                                            html.Tr([html.Td("5-6"), html.Td("Mortalidad infantil"), html.Td("1 a 11 meses")]),
+                                            html.Tr([html.Td("7-8"), html.Td("Primera infancia"), html.Td("1 a 4 años")]),
+                                            html.Tr([html.Td("9-10"), html.Td("Niñez"), html.Td("5 a 14 años")]),
+                                            html.Tr([html.Td("11"), html.Td("Adolescencia"), html.Td("15 a 19 años")]),
+                                            html.Tr([html.Td("12-13"), html.Td("Juventud"), html.Td("20 a 29 años")]),
+                                            html.Tr([html.Td("14-16"), html.Td("Adultez temprana"), html.Td("30 a 44 años")]),
+                                            html.Tr([html.Td("17-19"), html.Td("Adultez intermedia"), html.Td("45 a 59 años")]),
+                                            html.Tr([html.Td("20-24"), html.Td("Vejez"), html.Td("60 a 84 años")]),
+                                            html.Tr([html.Td("25-28"), html.Td("Longevidad/Centenarios"), html.Td("85 a 100+ años")]),
+                                            html.Tr([html.Td("29"), html.Td("Edad desconocida"), html.Td("Sin información")]),
+                                        ], className="table table-sm table-bordered", style={'fontSize': '14px'})
+                                    ], style={
+                                        'backgroundColor': 'white',
+                                        'padding': '25px',
+                                        'borderRadius': '10px',
+                                        'boxShadow': '0 8px 25px rgba(0,0,0,0.3)',
+                                        'maxWidth': '600px',
+                                        'width': '100%',
+                                        'position': 'relative'
+                                    })
                                 ], style={
-                                    'backgroundColor': 'white',
-                                    'padding': '25px',
-                                    'borderRadius': '10px',
-                                    'boxShadow': '0 8px 25px rgba(0,0,0,0.3)',
-                                    'maxWidth': '600px',
+                                    'position': 'fixed',
+                                    'top': '0',
+                                    'left': '0',
                                     'width': '100%',
-                                    'position': 'relative'
-                                })
-                            ], style={
-                                'position': 'fixed',
-                                'top': '0',
-                                'left': '0',
-                                'width': '100%',
-                                'height': '100%',
-                                'backgroundColor': 'rgba(0,0,0,0.5)',
-                                'display': 'flex',
-                                'justifyContent': 'center',
-                                'alignItems': 'center',
-                                'zIndex': '1000'
-                            }, id="tooltip-overlay")
-                        ], style={'display': 'none'})
-                    ], className='col-md-4 mb-3'),
-                ], className='row')
-            ], className='card-body')
-        ], className='card shadow-sm mb-5')
-    ], className='container-fluid mb-5'),
-
-    # Métricas Principales
-    html.Div([
+                                    'height': '100%',
+                                    'backgroundColor': 'rgba(0,0,0,0.5)',
+                                    'display': 'flex',
+                                    'justifyContent': 'center',
+                                    'alignItems': 'center',
+                                    'zIndex': '1000'
+                                }, id="tooltip-overlay")
+                            ], style={'display': 'none'})
+                        ], className='col-md-3 mb-3'),
+                    ], className='row')
+                ], className='card-body')
+            ], className='card shadow-sm mb-5')
+        ], className='container-fluid mb-5'),
+
+        # Métricas Principales
         html.Div([
             html.Div([
                 html.Div([
-                    html.I(className="fas fa-skull-crossbones fa-3x", style={'color': '#ffffff'}),
-                    html.H2(id='total-muertes', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
-                    html.P('Total de Muertes', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
-                ], className='text-center p-4')
-            ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #2c3e50 0%, #34495e 100%)'})
-        ], className='col-md-3 mb-4'),
-        html.Div([
+                    html.Div([
+                        html.I(className="fas fa-skull-crossbones fa-3x", style={'color': '#ffffff'}),
+                        html.H2(id='total-muertes', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
+                        html.P('Total de Muertes', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
+                    ], className='text-center p-4')
+                ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #2c3e50 0%, #34495e 100%)'})
+            ], className='col-md-3 mb-4'),
             html.Div([
                 html.Div([
-                    html.I(className="fas fa-mars fa-3x", style={'color': '#ffffff'}),
-                    html.H2(id='muertes-hombres', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
-                    html.P('Muertes Masculinas', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
-                ], className='text-center p-4')
-            ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #3498db 0%, #2980b9 100%)'})
-        ], className='col-md-3 mb-4'),
-        html.Div([
+                    html.Div([
+                        html.I(className="fas fa-mars fa-3x", style={'color': '#ffffff'}),
+                        html.H2(id='muertes-hombres', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
+                        html.P('Muertes Masculinas', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
+                    ], className='text-center p-4')
+                ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #3498db 0%, #2980b9 100%)'})
+            ], className='col-md-3 mb-4'),
             html.Div([
                 html.Div([
-                    html.I(className="fas fa-venus fa-3x", style={'color': '#ffffff'}),
-                    html.H2(id='muertes-mujeres', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
-                    html.P('Muertes Femeninas', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
-                ], className='text-center p-4')
-            ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #e84393 0%, #c0392b 100%)'})
-        ], className='col-md-3 mb-4'),
-        html.Div([
+                    html.Div([
+                        html.I(className="fas fa-venus fa-3x", style={'color': '#ffffff'}),
+                        html.H2(id='muertes-mujeres', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
+                        html.P('Muertes Femeninas', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
+                    ], className='text-center p-4')
+                ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #e84393 0%, #c0392b 100%)'})
+            ], className='col-md-3 mb-4'),
             html.Div([
                 html.Div([
-                    html.I(className="fas fa-city fa-3x", style={'color': '#ffffff'}),
-                    html.H2(id='deptos-afectados', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
-                    html.P('Departamentos', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
-                ], className='text-center p-4')
-            ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #00b894 0%, #27ae60 100%)'})
-        ], className='col-md-3 mb-4')
-    ], className='row justify-content-center mb-5'),
-    html.Div([
-        html.P('*Los datos se actualizan automáticamente según los filtros aplicados', className='text-muted mt-2 small')
-    ], className='container-fluid'),
-
-    # Sección 1: Distribución Geográfica
-    html.Div([
+                    html.Div([
+                        html.I(className="fas fa-city fa-3x", style={'color': '#ffffff'}),
+                        html.H2(id='deptos-afectados', style={'color': '#ffffff', 'margin': '15px 0 5px 0', 'fontSize': '2.5rem', 'fontWeight': 'bold'}),
+                        html.P('Departamentos', style={'color': '#ffffff', 'margin': '0', 'fontSize': '1rem', 'fontWeight': '500'})
+                    ], className='text-center p-4')
+                ], className='card h-100 shadow-sm border-0', style={'background': 'linear-gradient(135deg, #00b894 0%, #27ae60 100%)'})
+            ], className='col-md-3 mb-4')
+        ], className='row justify-content-center mb-5'),
         html.Div([
-            html.H3('📍 Distribución Geográfica de la Mortalidad', className='text-center text-primary mb-4'),
-            html.Div([
-                html.Div([
-                    dcc.Graph(
-                        id='mapa-departamentos',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '500px'}
-                    )
-                ], className='card shadow-sm'),
-            ], className='col-12')
-        ], className='row mb-5')
-    ], className='container-fluid'),
+            html.P('*Los datos se actualizan automáticamente según los filtros aplicados', className='text-muted mt-2 small')
+        ], className='container-fluid'),
 
-    # Sección 2: Análisis Temporal
-    html.Div([
+        # Sección 1: Distribución Geográfica
         html.Div([
-            html.H3('📈 Análisis Temporal', className='text-center text-success mb-4'),
             html.Div([
+                html.H3('📍 Distribución Geográfica de la Mortalidad', className='text-center text-primary mb-4'),
                 html.Div([
-                    html.H5('Tendencia Mensual de Muertes', className='card-title text-center'),
-                    dcc.Graph(
-                        id='lineas-meses',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '400px'}
-                    )
-                ], className='card shadow-sm p-3 mb-4')
-            ], className='col-12')
-        ], className='row mb-5')
-    ], className='container-fluid'),
-
-    # Sección 3: Análisis de Violencia
-    html.Div([
+                    html.Div([
+                        dcc.RadioItems(
+                            id='mapa-nivel',
+                            options=[
+                                {'label': ' Departamentos', 'value': 'departamentos'},
+                                {'label': ' Municipios', 'value': 'municipios', 'disabled': GEO_MUNICIPIOS is None},
+                            ],
+                            value='departamentos',
+                            inline=True,
+                            inputStyle={'marginLeft': '15px'},
+                            className='pt-2 pl-2',
+                            style={'display': 'block' if MAP_FIGURE is not None else 'none'}
+                        ),
+                        dcc.Graph(
+                            id='mapa-departamentos',
+                            figure=MAP_FIGURE if MAP_FIGURE is not None else figures.department_bars(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '500px'}
+                        )
+                    ], className='card shadow-sm'),
+                ], className='col-12')
+            ], className='row mb-5')
+        ], className='container-fluid'),
+
+        # Sección 2: Análisis Temporal
         html.Div([
-            html.H3('🔪 Análisis de Violencia y Seguridad', className='text-center text-danger mb-4'),
             html.Div([
+                html.H3('📈 Análisis Temporal', className='text-center text-success mb-4'),
                 html.Div([
-                    html.H5('Ciudades Más Violentas (Homicidios)', className='card-title text-center'),
-                    dcc.Graph(
-                        id='barras-violentas',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '400px'}
-                    )
-                ], className='card shadow-sm p-3 mb-4')
-            ], className='col-md-6'),
+                    html.Div([
+                        html.H5('Tendencia Mensual de Muertes', className='card-title text-center'),
+                        dcc.Graph(
+                            id='lineas-meses',
+                            figure=figures.monthly_line(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '400px'}
+                        )
+                    ], className='card shadow-sm p-3 mb-4')
+                ], className='col-12')
+            ], className='row mb-5')
+        ], className='container-fluid'),
+
+        # Sección 3: Análisis de Violencia
+        html.Div([
             html.Div([
+                html.H3('🔪 Análisis de Violencia y Seguridad', className='text-center text-danger mb-4'),
+                html.Div([
+                    html.Div([
+                        html.H5('Ciudades Más Violentas (Homicidios)', className='card-title text-center'),
+                        dcc.Graph(
+                            id='barras-violentas',
+                            figure=figures.violent_cities(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '400px'}
+                        )
+                    ], className='card shadow-sm p-3 mb-4')
+                ], className='col-md-6'),
                 html.Div([
-                    html.H5('Ciudades Más Seguras (Menor Mortalidad)', className='card-title text-center'),
-                    dcc.Graph(
-                        id='circular-menor-mortalidad',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '400px'}
-                    )
-                ], className='card shadow-sm p-3 mb-4')
-            ], className='col-md-6')
-        ], className='row mb-5')
-    ], className='container-fluid'),
-
-    # Sección 4: Causas de Muerte
-    html.Div([
+                    html.Div([
+                        html.H5('Ciudades Más Seguras (Menor Mortalidad)', className='card-title text-center'),
+                        dcc.Graph(
+                            id='circular-menor-mortalidad',
+                            figure=figures.low_mortality_pie(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '400px'}
+                        )
+                    ], className='card shadow-sm p-3 mb-4')
+                ], className='col-md-6')
+            ], className='row mb-5')
+        ], className='container-fluid'),
+
+        # Sección 4: Causas de Muerte
         html.Div([
-            html.H3('⚕️ Principales Causas de Muerte', className='text-center text-warning mb-4'),
             html.Div([
+                html.H3('⚕️ Principales Causas de Muerte', className='text-center text-warning mb-4'),
                 html.Div([
-                    dash_table.DataTable(
-                        id='tabla-causas',
-                        columns=[
-                            {'name': '🏷️ Código CIE-10', 'id': 'codigo'},
-                            {'name': '📋 Descripción', 'id': 'causa'},
-                            {'name': '📊 Casos Reportados', 'id': 'total'}
-                        ],
-                        style_table={
-                            'overflowX': 'auto',
-                            'borderRadius': '10px',
-                            'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)'
-                        },
-                        style_cell={
-                            'textAlign': 'left',
-                            'padding': '15px',
-                            'fontSize': '14px',
-                            'border': '1px solid #dee2e6',
-                            'backgroundColor': 'white'
-                        },
-                        style_header={
-                            'backgroundColor': '#f8f9fa',
-                            'fontWeight': 'bold',
-                            'border': '2px solid #dee2e6',
-                            'textAlign': 'center',
-                            'fontSize': '16px',
-                            'color': '#495057'
-                        },
-                        style_data_conditional=[
-                            {'if': {'row_index': 'odd'}, 'backgroundColor': '#f8f9fa'},
-                            {'if': {'row_index': 'even'}, 'backgroundColor': 'white'}
-                        ],
-                        page_size=10,
-                        style_as_list_view=True
-                    )
-                ], className='card shadow-sm p-4')
-            ], className='col-12')
-        ], className='row mb-5')
-    ], className='container-fluid'),
-
-    # Sección 5: Análisis Demográfico
-    html.Div([
+                    html.Div([
+                        dash_table.DataTable(
+                            id='tabla-causas',
+                            columns=[
+                                {'name': '🏷️ Código CIE-10', 'id': 'codigo'},
+                                {'name': '📋 Descripción', 'id': 'causa'},
+                                {'name': '📊 Casos Reportados', 'id': 'total', 'type': 'numeric'}
+                            ],
+                            # Ranking completo de causas: la página, el orden y la
+                            # búsqueda se resuelven en el servidor (update_causes_table)
+                            data=[],
+                            page_action='custom',
+                            page_current=0,
+                            page_size=10,
+                            page_count=1,
+                            sort_action='custom',
+                            sort_mode='single',
+                            sort_by=[],
+                            filter_action='custom',
+                            filter_query='',
+                            filter_options={'case': 'insensitive', 'placeholder_text': '🔍 Buscar...'},
+                            style_table={
+                                'overflowX': 'auto',
+                                'borderRadius': '10px',
+                                'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)'
+                            },
+                            style_cell={
+                                'textAlign': 'left',
+                                'padding': '15px',
+                                'fontSize': '14px',
+                                'border': '1px solid #dee2e6',
+                                'backgroundColor': 'white'
+                            },
+                            style_header={
+                                'backgroundColor': '#f8f9fa',
+                                'fontWeight': 'bold',
+                                'border': '2px solid #dee2e6',
+                                'textAlign': 'center',
+                                'fontSize': '16px',
+                                'color': '#495057'
+                            },
+                            style_data_conditional=[
+                                {'if': {'row_index': 'odd'}, 'backgroundColor': '#f8f9fa'},
+                                {'if': {'row_index': 'even'}, 'backgroundColor': 'white'}
+                            ],
+                            style_as_list_view=True
+                        )
+                    ], className='card shadow-sm p-4')
+                ], className='col-12')
+            ], className='row mb-5')
+        ], className='container-fluid'),
+
+        # Sección 5: Análisis Demográfico
         html.Div([
-            html.H3('👥 Análisis Demográfico', className='text-center text-info mb-4'),
             html.Div([
+                html.H3('👥 Análisis Demográfico', className='text-center text-info mb-4'),
                 html.Div([
-                    html.H5('Distribución por Sexo y Departamento', className='card-title text-center'),
-                    dcc.Graph(
-                        id='barras-apiladas-sexo',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '500px'}
-                    )
-                ], className='card shadow-sm p-3 mb-4')
-            ], className='col-md-6'),
-            html.Div([
+                    html.Div([
+                        html.H5('Distribución por Sexo y Departamento', className='card-title text-center'),
+                        dcc.Graph(
+                            id='barras-apiladas-sexo',
+                            figure=figures.sex_stack(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '500px'}
+                        )
+                    ], className='card shadow-sm p-3 mb-4')
+                ], className='col-md-6'),
                 html.Div([
-                    html.H5('Distribución por Grupos de Edad', className='card-title text-center'),
-                    dcc.Graph(
-                        id='histograma-edad',
-                        config={'displayModeBar': True, 'displaylogo': False},
-                        style={'height': '500px'}
-                    )
-                ], className='card shadow-sm p-3 mb-4')
-            ], className='col-md-6')
-        ], className='row mb-5')
-    ], className='container-fluid'),
-
-    # Footer
-    html.Div([
+                    html.Div([
+                        html.H5('Distribución por Grupos de Edad', className='card-title text-center'),
+                        dcc.Graph(
+                            id='histograma-edad',
+                            figure=figures.age_bars(),
+                            config={'displayModeBar': True, 'displaylogo': False},
+                            style={'height': '500px'}
+                        )
+                    ], className='card shadow-sm p-3 mb-4')
+                ], className='col-md-6')
+            ], className='row mb-5')
+        ], className='container-fluid'),
+
+        # Footer
         html.Div([
-            html.Hr(style={'border': '1px solid #dee2e6', 'margin': '40px 0'}),
             html.Div([
+                html.Hr(style={'border': '1px solid #dee2e6', 'margin': '40px 0'}),
                 html.Div([
-                    html.H6('📊 Fuente de Datos', className='text-muted mb-2'),
-                    html.P('Departamento Administrativo Nacional de Estadística (DANE)', className='mb-0 small'),
-                    html.P('Estadísticas Vitales 2019', className='mb-0 small')
-                ], className='col-md-4'),
-                html.Div([
-                    html.H6('🛠️ Tecnologías', className='text-muted mb-2'),
-                    html.P('Python + Dash + Plotly + Pandas', className='mb-0 small'),
-                    html.P('Desplegado en Render.com', className='mb-0 small')
-                ], className='col-md-4'),
-                html.Div([
-                    html.H6('📅 Última Actualización', className='text-muted mb-2'),
-                    html.P('Noviembre 2025', className='mb-0 small'),
-                    html.P('Versión 1.0.0', className='mb-0 small')
-                ], className='col-md-4')
-            ], className='row text-center'),
-            html.P('🔍 Aplicación desarrollada para el análisis de datos de mortalidad en Colombia', className='text-center text-muted mt-4 mb-0 small')
-        ], className='container')
-    ], style={'backgroundColor': '#f8f9fa', 'padding': '40px 0', 'marginTop': '60px'})
-], style={
-    'backgroundColor': '#ffffff',
-    'minHeight': '100vh',
-    'fontFamily': '"Segoe UI", Tahoma, Geneva, Verdana, sans-serif'
-})
+                    html.Div([
+                        html.H6('📊 Fuente de Datos', className='text-muted mb-2'),
+                        html.P('Departamento Administrativo Nacional de Estadística (DANE)', className='mb-0 small'),
+                        html.P(f'Estadísticas Vitales {YEAR_SPAN}', className='mb-0 small')
+                    ], className='col-md-4'),
+                    html.Div([
+                        html.H6('🛠️ Tecnologías', className='text-muted mb-2'),
+                        html.P('Python + Dash + Plotly + Pandas', className='mb-0 small'),
+                        html.P('Desplegado en Render.com', className='mb-0 small')
+                    ], className='col-md-4'),
+                    html.Div([
+                        html.H6('📅 Última Actualización', className='text-muted mb-2'),
+                        html.P('Noviembre 2025', className='mb-0 small'),
+                        html.P('Versión 1.0.0', className='mb-0 small')
+                    ], className='col-md-4')
+                ], className='row text-center'),
+                html.P('🔍 Aplicación desarrollada para el análisis de datos de mortalidad en Colombia', className='text-center text-muted mt-4 mb-0 small')
+            ], className='container')
+        ], style={'backgroundColor': '#f8f9fa', 'padding': '40px 0', 'marginTop': '60px'})
+    ], style={
+        'backgroundColor': '#ffffff',
+        'minHeight': '100vh',
+        'fontFamily': '"Segoe UI", Tahoma, Geneva, Verdana, sans-serif'
+    })
+
+def loading_layout():
+    # Aviso mientras los datos cargan en segundo plano; se recarga al quedar listo /readyz
+    return html.Div([
+        html.H2('Cargando datos de mortalidad…', className='text-center text-muted mt-5'),
+        html.P('La página se actualizará automáticamente.', className='text-center text-muted'),
+        dcc.Interval(id='carga-intervalo', interval=2000)
+    ], className='container')
+
+def serve_layout():
+    return LAYOUT if loader.ready else loading_layout()
+
+app.layout = serve_layout
+
+app.clientside_callback(
+    f"""
+    function (n) {{
+        fetch('{app.get_relative_path('/readyz')}').then(function (response) {{
+            if (response.ok) {{
+                window.location.reload();
+            }}
+        }});
+        return window.dash_clientside.no_update;
+    }}
+    """,
+    dash.Output('carga-intervalo', 'disabled'),
+    dash.Input('carga-intervalo', 'n_intervals'),
+    prevent_initial_call=True
+)
 
 # Callbacks para actualizar gráficos
-@app.callback(
-    [dash.Output('total-muertes', 'children'),
-     dash.Output('muertes-hombres', 'children'),
-     dash.Output('muertes-mujeres', 'children'),
-     dash.Output('deptos-afectados', 'children'),
-     dash.Output('tooltip-modal', 'style')],
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value'),
-     dash.Input('edad-tooltip', 'n_clicks'),
-     dash.Input('close-tooltip', 'n_clicks')]
-)
-def update_stats(departamento, sexo, edad, tooltip_clicks, close_clicks):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
+# Un único callback recibe los filtros, calcula los conteos de la selección
+# una sola vez y devuelve todas las salidas en una misma respuesta HTTP.
+DASHBOARD_OUTPUTS = [
+    dash.Output('total-muertes', 'children'),
+    dash.Output('muertes-hombres', 'children'),
+    dash.Output('muertes-mujeres', 'children'),
+    dash.Output('deptos-afectados', 'children'),
+    dash.Output('mapa-departamentos', 'figure'),
+    dash.Output('lineas-meses', 'figure'),
+    dash.Output('barras-violentas', 'figure'),
+    dash.Output('circular-menor-mortalidad', 'figure'),
+    dash.Output('barras-apiladas-sexo', 'figure'),
+    dash.Output('histograma-edad', 'figure'),
+]
 
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
+FILTER_INPUTS = [
+    dash.Input('departamento-filter', 'value'),
+    dash.Input('sexo-filter', 'value'),
+    dash.Input('edad-filter', 'value'),
+    dash.Input('anio-filter', 'value'),
+]
+# Filtro de municipio: solo con los filtros en el servidor (los conteos que
+# descarga el navegador no bajan a municipio en todas las gráficas)
+if not config.CLIENTSIDE:
+    FILTER_INPUTS.append(dash.Input('municipio-filter', 'value'))
+
+def select(departamento, sexo, edad, year=None, municipio=ALL):
+    """Conteos compartidos para una selección del Panel de Control."""
+    data = partitions.get(year)
+    return SelectionAggregates(data.cube, departamento, sexo, edad,
+                               homicide_cells=data.homicide_cells, year=data.year, municipio=municipio)
+
+def build_dashboard(departamento, sexo, edad, year=None, municipio=ALL):
+    """Valores de todas las salidas de DASHBOARD_OUTPUTS, en orden."""
+    agg = select(departamento, sexo, edad, year, municipio)
+    return (
+        *build_stats(agg),
+        build_map(agg),
+        build_line_chart(agg),
+        build_violent_cities(agg),
+        build_low_mortality_cities(agg),
+        build_stacked_sex_chart(agg),
+        build_age_histogram(agg),
+    )
 
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
+def update_dashboard(departamento, sexo, edad, year, municipio=ALL):
+    # Filtros de selección múltiple: lista vacía = todos; un solo valor = dropdown simple
+    departamento, sexo, edad = canonical(departamento), canonical(sexo), canonical(edad)
+    municipio = canonical(municipio)
+    year = partitions.resolve(year)
+    if (prerendered is not None and municipio == ALL
+            and not any(isinstance(v, list) for v in (departamento, sexo, edad))):
+        payload = prerendered.get(departamento, sexo, edad, year)
+        if payload is not None:
+            return payload
+    key = make_key('dashboard', departamento, sexo, edad, year, municipio, OUTPUT_VERSION)
+    return result_cache.get_or_compute(key, lambda: build_dashboard(departamento, sexo, edad, year, municipio))
+
+if config.CLIENTSIDE:
+    # Los filtros se resuelven en el navegador sobre los conteos de /data/cliente/<año>.json;
+    # el servidor solo atiende la carga de la página, una descarga por año y las
+    # páginas de la tabla de causas
+    app.clientside_callback(
+        dash.ClientsideFunction(namespace='mortalidad', function_name='dashboard'),
+        DASHBOARD_OUTPUTS,
+        FILTER_INPUTS,
+        [dash.State('cliente-config', 'data'), dash.State('mapa-departamentos', 'figure')]
+    )
+else:
+    app.callback(DASHBOARD_OUTPUTS, FILTER_INPUTS)(instrument(update_dashboard))
 
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
+# Tabla de causas: ranking completo paginado en el servidor. Cada cambio de
+# filtros, página, orden o búsqueda pide solo las filas de la página visible.
+CAUSES_TABLE_OUTPUTS = [
+    dash.Output('tabla-causas', 'data'),
+    dash.Output('tabla-causas', 'page_current'),
+    dash.Output('tabla-causas', 'page_count'),
+]
+
+# Las propiedades de la tabla van primero: los filtros terminan con el
+# municipio solo cuando se resuelven en el servidor
+CAUSES_TABLE_INPUTS = [
+    dash.Input('tabla-causas', 'page_current'),
+    dash.Input('tabla-causas', 'page_size'),
+    dash.Input('tabla-causas', 'sort_by'),
+    dash.Input('tabla-causas', 'filter_query'),
+] + FILTER_INPUTS
+
+def causes_page(departamento, sexo, edad, year=None, page=0, size=10, sort_by=None, filter_query='',
+                municipio=ALL):
+    """Filas de una página de la tabla de causas, la página efectiva y el número de páginas."""
+    data = partitions.get(year)
+    selection = (normalize(departamento), normalize(sexo), normalize(edad), normalize(municipio))
+    ranking = data.cause_table.ranking(
+        selection, lambda: select(departamento, sexo, edad, data.year, municipio).cause_totals)
+    return ranking.page(page, size, parse_sort(sort_by), parse_filter(filter_query))
+
+def update_causes_table(page, size, sort_by, filter_query, departamento, sexo, edad, year, municipio=ALL):
+    departamento, sexo, edad = canonical(departamento), canonical(sexo), canonical(edad)
+    municipio = canonical(municipio)
+    year = partitions.resolve(year)
+    # Un cambio de filtros, de orden o de búsqueda vuelve a la primera página
+    if 'tabla-causas.page_current' not in dash.ctx.triggered_prop_ids:
+        page = 0
+    key = make_key('causas', departamento, sexo, edad, year, municipio, page, size, sort_by, filter_query,
+                   OUTPUT_VERSION)
+    return result_cache.get_or_compute(
+        key, lambda: causes_page(departamento, sexo, edad, year, page, size, sort_by, filter_query, municipio))
+
+app.callback(CAUSES_TABLE_OUTPUTS, CAUSES_TABLE_INPUTS)(instrument(update_causes_table))
+
+def municipality_options(search_value, departamento, value):
+    """Opciones del filtro de municipio y su valor, acotado a los departamentos elegidos."""
+    selected = municipalities.lookup(value)
+    pruned = dash.no_update
+    if dash.ctx.triggered_id == 'departamento-filter':
+        # Al cambiar de departamento se quitan los municipios que quedan fuera
+        scope = municipalities.scope(departamento)
+        if scope is not None and not scope[selected].all():
+            selected = selected[scope[selected]]
+            pruned = municipalities.values[selected].tolist()
+    # Las opciones incluyen siempre los municipios elegidos (el dropdown muestra su nombre)
+    ids = np.union1d(selected, municipalities.search(search_value, departamento))
+    return municipalities.options(ids), pruned
+
+if not config.CLIENTSIDE:
+    # Opciones a demanda con el texto que se escribe en el dropdown (search_value):
+    # el layout inicial no lleva los ~1.100 municipios
+    app.callback(
+        dash.Output('municipio-filter', 'options'),
+        dash.Output('municipio-filter', 'value'),
+        dash.Input('municipio-filter', 'search_value'),
+        dash.Input('departamento-filter', 'value'),
+        dash.State('municipio-filter', 'value'),
+        prevent_initial_call=True
+    )(instrument(municipality_options))
+
+def count_query(by, departamento, sexo, edad, year, municipio=ALL):
+    # Conteos de /api/v1/counts, con la misma caché de resultados que el tablero
+    year = partitions.resolve(year)
+    key = make_key('api-counts', api.FORMAT_VERSION, by, departamento, sexo, edad, year, municipio, OUTPUT_VERSION)
+    return result_cache.get_or_compute(
+        key, lambda: api.payload(select(departamento, sexo, edad, year, municipio), by, OUTPUT_VERSION))
+
+api.install(app.server, instrument(count_query, name='api_counts'), years=lambda: YEARS)
+
+@lru_cache(maxsize=config.MAX_YEAR_PARTITIONS)
+def client_data(year):
+    # JSON compacto de un año para el modo de filtros en el navegador
+    from mortality.clientside import client_payload
+
+    return json.dumps(client_payload(partitions.get(year)), separators=(',', ':'), ensure_ascii=False)
+
+@app.server.route('/data/cliente/<int:year>.json')
+def client_data_route(year):
+    # Sin recurrir al año por defecto: una URL de año ausente no debe servir los datos de otro
+    if year not in partitions.years:
+        flask.abort(404)
+    return app.server.response_class(client_data(year), mimetype='application/json')
 
-    # Calcular estadísticas
-    total_muertes = len(filtered_df)
-    muertes_hombres = len(filtered_df[filtered_df['SEXO'] == 1])
-    muertes_mujeres = len(filtered_df[filtered_df['SEXO'] == 2])
-    deptos_afectados = filtered_df['COD_DPTO'].nunique()
+@app.callback(
+    dash.Output('mapa-departamentos', 'figure', allow_duplicate=True),
+    dash.Input('mapa-nivel', 'value'),
+    prevent_initial_call=True
+)
+@instrument
+def toggle_map_level(level):
+    # Cambia la capa visible sin volver a enviar la geometría ni los conteos
+    if GEO_MUNICIPIOS is None:
+        return dash.no_update
+    patch = dash.Patch()
+    patch['data'][0]['visible'] = level != 'municipios'
+    patch['data'][1]['visible'] = level == 'municipios'
+    patch['layout']['title']['text'] = ('Distribución de Muertes por Municipio' if level == 'municipios'
+                                        else 'Distribución de Muertes por Departamento')
+    return patch
+
+@app.server.route('/cache/stats')
+def cache_stats():
+    # Aciertos y fallos de la caché de resultados de este worker
+    return result_cache.stats()
+
+@app.server.route('/data/years')
+def year_stats():
+    # Años disponibles y particiones cargadas en este worker
+    return partitions.stats()
 
+@app.callback(
+    dash.Output('tooltip-modal', 'style'),
+    [dash.Input('edad-tooltip', 'n_clicks'),
+     dash.Input('close-tooltip', 'n_clicks')]
+)
+@instrument
+def toggle_tooltip(tooltip_clicks, close_clicks):
     # Manejar tooltip modal
     ctx = dash.callback_context
     tooltip_style = {'display': 'none'}
@@ -441,408 +769,101 @@ def update_stats(departamento, sexo, edad, tooltip_clicks, close_clicks):
         elif trigger_id == 'close-tooltip':
             tooltip_style = {'display': 'none'}
 
-    return f"{total_muertes:,}", f"{muertes_hombres:,}", f"{muertes_mujeres:,}", f"{deptos_afectados}", tooltip_style
+    return tooltip_style
 
-@app.callback(
-    dash.Output('mapa-departamentos', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_map(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
-
-    # Agrupar por departamento
-    dept_data = filtered_df.groupby('COD_DPTO').size().reset_index(name='muertes')
-
-    # Unir con nombres de departamentos
-    dept_data = dept_data.merge(df_divipola[['COD_DPTO', 'NOM_DPTO']].drop_duplicates(),
-                                on='COD_DPTO', how='left')
-
-    # Crear mapa usando scatter con coordenadas
-    fig = px.bar(dept_data,
-                  x='NOM_DPTO',
-                  y='muertes',
-                  color='muertes',
-                  color_continuous_scale='Reds')
-    fig.update_layout(
-        title='Distribución de Muertes por Departamento',
-        xaxis_title='Departamento',
-        yaxis_title='Número de Muertes',
-        showlegend=False
-    )
-    fig.update_xaxes(tickangle=45)
-
-    return fig
+def build_stats(agg):
+    # Calcular estadísticas sobre el cubo filtrado según selecciones
+    total_muertes = agg.total
+    muertes_hombres = int(agg.by_sex.get(1, 0))
+    muertes_mujeres = int(agg.by_sex.get(2, 0))
+    deptos_afectados = len(agg.by_department)
 
-@app.callback(
-    dash.Output('lineas-meses', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_line_chart(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
-
-    # Agrupar por mes
-    monthly_data = filtered_df.groupby('MES').size().reset_index(name='muertes')
-
-    # Nombres de meses
-    meses = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
-             'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
-    monthly_data['mes_nombre'] = monthly_data['MES'].apply(lambda x: meses[x-1] if 1 <= x <= 12 else 'Desconocido')
-
-    fig = px.line(monthly_data, x='mes_nombre', y='muertes',
-                  markers=True)
-    fig.update_layout(
-        title='Muertes por Mes en Colombia 2019',
-        xaxis_title='Mes',
-        yaxis_title='Número de Muertes',
-        showlegend=False
-    )
+    return f"{total_muertes:,}", f"{muertes_hombres:,}", f"{muertes_mujeres:,}", f"{deptos_afectados}"
 
-    return fig
+def build_map(agg):
+    # Agrupar por departamento (el mapa siempre muestra todos los departamentos)
+    dept_data = agg.by_department_all.rename(columns={COUNT: 'muertes'})
 
-@app.callback(
-    dash.Output('barras-violentas', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_violent_cities(departamento, sexo, edad):
-    # Filtrar homicidios (códigos que empiecen con X95)
-    violent_deaths = df_mortality[df_mortality['CAUSA_DEFUNCION'].astype(str).str.startswith('X95', na=False)]
+    if MAP_FIGURE is not None:
+        # Coropleta: la geometría ya está en el navegador, solo viajan los conteos por región
+        patch = dash.Patch()
+        patch['data'][0]['z'] = align(MAP_LOCATIONS[0], department_key(dept_data['COD_DPTO']),
+                                      dept_data['muertes']).tolist()
+        if GEO_MUNICIPIOS is not None:
+            munic_data = agg.by_municipality_all
+            patch['data'][1]['z'] = align(MAP_LOCATIONS[1],
+                                          municipality_key(munic_data['COD_DPTO'], munic_data['COD_MUNIC']),
+                                          munic_data[COUNT]).tolist()
+        return patch
 
-    # Aplicar filtros adicionales
-    if departamento != 'all':
-        violent_deaths = violent_deaths[violent_deaths['NOM_DPTO'] == departamento]
+    # Sin GeoJSON: barras por departamento, con nombres desde la dimensión geográfica
+    return figures.fill_bars(geography.department_names(dept_data['COD_DPTO']), dept_data['muertes'])
 
-    if sexo != 'all':
-        violent_deaths = violent_deaths[violent_deaths['SEXO'].astype(str) == sexo]
+def build_line_chart(agg):
+    # Agrupar por mes según selecciones
+    monthly_data = agg.by_month.rename(columns={COUNT: 'muertes'})
 
-    if edad != 'all':
-        violent_deaths = violent_deaths[violent_deaths['GRUPO_EDAD1'] == edad]
+    # Nombres de meses (arreglo de consulta por código)
+    monthly_data['mes_nombre'] = month_names(monthly_data['MES'])
 
-    # Agrupar por municipio
-    city_violence = violent_deaths.groupby(['COD_DPTO', 'COD_MUNIC']).size().reset_index(name='homicidios')
+    return figures.fill_line(monthly_data['mes_nombre'], monthly_data['muertes'],
+                             f'Muertes por Mes en Colombia {agg.year}')
 
-    # Unir con nombres de municipios
-    city_violence = city_violence.merge(df_divipola[['COD_DPTO', 'COD_MUNIC', 'NOM_MUNIC']].drop_duplicates(),
-                                        on=['COD_DPTO', 'COD_MUNIC'], how='left')
+def build_violent_cities(agg):
+    # Agrupar homicidios por municipio según selecciones
+    city_violence = agg.homicides_by_municipality.rename(columns={COUNT: 'homicidios'})
 
-    # Top 5 ciudades más violentas
+    # Top 5 ciudades más violentas, con sus nombres
     top_violent = city_violence.nlargest(5, 'homicidios')
+    top_violent['NOM_MUNIC'] = geography.municipality_names(top_violent['COD_DPTO'], top_violent['COD_MUNIC'])
 
-    fig = px.bar(top_violent, x='NOM_MUNIC', y='homicidios',
-                  color='homicidios', color_continuous_scale='Reds')
-    fig.update_layout(
-        title='5 Ciudades Más Violentas (Homicidios)',
-        xaxis_title='Ciudad',
-        yaxis_title='Número de Homicidios',
-        showlegend=False
-    )
-
-    return fig
-
-@app.callback(
-    dash.Output('circular-menor-mortalidad', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_low_mortality_cities(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
+    return figures.fill_bars(top_violent['NOM_MUNIC'], top_violent['homicidios'])
 
-    # Agrupar por municipio
-    city_mortality = filtered_df.groupby(['COD_DPTO', 'COD_MUNIC']).size().reset_index(name='muertes')
+def build_low_mortality_cities(agg):
+    # Agrupar por municipio según selecciones
+    city_mortality = agg.by_municipality.rename(columns={COUNT: 'muertes'})
 
-    # Unir con nombres
-    city_mortality = city_mortality.merge(df_divipola[['COD_DPTO', 'COD_MUNIC', 'NOM_MUNIC']].drop_duplicates(),
-                                         on=['COD_DPTO', 'COD_MUNIC'], how='left')
-
-    # 10 ciudades con menor mortalidad 
+    # 10 ciudades con menor mortalidad, con sus nombres
     low_mortality = city_mortality[city_mortality['muertes'] >= 5].nsmallest(10, 'muertes')
-
-    fig = px.pie(low_mortality, values='muertes', names='NOM_MUNIC')
-    fig.update_layout(
-        title='10 Ciudades con Menor Índice de Mortalidad',
-        showlegend=True
-    )
-    fig.update_traces(
-        textposition='inside',
-        textinfo='label+value+percent',
-        textfont_size=12,
-        hovertemplate='<b>%{label}</b><br>Muertes: %{value}<br>Porcentaje: %{percent}<extra></extra>'
-    )
-
-    return fig
-
-@app.callback(
-    dash.Output('tabla-causas', 'data'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_causes_table(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
-
-    # Agrupar por causa de defunción
-    causes_data = filtered_df.groupby('CAUSA_DEFUNCION').size().reset_index(name='total')
-
-    # Crear diccionario de mapeo usando las columnas correctas del archivo de códigos
-    # Basándonos en el análisis, las columnas correctas son diferentes
-    if 'CODIGO_CIE10' in df_codes.columns and 'DESCRIPCION_CIE10' in df_codes.columns:
-        # Si existen las columnas esperadas, usarlas
-        code_mapping = dict(zip(
-            df_codes['CODIGO_CIE10'].astype(str).str.strip(),
-            df_codes['DESCRIPCION_CIE10'].astype(str).str.strip()
-        ))
-    else:
-        # Buscar automáticamente las columnas correctas
-        mortality_codes = set(df_mortality['CAUSA_DEFUNCION'].dropna().astype(str).str.strip().unique())
-
-        # Encontrar la columna con mejor coincidencia para códigos
-        best_code_col = None
-        max_matches = 0
-        best_desc_col = None
-
-        for code_col in df_codes.columns:
-            if df_codes[code_col].notna().sum() > 0:
-                mapping_codes = set(df_codes[code_col].dropna().astype(str).str.strip().unique())
-                matches = len(mortality_codes.intersection(mapping_codes))
-                if matches > max_matches:
-                    max_matches = matches
-                    best_code_col = code_col
-
-        # Encontrar columna de descripción correspondiente
-        for desc_col in df_codes.columns:
-            if 'DESCRIP' in desc_col.upper() or 'NOMBRE' in desc_col.upper() or 'CAUSA' in desc_col.upper():
-                best_desc_col = desc_col
-                break
-
-        # Crear un mapeo combinado de TODAS las columnas que contienen códigos
-        combined_mapping = {}
-
-        # Buscar todas las columnas que contienen códigos CIE-10
-        code_columns = []
-        for col in df_codes.columns:
-            if df_codes[col].notna().sum() > 0:
-                sample = str(df_codes[col].dropna().iloc[0])
-                # Si parece un código CIE-10 (letras + números, longitud razonable)
-                if len(sample) <= 10 and any(c.isalpha() for c in sample) and any(c.isdigit() for c in sample):
-                    code_columns.append(col)
-
-        # Encontrar columna de descripción
-        desc_col = None
-        for col in df_codes.columns:
-            if 'DESCRIP' in col.upper() or 'NOMBRE' in col.upper() or 'CAUSA' in col.upper():
-                desc_col = col
-                break
-
-        # Crear mapeo combinado filtrado (solo descripciones no vacías)
-        if code_columns and desc_col:
-            for code_col in code_columns:
-                # Filtrar filas con descripciones válidas (no vacías ni NaN)
-                valid_rows = df_codes[
-                    (df_codes[code_col].notna()) &
-                    (df_codes[desc_col].notna()) &
-                    (df_codes[desc_col].astype(str).str.strip() != '')
-                ]
-
-                if not valid_rows.empty:
-                    temp_mapping = dict(zip(
-                        valid_rows[code_col].astype(str).str.strip(),
-                        valid_rows[desc_col].astype(str).str.strip()
-                    ))
-                    combined_mapping.update(temp_mapping)
-            code_mapping = combined_mapping
-        else:
-            # Último fallback
-            code_mapping = {
-                'I219': 'Infarto agudo del miocardio',
-                'J449': 'Enfermedad pulmonar obstructiva crónica',
-                'C349': 'Cáncer de pulmón',
-                'I64': 'Accidente cerebrovascular',
-                'I10': 'Hipertensión esencial',
-                'C509': 'Cáncer de mama',
-                'C61': 'Cáncer de próstata',
-                'E149': 'Diabetes mellitus no especificada',
-                'K729': 'Enfermedad hepática',
-                'X95': 'Homicidio'
-            }
-
-    # Agregar descripciones usando el mapeo automático
-    causes_data['descripcion'] = causes_data['CAUSA_DEFUNCION'].astype(str).str.strip().map(code_mapping).fillna('Causa no especificada')
-
-    # Para los códigos que aún no tienen descripción, proporcionar descripciones manuales
-    manual_descriptions = {
-        'J440': 'Enfermedad pulmonar obstructiva crónica con exacerbación aguda',
-        'J189': 'Neumonía, no especificada',
-        'C169': 'Cáncer de estómago, parte no especificada',
-        'X954': 'Homicidio y lesiones por intervención legal, no especificadas'
-    }
-
-    # Aplicar descripciones manuales donde falten
-    causes_data['descripcion'] = causes_data.apply(
-        lambda row: manual_descriptions.get(str(row['CAUSA_DEFUNCION']).strip(), row['descripcion']),
-        axis=1
-    )
-
-    # Top 10 causas
-    top_causes = causes_data.nlargest(10, 'total')[['CAUSA_DEFUNCION', 'descripcion', 'total']]
-    top_causes.columns = ['codigo', 'causa', 'total']
-
-    return top_causes.to_dict('records')
-
-@app.callback(
-    dash.Output('barras-apiladas-sexo', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_stacked_sex_chart(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
-
-    # Agrupar por departamento y sexo
-    sex_dept_data = filtered_df.groupby(['COD_DPTO', 'SEXO']).size().reset_index(name='muertes')
-
-    # Unir con nombres de departamentos
-    sex_dept_data = sex_dept_data.merge(df_divipola[['COD_DPTO', 'NOM_DPTO']].drop_duplicates(),
-                                       on='COD_DPTO', how='left')
-
-    # Mapear sexo
-    sex_dept_data['SEXO'] = sex_dept_data['SEXO'].map({1: 'Masculino', 2: 'Femenino', 3: 'Indeterminado'})
-
-    fig = px.bar(sex_dept_data, x='NOM_DPTO', y='muertes', color='SEXO',
-                  barmode='stack')
-    fig.update_layout(
-        title='Muertes por Sexo y Departamento',
-        xaxis_title='Departamento',
-        yaxis_title='Número de Muertes'
-    )
-
-    return fig
-
-@app.callback(
-    dash.Output('histograma-edad', 'figure'),
-    [dash.Input('departamento-filter', 'value'),
-     dash.Input('sexo-filter', 'value'),
-     dash.Input('edad-filter', 'value')]
-)
-def update_age_histogram(departamento, sexo, edad):
-    # Filtrar datos según selecciones
-    filtered_df = df_mortality.copy()
-
-    if departamento != 'all':
-        filtered_df = filtered_df[filtered_df['NOM_DPTO'] == departamento]
-
-    if sexo != 'all':
-        filtered_df = filtered_df[filtered_df['SEXO'].astype(str) == sexo]
-
-    if edad != 'all':
-        filtered_df = filtered_df[filtered_df['GRUPO_EDAD1'] == edad]
-
-    # Mapeo de grupos de edad según especificaciones
-    age_groups = {
-        0: 'Mortalidad neonatal',
-        1: 'Mortalidad neonatal',
-        2: 'Mortalidad neonatal',
-        3: 'Mortalidad neonatal',
-        4: 'Mortalidad neonatal',
-        5: 'Mortalidad infantil',
-        6: 'Mortalidad infantil',
-        7: 'Primera infancia',
-        8: 'Primera infancia',
-        9: 'Niñez',
-        10: 'Niñez',
-        11: 'Adolescencia',
-        12: 'Juventud',
-        13: 'Juventud',
-        14: 'Adultez temprana',
-        15: 'Adultez temprana',
-        16: 'Adultez temprana',
-        17: 'Adultez intermedia',
-        18: 'Adultez intermedia',
-        19: 'Adultez intermedia',
-        20: 'Vejez',
-        21: 'Vejez',
-        22: 'Vejez',
-        23: 'Vejez',
-        24: 'Vejez',
-        25: 'Longevidad / Centenarios',
-        26: 'Longevidad / Centenarios',
-        27: 'Longevidad / Centenarios',
-        28: 'Longevidad / Centenarios',
-        29: 'Edad desconocida'
-    }
-
-    # Aplicar mapeo
-    filtered_df['grupo_edad'] = filtered_df['GRUPO_EDAD1'].map(age_groups)
-
-    # Contar por grupo
-    age_data = filtered_df['grupo_edad'].value_counts().reset_index()
-    age_data.columns = ['grupo', 'muertes']
-
-    fig = px.bar(age_data, x='grupo', y='muertes',
-                  title='Distribución de Muertes por Grupos de Edad',
-                  color='muertes', color_continuous_scale='Viridis')
-    fig.update_layout(
-        xaxis_title='Grupo de Edad',
-        yaxis_title='Número de Muertes',
-        plot_bgcolor='white',
-        paper_bgcolor='white'
-    )
-    fig.update_xaxes(tickangle=45, gridcolor='lightgray')
-    fig.update_yaxes(gridcolor='lightgray')
-
-    return fig
+    low_mortality['NOM_MUNIC'] = geography.municipality_names(low_mortality['COD_DPTO'], low_mortality['COD_MUNIC'])
+
+    return figures.fill_pie(low_mortality['NOM_MUNIC'], low_mortality['muertes'])
+
+def build_stacked_sex_chart(agg):
+    # Agrupar por departamento y sexo según selecciones
+    sex_dept_data = agg.by_department_sex.rename(columns={COUNT: 'muertes'})
+
+    # Nombres de departamentos desde la dimensión geográfica
+    sex_dept_data['NOM_DPTO'] = geography.department_names(sex_dept_data['COD_DPTO'])
+
+    # Una traza por código de sexo (ver mortality/figures.py)
+    return figures.fill_stack(sex_dept_data['NOM_DPTO'], sex_dept_data['muertes'], sex_dept_data['SEXO'])
+
+def build_age_histogram(agg):
+    # Conteos por grupo de edad (ver mortality/labels.py), de mayor a menor
+    age_totals = agg.by_age_group
+    present = np.flatnonzero(age_totals)
+    order = present[np.argsort(-age_totals[present], kind='stable')]
+    return figures.fill_bars(AGE_GROUPS[order], age_totals[order])
+
+# Carga de datos: al importar (por defecto) o en segundo plano con
+# MORTALIDAD_BACKGROUND_LOAD=1, atendiendo /healthz y /readyz mientras tanto
+loader = DataLoader(load_data)
+install_readiness(app.server, loader, guarded=(
+    app.config.routes_pathname_prefix + '_dash-update-component', '/data/', '/cache/', '/api/'))
+# Respuestas comprimidas; ETag de los callbacks según filtros y versión de los datos
+install_responses(app.server, version=lambda: OUTPUT_VERSION if loader.ready else None,
+                  callback_path=app.config.routes_pathname_prefix + '_dash-update-component',
+                  static_path=app.config.routes_pathname_prefix + 'assets/',
+                  compression=config.COMPRESSION)
+# Latencia por fase de cada callback y tiempos de arranque en /metrics (formato Prometheus).
+# Se instala después de la compresión: Flask ejecuta los after_request en orden
+# inverso, así que el tamaño y la serialización se miden sobre el JSON sin comprimir
+install_metrics(app.server)
+if config.BACKGROUND_LOAD:
+    loader.start()
+else:
+    loader.run()
 
 # Para desarrollo local y Vercel
 if __name__ == '__main__':
@@ -0,0 +1,56 @@
+/*
+ * Revalidación de las respuestas de los callbacks con ETag.
+ *
+ * Los callbacks de Dash son POST a _dash-update-component, que el navegador
+ * no guarda en su caché HTTP. Este script guarda las últimas respuestas por
+ * cuerpo de la solicitud (filtros incluidos) y, al repetir una selección,
+ * envía If-None-Match con su ETag: el servidor responde 304 sin ejecutar el
+ * callback (mortality/responses.py) y se reutiliza la respuesta guardada.
+ */
+(function () {
+    'use strict';
+
+    var MAX_ENTRIES = 64;
+    var entries = new Map();
+
+    if (typeof window === 'undefined' || typeof window.fetch !== 'function') {
+        return;
+    }
+    var nativeFetch = window.fetch.bind(window);
+
+    function remember(key, entry) {
+        entries.delete(key);
+        entries.set(key, entry);
+        if (entries.size > MAX_ENTRIES) {
+            entries.delete(entries.keys().next().value);
+        }
+    }
+
+    window.fetch = function (input, init) {
+        var url = typeof input === 'string' ? input : (input && input.url) || '';
+        if (!init || init.method !== 'POST' || typeof init.body !== 'string' ||
+                url.indexOf('_dash-update-component') < 0) {
+            return nativeFetch(input, init);
+        }
+        var key = init.body;
+        var cached = entries.get(key);
+        var headers = new Headers(init.headers || {});
+        if (cached) {
+            headers.set('If-None-Match', cached.etag);
+        }
+        return nativeFetch(input, Object.assign({}, init, {headers: headers})).then(function (response) {
+            if (response.status === 304 && cached) {
+                remember(key, cached);
+                return new Response(cached.body, {status: 200, headers: {'Content-Type': 'application/json'}});
+            }
+            var etag = response.headers.get('ETag');
+            if (response.status !== 200 || !etag) {
+                return response;
+            }
+            return response.clone().text().then(function (body) {
+                remember(key, {etag: etag, body: body});
+                return response;
+            });
+        });
+    };
+})();
@@ -0,0 +1,341 @@
+/*
+ * Modo de filtros en el navegador (MORTALIDAD_CLIENTSIDE=1).
+ *
+ * El callback del tablero corre aquí en lugar del servidor: descarga una
+ * vez por año los conteos agregados (mortality/clientside.py) y en cada
+ * cambio de filtro suma, ordena y arma las mismas figuras que los
+ * build_* de app.py, sin ninguna solicitud al servidor. La tabla de causas
+ * no está aquí: se pagina en el servidor (mortality/cause_table.py).
+ */
+(function () {
+    'use strict';
+
+    // Trazas del gráfico apilado: códigos de sexo y etiquetas (mortality/figures.py)
+    var SEX_CODES = [1, 2, 3];
+    var SEX_NAMES = ['Masculino', 'Femenino', 'Indeterminado'];
+    var payloads = {};
+
+    function load(config, year) {
+        // Una descarga por año y por página; las siguientes reutilizan la promesa
+        var key = String(year);
+        if (!payloads[key]) {
+            payloads[key] = fetch(config.url + key + '.json').then(function (response) {
+                if (!response.ok) {
+                    delete payloads[key];
+                    throw new Error('No se pudieron cargar los datos de ' + key);
+                }
+                return response.json();
+            });
+        }
+        return payloads[key];
+    }
+
+    function position(labels, value) {
+        // Posición de ``value`` en ``labels`` (comparando como texto, como FilterEngine) o -1
+        var key = String(value);
+        for (var i = 0; i < labels.length; i++) {
+            if (labels[i] !== null && String(labels[i]) === key) {
+                return i;
+            }
+        }
+        return -1;
+    }
+
+    function choices(labels, value) {
+        // Filtro de selección múltiple: null si está inactivo (lista vacía o
+        // 'all'); si no, un arreglo que marca las posiciones elegidas (OR)
+        var values = Array.isArray(value) ? value : (value === null || value === undefined ? [] : [value]);
+        if (values.length === 0 || values.indexOf('all') >= 0) {
+            return null;
+        }
+        var chosen = new Array(labels.length).fill(false);
+        values.forEach(function (v) {
+            var k = position(labels, v);
+            if (k >= 0) {
+                chosen[k] = true;
+            }
+        });
+        return chosen;
+    }
+
+    function selected(table, i, sel, ignoreDepartment) {
+        // AND entre dimensiones; los faltantes (-1) no coinciden con ningún valor
+        return (ignoreDepartment || sel.f === null || sel.f[table.f[i]] === true) &&
+            (sel.s === null || sel.s[table.s[i]] === true) &&
+            (sel.a === null || sel.a[table.a[i]] === true);
+    }
+
+    function sumBy(table, column, size, sel, ignoreDepartment) {
+        // Conteos por posición de ``column`` (se omiten los faltantes)
+        var totals = new Array(size).fill(0);
+        for (var i = 0; i < table.n.length; i++) {
+            var k = table[column][i];
+            if (k >= 0 && selected(table, i, sel, ignoreDepartment)) {
+                totals[k] += table.n[i];
+            }
+        }
+        return totals;
+    }
+
+    function present(totals) {
+        var rows = [];
+        for (var k = 0; k < totals.length; k++) {
+            if (totals[k] > 0) {
+                rows.push(k);
+            }
+        }
+        return rows;
+    }
+
+    function ranked(rows, totals, descending) {
+        // Orden estable, como nlargest/nsmallest de pandas con keep='first'
+        return rows.map(function (k, i) { return [k, i]; }).sort(function (p, q) {
+            var diff = descending ? totals[q[0]] - totals[p[0]] : totals[p[0]] - totals[q[0]];
+            return diff || p[1] - q[1];
+        }).map(function (p) { return p[0]; });
+    }
+
+    function pick(values, rows) {
+        return rows.map(function (k) { return values[k]; });
+    }
+
+    function fmt(value) {
+        return value.toLocaleString('en-US');
+    }
+
+    function colorscale(colors) {
+        return colors.map(function (color, i) { return [i / (colors.length - 1), color]; });
+    }
+
+    function layout(style, extra) {
+        return Object.assign({template: style.template, legend: {tracegroupgap: 0}, margin: {t: 60}}, extra);
+    }
+
+    function axes(xTitle, yTitle) {
+        return {
+            xaxis: {anchor: 'y', domain: [0, 1], title: {text: xTitle}},
+            yaxis: {anchor: 'x', domain: [0, 1], title: {text: yTitle}}
+        };
+    }
+
+    function colorBar(x, y, xName, yName) {
+        return {
+            type: 'bar', x: x, y: y, orientation: 'v', name: '', legendgroup: '', showlegend: false,
+            textposition: 'auto', xaxis: 'x', yaxis: 'y',
+            marker: {color: y, coloraxis: 'coloraxis', pattern: {shape: ''}},
+            hovertemplate: xName + '=%{x}<br>' + yName + '=%{marker.color}<extra></extra>'
+        };
+    }
+
+    function coloraxis(title, colors) {
+        return {colorbar: {title: {text: title}}, colorscale: colorscale(colors)};
+    }
+
+    function buildMap(data, sel, style, figure, config) {
+        var L = data.labels;
+        var byDepartment = sumBy(data.base, 'd', L.d.length, sel, true);
+
+        if (config.map) {
+            // Coropleta: se copia la figura actual (con su geometría) y solo cambian los conteos
+            var locations = config.map_locations;
+            var zByDepartment = {};
+            byDepartment.forEach(function (n, k) {
+                zByDepartment[L.d[k]] = (zByDepartment[L.d[k]] || 0) + n;
+            });
+            var layers = [locations[0].map(function (code) { return zByDepartment[code] || 0; })];
+            if (locations.length > 1) {
+                var byMunicipality = sumBy(data.municipios, 'u', L.u_nombre.length, sel, true);
+                var zByKey = {};
+                byMunicipality.forEach(function (n, k) {
+                    var key = L.u_dpto[k] * 1000 + L.u_munic[k];
+                    zByKey[key] = (zByKey[key] || 0) + n;
+                });
+                layers.push(locations[1].map(function (key) { return zByKey[key] || 0; }));
+            }
+            return Object.assign({}, figure, {
+                data: figure.data.map(function (trace, i) {
+                    return Object.assign({}, trace, {z: layers[i]});
+                })
+            });
+        }
+
+        var rows = present(byDepartment);
+        return {
+            data: [colorBar(pick(L.d_nombre, rows), pick(byDepartment, rows), 'NOM_DPTO', 'muertes')],
+            layout: layout(style, Object.assign(axes('Departamento', 'Número de Muertes'), {
+                coloraxis: coloraxis('muertes', style.Reds),
+                barmode: 'relative',
+                title: {text: 'Distribución de Muertes por Departamento'},
+                showlegend: false
+            }))
+        };
+    }
+
+    function buildLineChart(data, sel, style) {
+        var L = data.labels;
+        var byMonth = sumBy(data.base, 'm', L.m.length, sel);
+        var rows = present(byMonth);
+        var layoutAxes = axes('Mes', 'Número de Muertes');
+        return {
+            data: [{
+                type: 'scatter', mode: 'lines+markers', x: pick(L.m_nombre, rows), y: pick(byMonth, rows),
+                orientation: 'v', name: '', legendgroup: '', showlegend: false, xaxis: 'x', yaxis: 'y',
+                line: {color: '#636efa', dash: 'solid'}, marker: {symbol: 'circle'},
+                hovertemplate: 'mes_nombre=%{x}<br>muertes=%{y}<extra></extra>'
+            }],
+            layout: layout(style, Object.assign(layoutAxes, {
+                title: {text: 'Muertes por Mes en Colombia ' + data.year},
+                showlegend: false
+            }))
+        };
+    }
+
+    function buildViolentCities(data, sel, style) {
+        var L = data.labels;
+        var homicides = sumBy(data.homicidios, 'u', L.u_nombre.length, sel);
+        var rows = ranked(present(homicides), homicides, true).slice(0, 5);
+        return {
+            data: [colorBar(pick(L.u_nombre, rows), pick(homicides, rows), 'NOM_MUNIC', 'homicidios')],
+            layout: layout(style, Object.assign(axes('Ciudad', 'Número de Homicidios'), {
+                coloraxis: coloraxis('homicidios', style.Reds),
+                barmode: 'relative',
+                title: {text: '5 Ciudades Más Violentas (Homicidios)'},
+                showlegend: false
+            }))
+        };
+    }
+
+    function buildLowMortalityCities(data, sel, style) {
+        var L = data.labels;
+        var deaths = sumBy(data.municipios, 'u', L.u_nombre.length, sel);
+        var rows = ranked(present(deaths).filter(function (k) { return deaths[k] >= 5; }), deaths, false)
+            .slice(0, 10);
+        return {
+            data: [{
+                type: 'pie', labels: pick(L.u_nombre, rows), values: pick(deaths, rows),
+                domain: {x: [0, 1], y: [0, 1]}, name: '', legendgroup: '', showlegend: true,
+                textposition: 'inside', textinfo: 'label+value+percent', textfont: {size: 12},
+                hovertemplate: '<b>%{label}</b><br>Muertes: %{value}<br>Porcentaje: %{percent}<extra></extra>'
+            }],
+            layout: layout(style, {
+                title: {text: '10 Ciudades con Menor Índice de Mortalidad'},
+                showlegend: true
+            })
+        };
+    }
+
+    function buildStackedSexChart(data, sel, style) {
+        var L = data.labels;
+        var base = data.base;
+        var sexes = L.s.length;
+        var totals = new Array(L.d.length * sexes).fill(0);
+        for (var i = 0; i < base.n.length; i++) {
+            if (base.d[i] >= 0 && base.s[i] >= 0 && selected(base, i, sel)) {
+                totals[base.d[i] * sexes + base.s[i]] += base.n[i];
+            }
+        }
+
+        // Una traza por código de sexo (como mortality/figures.py); las vacías quedan ocultas
+        var traces = SEX_CODES.map(function () { return {x: [], y: []}; });
+        present(totals).forEach(function (k) {
+            var trace = SEX_CODES.indexOf(L.s[k % sexes]);
+            if (trace < 0) {
+                return;
+            }
+            traces[trace].x.push(L.d_nombre[Math.floor(k / sexes)]);
+            traces[trace].y.push(totals[k]);
+        });
+        var colorway = style.template.layout.colorway;
+        return {
+            data: SEX_CODES.map(function (code, i) {
+                var name = SEX_NAMES[i];
+                return {
+                    type: 'bar', x: traces[i].x, y: traces[i].y, name: name, legendgroup: name,
+                    visible: traces[i].x.length > 0,
+                    orientation: 'v', showlegend: true, textposition: 'auto', xaxis: 'x', yaxis: 'y',
+                    marker: {color: colorway[i % colorway.length], pattern: {shape: ''}},
+                    hovertemplate: 'SEXO=' + name + '<br>NOM_DPTO=%{x}<br>muertes=%{y}<extra></extra>'
+                };
+            }),
+            layout: layout(style, Object.assign(axes('Departamento', 'Número de Muertes'), {
+                legend: {title: {text: 'SEXO'}, tracegroupgap: 0},
+                barmode: 'stack',
+                title: {text: 'Muertes por Sexo y Departamento'}
+            }))
+        };
+    }
+
+    function buildAgeHistogram(data, sel, style) {
+        var L = data.labels;
+        var byAge = sumBy(data.base, 'a', L.a.length, sel);
+        var groups = new Array(L.grupos_edad.length).fill(0);
+        byAge.forEach(function (n, k) {
+            if (L.a_grupo[k] >= 0) {
+                groups[L.a_grupo[k]] += n;
+            }
+        });
+        var rows = ranked(present(groups), groups, true);
+        var layoutAxes = axes('Grupo de Edad', 'Número de Muertes');
+        layoutAxes.xaxis.tickangle = 45;
+        layoutAxes.xaxis.gridcolor = 'lightgray';
+        layoutAxes.yaxis.gridcolor = 'lightgray';
+        return {
+            data: [colorBar(pick(L.grupos_edad, rows), pick(groups, rows), 'grupo', 'muertes')],
+            layout: layout(style, Object.assign(layoutAxes, {
+                coloraxis: coloraxis('muertes', style.Viridis),
+                title: {text: 'Distribución de Muertes por Grupos de Edad'},
+                barmode: 'relative',
+                plot_bgcolor: 'white',
+                paper_bgcolor: 'white'
+            }))
+        };
+    }
+
+    function buildStats(data, sel) {
+        var L = data.labels;
+        var base = data.base;
+        var total = 0;
+        for (var i = 0; i < base.n.length; i++) {
+            if (selected(base, i, sel)) {
+                total += base.n[i];
+            }
+        }
+        var bySex = sumBy(base, 's', L.s.length, sel);
+        var sexCount = function (code) {
+            var k = position(L.s, code);
+            return k >= 0 ? bySex[k] : 0;
+        };
+        var departments = present(sumBy(base, 'd', L.d.length, sel)).length;
+        return [fmt(total), fmt(sexCount(1)), fmt(sexCount(2)), String(departments)];
+    }
+
+    function dashboard(data, departamento, sexo, edad, config, figure) {
+        var L = data.labels;
+        var sel = {f: choices(L.f, departamento), s: choices(L.s, sexo), a: choices(L.a, edad)};
+        var style = config.style;
+        return buildStats(data, sel).concat([
+            buildMap(data, sel, style, figure, config),
+            buildLineChart(data, sel, style),
+            buildViolentCities(data, sel, style),
+            buildLowMortalityCities(data, sel, style),
+            buildStackedSexChart(data, sel, style),
+            buildAgeHistogram(data, sel, style)
+        ]);
+    }
+
+    if (typeof window !== 'undefined') {
+        window.dash_clientside = Object.assign({}, window.dash_clientside, {
+            mortalidad: {
+                dashboard: function (departamento, sexo, edad, year, config, figure) {
+                    return load(config, year || config.default_year).then(function (data) {
+                        return dashboard(data, departamento, sexo, edad, config, figure);
+                    });
+                }
+            }
+        });
+    }
+    if (typeof module !== 'undefined') {
+        // Para comparar con los build_* de app.py desde Node
+        module.exports = {dashboard: dashboard};
+    }
+})();
@@ -0,0 +1,174 @@
+"""Prueba de carga de ``/api/v1/counts``: solicitudes por segundo por worker.
+
+Levanta gunicorn con un solo worker (como en worker_memory.py) y lo
+satura durante ``--seconds`` con ``--concurrency`` clientes que piden una
+mezcla de agrupaciones y filtros aleatorios. Se mide dos veces: con la caché
+de resultados (un conjunto fijo de consultas que se repiten, como en el
+tablero) y sin ella (``MORTALIDAD_RESULT_CACHE=off``, cada consulta se
+calcula sobre el cubo). Con ``--url`` se mide un servidor que ya está
+corriendo.
+
+Uso::
+
+    python -m benchmarks.bench_api --seconds 20 --concurrency 4 --output resultados.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.worker_memory import ROOT, _free_port  # noqa: E402
+
+# Agrupaciones de la mezcla (las de las gráficas del tablero y algunas más finas)
+GROUPINGS = ['', 'sexo', 'dpto', 'mes', 'edad', 'dpto,sexo', 'dpto,munic', 'causa', 'departamento,mes',
+             'dpto,munic,sexo', 'sexo,edad,mes', 'municipio']
+
+
+def queries(base_url, count, seed, formats):
+    """``count`` URL de consulta con agrupaciones y filtros aleatorios."""
+    with urllib.request.urlopen(f'{base_url}/api/v1/counts?by=departamento', timeout=60) as response:
+        departments = json.load(response)['data']['departamento']
+    rng = random.Random(seed)
+    urls = []
+    for _ in range(count):
+        params = [('by', rng.choice(GROUPINGS)), ('format', rng.choice(formats))]
+        if rng.random() < 0.5:
+            params += [('departamento', d) for d in rng.sample(departments, rng.randint(1, min(3, len(departments))))]
+        if rng.random() < 0.5:
+            params.append(('sexo', ','.join(rng.sample(['1', '2', '3'], rng.randint(1, 2)))))
+        if rng.random() < 0.5:
+            params.append(('edad', ','.join(str(a) for a in rng.sample(range(30), rng.randint(1, 6)))))
+        urls.append(f'{base_url}/api/v1/counts?{urllib.parse.urlencode(params)}')
+    return urls
+
+
+def load(urls, seconds, concurrency):
+    """Solicitudes en paralelo durante ``seconds``; devuelve RPS y latencias."""
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def client(offset):
+        i = offset
+        local, failed = [], 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(urls[i % len(urls)], timeout=60) as response:
+                    response.read()
+                local.append(time.perf_counter() - start)
+            except (urllib.error.URLError, OSError):
+                failed += 1
+            i += concurrency
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    ms = np.asarray(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'p99_ms': float(np.percentile(ms, 99)),
+    }
+
+
+def _formats(base_url):
+    # Arrow solo si el servidor tiene pyarrow
+    try:
+        urllib.request.urlopen(f'{base_url}/api/v1/counts?format=arrow', timeout=60).read()
+        return ['json', 'arrow']
+    except urllib.error.HTTPError as e:
+        if e.code == 406:
+            return ['json']
+        raise
+
+
+def run(base_url, args):
+    formats = _formats(base_url)
+    urls = queries(base_url, args.queries, args.seed, formats)
+    # Una pasada previa para que la caché (si está activa) tenga todas las consultas
+    for url in urls:
+        urllib.request.urlopen(url, timeout=60).read()
+    result = load(urls, args.seconds, args.concurrency)
+    result['formats'] = formats
+    return result
+
+
+def spawn(cache, args):
+    port = _free_port()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, WEB_CONCURRENCY='1',
+                   MORTALIDAD_RESULT_CACHE='memory' if cache else 'off',
+                   MORTALIDAD_RESULT_CACHE_PATH=os.path.join(tmp, 'results.sqlite'))
+        proc = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', '--timeout', '120', 'wsgi:application'],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        base_url = f'http://127.0.0.1:{port}'
+        try:
+            deadline = time.time() + args.timeout
+            while True:
+                try:
+                    urllib.request.urlopen(f'{base_url}/readyz', timeout=5).read()
+                    break
+                except OSError:
+                    pass
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError('gunicorn no respondió a tiempo')
+                time.sleep(0.5)
+            return run(base_url, args)
+        finally:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solicitudes por segundo de /api/v1/counts')
+    parser.add_argument('--url', help='servidor ya en marcha (por defecto se levanta gunicorn con un worker)')
+    parser.add_argument('--seconds', type=float, default=20)
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--queries', type=int, default=200, help='consultas distintas de la mezcla')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    if args.url:
+        results = {'servidor': run(args.url.rstrip('/'), args)}
+    else:
+        results = {'con caché': spawn(True, args), 'sin caché': spawn(False, args)}
+
+    print(f"{'escenario':<14}{'solicitudes':>12}{'errores':>9}{'RPS':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for name, r in results.items():
+        print(f"{name:<14}{r['requests']:>12,}{r['errors']:>9}{r['rps']:>9.1f}"
+              f"{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['p99_ms']:>9.2f}")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""Latencia de extremo a extremo: callback consolidado vs. un callback por salida.
+
+Simula cambios en el Panel de Control enviando solicitudes a
+``/_dash-update-component`` con el cliente de pruebas de Flask, de modo que
+el tiempo incluye el despacho de Dash y la serialización JSON de las
+figuras. El cliente de pruebas no pasa por la red; ``--rtt-ms`` suma un
+tiempo de ida y vuelta fijo por solicitud para estimar el efecto de la
+latencia de red del despliegue. El diseño anterior (un callback independiente por gráfica, cada uno recalculando
+los conteos de la selección) se reconstruye en una segunda aplicación Dash
+con el mismo layout.
+
+Uso::
+
+    python -m benchmarks.bench_callbacks --changes 200
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import dash
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Se mide el cálculo, no la caché de resultados ni las salidas precalculadas
+os.environ.setdefault('MORTALIDAD_RESULT_CACHE', 'off')
+os.environ.setdefault('MORTALIDAD_PRERENDER_PATH', '')
+
+import app as dashboard  # noqa: E402  (carga los datos al importar)
+
+# Salidas agrupadas como en el diseño de un callback por gráfica
+LEGACY_GROUPS = [
+    (dashboard.DASHBOARD_OUTPUTS[0:4], lambda agg: dashboard.build_stats(agg)),
+    (dashboard.DASHBOARD_OUTPUTS[4:5], lambda agg: (dashboard.build_map(agg),)),
+    (dashboard.DASHBOARD_OUTPUTS[5:6], lambda agg: (dashboard.build_line_chart(agg),)),
+    (dashboard.DASHBOARD_OUTPUTS[6:7], lambda agg: (dashboard.build_violent_cities(agg),)),
+    (dashboard.DASHBOARD_OUTPUTS[7:8], lambda agg: (dashboard.build_low_mortality_cities(agg),)),
+    (dashboard.DASHBOARD_OUTPUTS[8:9], lambda agg: (dashboard.build_stacked_sex_chart(agg),)),
+    (dashboard.DASHBOARD_OUTPUTS[9:10], lambda agg: (dashboard.build_age_histogram(agg),)),
+]
+
+
+def build_legacy_app():
+    legacy = dash.Dash(__name__, suppress_callback_exceptions=True)
+    legacy.layout = dashboard.app.layout
+
+    for outputs, build in LEGACY_GROUPS:
+        def callback(departamento, sexo, edad, year, municipio=None, build=build):
+            # Cada callback calcula sus propios conteos, sin compartirlos
+            values = build(dashboard.select(departamento, sexo, edad, year, municipio))
+            return list(values)
+        legacy.callback(list(outputs), dashboard.FILTER_INPUTS)(callback)
+    return legacy
+
+
+def _payload(outputs, combo):
+    # Filtros del tablero; el de municipio (si está) queda vacío
+    ids = [i.component_id for i in dashboard.FILTER_INPUTS]
+    combo = list(combo) + [[]] * (len(ids) - len(combo))
+    output_specs = [{'id': o.component_id, 'property': o.component_property} for o in outputs]
+    return {
+        'output': '..' + '...'.join(f'{o.component_id}.{o.component_property}' for o in outputs) + '..',
+        'outputs': output_specs,
+        'inputs': [{'id': i, 'property': 'value', 'value': v} for i, v in zip(ids, combo)],
+        'changedPropIds': ['departamento-filter.value'],
+        'state': [],
+    }
+
+
+def _post(client, payload):
+    response = client.post('/_dash-update-component', json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f'respuesta {response.status_code}: {response.data[:200]!r}')
+    return len(response.data)
+
+
+def measure(client, groups, combos, rtt_ms=0.0):
+    """Latencia (ms) y bytes por cambio de filtros para una lista de grupos de salidas."""
+    latencies, sizes = [], []
+    for combo in combos:
+        start = time.perf_counter()
+        size = sum(_post(client, _payload(outputs, combo)) for outputs in groups)
+        latencies.append((time.perf_counter() - start) * 1000 + rtt_ms * len(groups))
+        sizes.append(size)
+    return np.array(latencies), np.array(sizes)
+
+
+def random_combos(n, seed=0):
+    rng = random.Random(seed)
+    departamentos = ['all'] + list(dashboard.DEPARTAMENTOS)
+    sexos = ['all', '1', '2', '3']
+    edades = ['all'] + [int(e) for e in sorted(dashboard.df_mortality['GRUPO_EDAD1'].dropna().unique())]
+    years = dashboard.YEARS
+    return [(rng.choice(departamentos), rng.choice(sexos), rng.choice(edades), rng.choice(years))
+            for _ in range(n)]
+
+
+def summarize(name, requests, latencies, sizes):
+    return {
+        'design': name,
+        'requests_per_change': requests,
+        'changes': int(len(latencies)),
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'mean_ms': round(float(latencies.mean()), 2),
+        'bytes_per_change': int(sizes.mean()),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--changes', type=int, default=100, help='cambios de filtros a simular')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--rtt-ms', type=float, default=0.0,
+                        help='ida y vuelta de red simulada por solicitud')
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    combos = random_combos(args.changes, args.seed)
+    legacy_client = build_legacy_app().server.test_client()
+    client = dashboard.app.server.test_client()
+
+    # Calentamiento: construye los rollups del cubo y las plantillas de Plotly
+    measure(client, [dashboard.DASHBOARD_OUTPUTS], combos[:3])
+    measure(legacy_client, [g for g, _ in LEGACY_GROUPS], combos[:3])
+
+    legacy_groups = [g for g, _ in LEGACY_GROUPS]
+    results = [
+        summarize('per-callback', len(legacy_groups),
+                  *measure(legacy_client, legacy_groups, combos, args.rtt_ms)),
+        summarize('consolidated', 1,
+                  *measure(client, [dashboard.DASHBOARD_OUTPUTS], combos, args.rtt_ms)),
+    ]
+    for row in results:
+        print(f"{row['design']:>14}: {row['requests_per_change']} solicitudes/cambio  "
+              f"p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  "
+              f"{row['bytes_per_change']:,} B/cambio")
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""Filtros de selección múltiple: ``isin`` de pandas vs. mapas de bits.
+
+Para combinaciones aleatorias de varios departamentos, sexos y grupos de
+edad compara la forma directa con pandas (una máscara ``isin`` por columna
+sobre los registros, combinadas con ``&``) con :class:`FilterEngine`, que
+resuelve la misma selección con OR y AND sobre mapas de bits
+empaquetados. Se mide sobre los registros, para comparar el mismo volumen de
+datos, y sobre las celdas del cubo, que es lo que hace el tablero. La caché
+LRU del motor se desactiva para medir la resolución completa.
+
+Con ``--check`` verifica que ambos caminos seleccionan las mismas filas.
+
+Uso::
+
+    python -m benchmarks.bench_filters --combos 200 --check
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.filters import ALL, FilterEngine  # noqa: E402
+
+# Columnas de los registros con las que filtra la forma con pandas
+RECORD_COLUMNS = {'departamento': 'COD_DPTO', 'sexo': 'SEXO', 'edad': 'GRUPO_EDAD1'}
+
+
+def random_selection(rng, values):
+    """Entre 1 y la mitad de los valores de una dimensión, o todos (``ALL``) una de cada cuatro veces."""
+    if rng.random() < 0.25:
+        return ALL
+    return rng.sample(values, rng.randint(1, max(1, len(values) // 2)))
+
+
+def isin_mask(df, selection):
+    mask = np.ones(len(df), dtype=bool)
+    for name, values in selection.items():
+        if values != ALL:
+            mask &= df[RECORD_COLUMNS[name]].isin(values).to_numpy()
+    return mask
+
+
+def summarize(samples):
+    ms = np.asarray(samples) * 1000
+    return {'p50_ms': float(np.percentile(ms, 50)), 'p95_ms': float(np.percentile(ms, 95)),
+            'mean_ms': float(ms.mean())}
+
+
+def timed(fn, selections):
+    samples = []
+    for selection in selections:
+        start = time.perf_counter()
+        fn(selection)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Filtros de selección múltiple: isin vs. mapas de bits')
+    parser.add_argument('--combos', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help='verificar que ambos caminos coinciden')
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    import app as dashboard
+
+    df = dashboard.df_mortality[list(RECORD_COLUMNS.values())]
+    cube = dashboard.dataset.cube
+
+    start = time.perf_counter()
+    records = FilterEngine(df, columns=RECORD_COLUMNS, cache_size=0)
+    build_records = time.perf_counter() - start
+    start = time.perf_counter()
+    cells = FilterEngine(cube.cells, cache_size=0)
+    build_cells = time.perf_counter() - start
+
+    # Selecciones por código de departamento (registros) y su nombre (cubo)
+    rng = random.Random(args.seed)
+    codes = sorted(int(code) for code in df['COD_DPTO'].dropna().unique())
+    names = dict(zip(codes, dashboard.geography.department_names(codes)))
+    sexes = sorted(int(sex) for sex in df['SEXO'].dropna().unique())
+    ages = sorted(int(age) for age in df['GRUPO_EDAD1'].dropna().unique())
+    by_code = [{'departamento': random_selection(rng, codes),
+                'sexo': random_selection(rng, sexes),
+                'edad': random_selection(rng, ages)} for _ in range(args.combos)]
+    by_name = [dict(s, departamento=s['departamento'] if s['departamento'] == ALL
+                    else [names[code] for code in s['departamento']]) for s in by_code]
+
+    if args.check:
+        for selection in by_code:
+            expected = np.flatnonzero(isin_mask(df, selection))
+            rows = records.rows(**selection)
+            rows = np.arange(len(df)) if rows is None else rows
+            if not np.array_equal(rows, expected):
+                raise SystemExit(f'Diferencia en la selección {selection}')
+        print(f'{len(by_code)} selecciones coinciden')
+
+    cases = {
+        'isin (registros)': (len(df), timed(lambda s: np.flatnonzero(isin_mask(df, s)), by_code)),
+        'mapas de bits (registros)': (len(df), timed(lambda s: records.rows(**s), by_code)),
+        'mapas de bits (cubo)': (len(cube), timed(lambda s: cells.rows(**s), by_name)),
+    }
+
+    results = {
+        'rows': len(df),
+        'cells': len(cube),
+        'combos': args.combos,
+        'build_ms': {'registros': build_records * 1000, 'cubo': build_cells * 1000},
+        'bitmap_bytes': {'registros': records.nbytes, 'cubo': cells.nbytes},
+        'cases': {},
+    }
+    print(f"{'camino':<28}{'filas':>12}{'p50 ms':>10}{'p95 ms':>10}")
+    for name, (size, samples) in cases.items():
+        stats = summarize(samples)
+        results['cases'][name] = stats
+        print(f"{name:<28}{size:>12,}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+    isin_p50 = results['cases']['isin (registros)']['p50_ms']
+    bitmap_p50 = results['cases']['mapas de bits (registros)']['p50_ms']
+    print(f"aceleración sobre los registros: {isin_p50 / bitmap_p50:.1f}x; "
+          f"mapas de bits: {records.nbytes / 1e6:,.2f} MB (registros), {cells.nbytes / 1e6:,.2f} MB (cubo)")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
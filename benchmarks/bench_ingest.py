@@ -0,0 +1,115 @@
+"""Lectura del libro de mortalidad: ``pd.read_excel`` vs. lectura por lotes.
+
+Cada cargador corre en un proceso nuevo para que sus picos de memoria no
+se mezclen. Se informa el tiempo, el pico de memoria de Python
+(``tracemalloc``, que incluye los arreglos de NumPy) y el aumento del RSS
+máximo del proceso. La lectura por lotes debe quedar por debajo de
+:func:`mortality.ingest.peak_bound` (más el tamaño del DataFrame final); si
+no, el script termina con código de salida 1.
+
+Uso::
+
+    python -m benchmarks.bench_ingest
+    python -m benchmarks.bench_ingest --path Anexos/nofetal2019.csv --batch-size 20000
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality import config  # noqa: E402
+from mortality.ingest import peak_bound, read_table  # noqa: E402
+
+LOADERS = ('read_excel', 'streaming')
+
+
+def _load(loader, path, batch_size):
+    if loader == 'read_excel':
+        if os.path.splitext(path)[1].lower() in ('.csv', '.txt'):
+            return pd.read_csv(path, sep=None, engine='python')
+        return pd.read_excel(path)
+    return read_table(path, batch_size=batch_size)
+
+
+def run_child(loader, path, batch_size):
+    """Carga el archivo en este proceso e imprime las mediciones en JSON."""
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    start = time.perf_counter()
+    df = _load(loader, path, batch_size)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'loader': loader,
+        'rows': len(df),
+        'columns': len(df.columns),
+        'seconds': round(elapsed, 3),
+        'peak_bytes': peak,
+        'rss_increase_bytes': (max_rss - baseline_rss) * 1024,
+        'frame_bytes': int(df.memory_usage(deep=True, index=False).sum()),
+    }))
+
+
+def measure(loader, path, batch_size):
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_ingest', '--child', loader,
+         '--path', path, '--batch-size', str(batch_size)],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='pd.read_excel vs. lectura por lotes')
+    parser.add_argument('--path', default=config.MORTALITY_FILE)
+    parser.add_argument('--batch-size', type=int, default=50_000)
+    parser.add_argument('--check', action='store_true',
+                        help='verificar que ambos cargadores producen el mismo DataFrame')
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--child', choices=LOADERS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.child, args.path, args.batch_size)
+        return 0
+
+    results = [measure(loader, args.path, args.batch_size) for loader in LOADERS]
+    print(f"{os.path.basename(args.path)}: {results[0]['rows']:,} filas × {results[0]['columns']} columnas, "
+          f"DataFrame final {results[0]['frame_bytes'] / 1e6:.1f} MB")
+    print(f"{'cargador':<12}{'segundos':>10}{'pico Python MB':>16}{'aumento RSS MB':>16}")
+    for row in results:
+        print(f"{row['loader']:<12}{row['seconds']:>10.2f}{row['peak_bytes'] / 1e6:>16.1f}"
+              f"{row['rss_increase_bytes'] / 1e6:>16.1f}")
+
+    streaming = results[1]
+    bound = peak_bound(streaming['rows'], streaming['columns'], args.batch_size) + streaming['frame_bytes']
+    print(f"Techo de la lectura por lotes: {bound / 1e6:.1f} MB")
+
+    if args.check:
+        pd.testing.assert_frame_equal(_load('read_excel', args.path, args.batch_size),
+                                      _load('streaming', args.path, args.batch_size))
+        print("Ambos cargadores producen el mismo DataFrame")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'results': results, 'bound_bytes': bound}, fh, indent=2)
+
+    if streaming['peak_bytes'] > bound:
+        print("ERROR: la lectura por lotes superó su techo de memoria")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Etiquetas de mes, sexo y grupo de edad: diccionarios y ``apply`` vs. arreglos de consulta.
+
+Compara, para cada derivación, la forma anterior (reconstruir el
+diccionario de grupos de edad y aplicar ``Series.map`` sobre los registros
+filtrados, ``apply`` con una ``lambda`` para los meses y ``map`` para el
+sexo) con los arreglos de :mod:`mortality.labels` y ``np.bincount``. Se
+mide sobre los registros completos, para comparar el mismo volumen de
+datos, y sobre los conteos del cubo, que es lo que hace el tablero.
+
+Uso::
+
+    python -m benchmarks.bench_labels --repeat 20
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.labels import AGE_GROUP_OF_CODE, AGE_GROUPS, count_by_age_group, month_names, sex_names  # noqa: E402
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+
+def legacy_age_groups():
+    # Diccionario que el callback anterior reconstruía en cada solicitud
+    return {code: AGE_GROUPS[group] for code, group in enumerate(AGE_GROUP_OF_CODE)}
+
+
+def legacy_age(df):
+    df = df.copy()
+    df['grupo_edad'] = df['GRUPO_EDAD1'].map(legacy_age_groups())
+    return df.groupby('grupo_edad', sort=False).size()
+
+
+def legacy_month(months):
+    return months.apply(lambda x: MESES[x - 1] if 1 <= x <= 12 else 'Desconocido')
+
+
+def legacy_sex(sexes):
+    return sexes.map({1: 'Masculino', 2: 'Femenino', 3: 'Indeterminado'})
+
+
+def lookup_age(codes, counts):
+    return count_by_age_group(codes, counts)
+
+
+def best_ms(fn, repeat):
+    return min(timeit.repeat(fn, number=1, repeat=repeat)) * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Etiquetas con diccionarios vs. arreglos de consulta')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    import app as dashboard
+
+    df = dashboard.df_mortality[['MES', 'SEXO', 'GRUPO_EDAD1']]
+    ones = np.ones(len(df), dtype=np.int64)
+    agg = dashboard.select('all', 'all', 'all')
+    by_month, by_sex, by_age = agg.by_month, agg.by_department_sex, agg.by_age_code
+
+    cases = {
+        'edad (registros)': (
+            lambda: legacy_age(df),
+            lambda: lookup_age(df['GRUPO_EDAD1'].to_numpy(), ones)),
+        'mes (registros)': (
+            lambda: legacy_month(df['MES']),
+            lambda: month_names(df['MES'])),
+        'sexo (registros)': (
+            lambda: legacy_sex(df['SEXO']),
+            lambda: sex_names(df['SEXO'])),
+        'edad (cubo)': (
+            lambda: by_age.assign(grupo=by_age['GRUPO_EDAD1'].map(legacy_age_groups()))
+                          .groupby('grupo', sort=False)['count'].sum(),
+            lambda: lookup_age(by_age['GRUPO_EDAD1'].to_numpy(), by_age['count'].to_numpy())),
+        'mes (cubo)': (
+            lambda: legacy_month(by_month['MES']),
+            lambda: month_names(by_month['MES'])),
+        'sexo (cubo)': (
+            lambda: legacy_sex(by_sex['SEXO']),
+            lambda: sex_names(by_sex['SEXO'])),
+    }
+
+    results = {}
+    print(f"{'derivación':<20}{'anterior ms':>13}{'arreglos ms':>13}{'aceleración':>13}")
+    for name, (legacy, lookup) in cases.items():
+        before, after = best_ms(legacy, args.repeat), best_ms(lookup, args.repeat)
+        results[name] = {'legacy_ms': before, 'lookup_ms': after, 'speedup': before / after}
+        print(f"{name:<20}{before:>13.3f}{after:>13.3f}{before / after:>12.1f}x")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""Memoria de ``df_mortality`` frente al techo definido en mortality/schema.py.
+
+Importa la aplicación (que carga y compacta los datos) y termina con
+código de salida 1 si el DataFrame compacto supera
+:func:`mortality.schema.memory_ceiling`, para poder usarlo como
+verificación en integración continua.
+
+Uso::
+
+    python -m benchmarks.bench_memory
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.schema import memory_ceiling  # noqa: E402
+
+
+def main():
+    import app as dashboard
+
+    df = dashboard.df_mortality
+    used = int(df.memory_usage(deep=True, index=False).sum())
+    ceiling = memory_ceiling(len(df))
+    print(f"df_mortality: {len(df):,} registros, {used:,} bytes "
+          f"({used / max(len(df), 1):.1f} B/registro), techo {ceiling:,} bytes")
+    if used > ceiling:
+        print("ERROR: df_mortality supera el techo de memoria")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
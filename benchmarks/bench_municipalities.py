@@ -0,0 +1,114 @@
+"""Búsqueda de municipios del filtro: recorrido de nombres vs. índice de prefijos.
+
+Simula lo que se escribe en el dropdown de municipio (los primeros 1 a 8
+caracteres del nombre de un municipio, sin tildes y en minúsculas, a veces
+dos palabras) y compara la forma directa (normalizar la búsqueda y
+recorrer los ~1.100 nombres comparando palabra por palabra) con
+:class:`~mortality.municipalities.MunicipalityIndex`, sin filtro de
+departamento y limitado a departamentos al azar. Informa también los bytes
+de las opciones: todas en el layout frente a las de cada búsqueda.
+
+Con ``--check`` verifica que ambos caminos devuelven los mismos municipios.
+
+Uso::
+
+    python -m benchmarks.bench_municipalities --queries 2000 --check
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.dataset import load_reference  # noqa: E402
+from mortality.filters import ALL  # noqa: E402
+from mortality.municipalities import LIMIT, search_words  # noqa: E402
+
+
+def random_query(rng, names):
+    words = search_words(rng.choice(names))
+    start = rng.randrange(len(words))
+    text = words[start][:rng.randint(1, 8)]
+    if start + 1 < len(words) and rng.random() < 0.3:
+        text = f'{words[start]} {words[start + 1][:rng.randint(1, 4)]}'
+    return text.lower()
+
+
+def scan(index, name_words, text, departamento):
+    """Forma directa: todas las palabras buscadas como prefijo de alguna palabra del nombre."""
+    wanted = search_words(text)
+    departments = None if departamento == ALL else set(departamento)
+    ids = [i for i, words in enumerate(name_words)
+           if (departments is None or index.departments[i] in departments)
+           and all(any(word.startswith(w) for word in words) for w in wanted)]
+    return np.asarray(ids[:LIMIT], dtype=np.int64)
+
+
+def summarize(samples):
+    us = np.asarray(samples) * 1e6
+    return {'p50_us': float(np.percentile(us, 50)), 'p99_us': float(np.percentile(us, 99)),
+            'mean_us': float(us.mean())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Búsqueda de municipios: recorrido vs. índice de prefijos')
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--check', action='store_true', help='verificar que ambos caminos coinciden')
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    reference = load_reference()
+    index = reference.municipality_index
+    names = [str(name) for name in index.names]
+    name_words = [text.split() for text in index.search_text]
+    departments = sorted(set(index.departments.tolist()))
+
+    rng = random.Random(args.seed)
+    queries = [(random_query(rng, names),
+                ALL if rng.random() < 0.5 else rng.sample(departments, rng.randint(1, 3)))
+               for _ in range(args.queries)]
+
+    timings = {'recorrido': [], 'índice': []}
+    mismatches = 0
+    for text, departamento in queries:
+        start = time.perf_counter()
+        expected = scan(index, name_words, text, departamento)
+        timings['recorrido'].append(time.perf_counter() - start)
+        start = time.perf_counter()
+        found = index.search(text, departamento)
+        timings['índice'].append(time.perf_counter() - start)
+        if args.check and not np.array_equal(expected, found):
+            mismatches += 1
+
+    all_options = len(json.dumps(index.options(np.arange(len(index))), ensure_ascii=False).encode('utf-8'))
+    per_search = np.mean([len(json.dumps(index.options(index.search(text, departamento)),
+                                         ensure_ascii=False).encode('utf-8')) for text, departamento in queries])
+    results = {
+        'municipalities': len(index),
+        'queries': len(queries),
+        'timings': {name: summarize(samples) for name, samples in timings.items()},
+        'options_bytes': {'layout': all_options, 'per_search': float(per_search)},
+    }
+
+    print(f"{len(index)} municipios, {len(queries)} búsquedas")
+    for name, stats in results['timings'].items():
+        print(f"{name:<10} p50 {stats['p50_us']:9.1f} µs  p99 {stats['p99_us']:9.1f} µs")
+    print(f"opciones: {all_options:,} B todas en el layout, {per_search:,.0f} B por búsqueda (media)")
+    if args.check:
+        print(f"diferencias: {mismatches}")
+        results['mismatches'] = mismatches
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+    if args.check and mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+"""Suite de rendimiento reproducible sobre datos sintéticos de varios tamaños.
+
+Para cada tamaño de :data:`benchmarks.synthetic.SIZES` genera (una sola vez,
+con ``--seed``) un Anexo1 sintético en ``data/synthetic/<tamaño>/``, junto a
+enlaces al Anexo2 y la Divipola reales, y mide la aplicación en un proceso
+nuevo que apunta ``MORTALIDAD_ANEXOS_DIR`` a esa carpeta:
+
+- arranque en frío (sin caché columnar) y en caliente (con la caché ya
+  escrita): tiempo de ``import app`` y tiempos por fase de
+  :mod:`mortality.metrics` (lectura, compactación, cubo, ...)
+- arranque con carga en segundo plano (``MORTALIDAD_BACKGROUND_LOAD=1``):
+  cuándo responde ``/healthz`` y cuándo ``/readyz`` queda listo
+- perfil de importación (``python -X importtime``): los módulos con mayor
+  tiempo acumulado
+- memoria: RSS máximo del proceso y bytes de ``df_mortality``
+- callbacks: ``update_dashboard`` (sin caché de resultados ni precalculado),
+  cada función ``build_*`` de app.py y la tabla de causas (``causes_page``:
+  primera página de una selección nueva; ``causes_search``: página ordenada
+  por descripción con búsqueda sobre el ranking ya calculado), sobre las
+  mismas combinaciones aleatorias de filtros; se informan p50/p95/p99,
+  media y máximo en ms
+
+Los resultados (con el commit, las versiones y la semilla) se escriben en
+JSON para compararlos entre ramas con ``--compare``.
+
+Uso::
+
+    python -m benchmarks.bench_suite --sizes 244k 2.5m --output resultados.json
+    python -m benchmarks.bench_suite --compare base.json resultados.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import synthetic  # noqa: E402
+from mortality import config  # noqa: E402
+
+BUILDERS = ('build_stats', 'build_map', 'build_line_chart', 'build_violent_cities',
+            'build_low_mortality_cities', 'build_stacked_sex_chart', 'build_age_histogram')
+
+# Búsqueda de la tabla de causas que se mide sobre el ranking ya calculado
+CAUSES_SEARCH = {'sort_by': [{'column_id': 'causa', 'direction': 'asc'}],
+                 'filter_query': '{causa} icontains "tumor malig" && {total} > 1'}
+
+# Módulos del perfil de importación que se guardan
+IMPORT_PROFILE_TOP = 25
+
+# Métricas que --compare contrasta (menor es mejor)
+COMPARED = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+def summarize(samples):
+    """Percentiles y media de una lista de tiempos en segundos, en ms."""
+    ms = np.asarray(samples) * 1e3
+    return {
+        'n': len(ms),
+        'p50_ms': round(float(np.percentile(ms, 50)), 3),
+        'p95_ms': round(float(np.percentile(ms, 95)), 3),
+        'p99_ms': round(float(np.percentile(ms, 99)), 3),
+        'mean_ms': round(float(ms.mean()), 3),
+        'max_ms': round(float(ms.max()), 3),
+    }
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def run_child(combos, seed):
+    """Importa la aplicación en este proceso, mide y imprime los resultados en JSON."""
+    start = time.perf_counter()
+    import app as dashboard
+    import_seconds = time.perf_counter() - start
+
+    from mortality.metrics import REGISTRY
+    startup = {}
+    for (phase, *labels), seconds in sorted(REGISTRY.startup.items()):
+        name = '/'.join([phase] + [str(value) for _, value in labels])
+        startup[name] = round(seconds, 4)
+
+    df = dashboard.df_mortality
+    result = {
+        'rows': len(df),
+        'import_seconds': round(import_seconds, 3),
+        'startup_seconds': startup,
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'frame_bytes': int(df.memory_usage(deep=True, index=False).sum()),
+        'cube_cells': len(dashboard.dataset.cube.counts),
+    }
+
+    if combos:
+        sample = random.Random(seed).sample(dashboard.filter_combinations(), combos)
+        timings = {name: [] for name in ('update_dashboard', 'select') + BUILDERS + ('causes_page', 'causes_search')}
+        for combo in sample:
+            timings['update_dashboard'].append(_timed(dashboard.update_dashboard, *combo))
+            timings['select'].append(_timed(dashboard.select, *combo))
+            timings['causes_page'].append(_timed(dashboard.causes_page, *combo))
+            start = time.perf_counter()
+            dashboard.causes_page(*combo, page=1, **CAUSES_SEARCH)
+            timings['causes_search'].append(time.perf_counter() - start)
+            for name in BUILDERS:
+                # Conteos nuevos por función: cada una paga sus propias sumas
+                agg = dashboard.select(*combo)
+                timings[name].append(_timed(getattr(dashboard, name), agg))
+        result['callbacks'] = {name: summarize(samples) for name, samples in timings.items()}
+        result['max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps(result))
+
+
+def run_background_child():
+    """Mide cuándo atiende /healthz y cuándo queda listo /readyz con carga en segundo plano."""
+    start = time.perf_counter()
+    import app as dashboard
+    client = dashboard.app.server.test_client()
+    healthz = client.get('/healthz')
+    healthz_seconds = time.perf_counter() - start
+    dashboard.loader.wait()
+    ready_seconds = time.perf_counter() - start
+    print(json.dumps({
+        'healthz_status': healthz.status_code,
+        'healthz_seconds': round(healthz_seconds, 3),
+        'ready_seconds': round(ready_seconds, 3),
+        'load_seconds': round(dashboard.loader.seconds, 3),
+    }))
+
+
+def import_profile(stderr, top=IMPORT_PROFILE_TOP):
+    """Módulos con mayor tiempo acumulado en la salida de ``-X importtime`` (en ms)."""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({'module': name.strip(), 'self_ms': round(int(self_us) / 1e3, 2),
+                        'cumulative_ms': round(int(cumulative_us) / 1e3, 2)})
+    modules.sort(key=lambda row: row['cumulative_ms'], reverse=True)
+    return modules[:top]
+
+
+def prepare(size, workdir, seed):
+    """Carpeta de anexos con el Anexo1 sintético de ``size`` (se genera si falta)."""
+    anexos = os.path.join(workdir, size)
+    target = os.path.join(anexos, 'nofetal2019.csv')
+    os.makedirs(anexos, exist_ok=True)
+    for source in (config.CODES_FILE, config.DIVIPOLA_FILE):
+        link = os.path.join(anexos, os.path.basename(source))
+        if not os.path.exists(link):
+            try:
+                os.symlink(os.path.abspath(source), link)
+            except OSError:
+                shutil.copyfile(source, link)
+    stamp = os.path.join(anexos, 'seed.txt')
+    previous = open(stamp).read().strip() if os.path.exists(stamp) else None
+    if not os.path.exists(target) or previous != str(seed):
+        print(f"Generando {synthetic.SIZES[size]:,} registros sintéticos en {target}")
+        synthetic.write(target, synthetic.SIZES[size], seed=seed)
+        with open(stamp, 'w') as fh:
+            fh.write(str(seed))
+        shutil.rmtree(os.path.join(anexos, 'cache'), ignore_errors=True)
+    return anexos
+
+
+def _environment(anexos, background=False):
+    return dict(os.environ,
+                MORTALIDAD_ANEXOS_DIR=anexos,
+                MORTALIDAD_CACHE_DIR=os.path.join(anexos, 'cache'),
+                MORTALIDAD_RESULT_CACHE='off',
+                MORTALIDAD_PRERENDER_PATH='',
+                MORTALIDAD_CLIENTSIDE='0',
+                MORTALIDAD_BACKGROUND_LOAD='1' if background else '0')
+
+
+def measure(anexos, combos, seed, cold):
+    """Corre la aplicación sobre ``anexos`` en un proceso nuevo."""
+    if cold:
+        shutil.rmtree(os.path.join(anexos, 'cache'), ignore_errors=True)
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_suite', '--child', '--combos', str(combos),
+         '--seed', str(seed)],
+        cwd=ROOT, env=_environment(anexos), check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_background(anexos):
+    """Arranque con carga en segundo plano (con la caché columnar ya escrita)."""
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_suite', '--child-background'],
+        cwd=ROOT, env=_environment(anexos, background=True), check=True, capture_output=True, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_imports(anexos):
+    """Perfil de ``import app`` con ``-X importtime``."""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import app'],
+        cwd=ROOT, env=_environment(anexos), check=True, capture_output=True, text=True,
+    ).stderr
+    return import_profile(stderr)
+
+
+def metadata(seed, combos):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    import dash
+    import pandas as pd
+    import plotly
+    return {
+        'commit': commit,
+        'date': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'seed': seed,
+        'combos': combos,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'versions': {'numpy': np.__version__, 'pandas': pd.__version__,
+                     'dash': dash.__version__, 'plotly': plotly.__version__},
+    }
+
+
+def compare(base_path, new_path):
+    """Imprime la razón nuevo/base de cada métrica; código 1 si algo empeoró más de un 20 %."""
+    with open(base_path, encoding='utf-8') as fh:
+        base = json.load(fh)
+    with open(new_path, encoding='utf-8') as fh:
+        new = json.load(fh)
+    worse = False
+    print(f"{'tamaño':<8}{'métrica':<40}{'base':>12}{'nuevo':>12}{'razón':>8}")
+    for size, run in new['sizes'].items():
+        old = base['sizes'].get(size)
+        if old is None:
+            continue
+        rows = [('arranque en frío s', old['cold']['import_seconds'], run['cold']['import_seconds']),
+                ('arranque en caliente s', old['warm']['import_seconds'], run['warm']['import_seconds']),
+                ('RSS máximo MB', old['warm']['max_rss_bytes'] / 1e6, run['warm']['max_rss_bytes'] / 1e6)]
+        if 'background' in old and 'background' in run:
+            rows.append(('/healthz en segundo plano s', old['background']['healthz_seconds'],
+                         run['background']['healthz_seconds']))
+        for name, stats in run['warm'].get('callbacks', {}).items():
+            previous = old['warm'].get('callbacks', {}).get(name)
+            if previous is not None:
+                rows.extend((f'{name} {metric}', previous[metric], stats[metric]) for metric in COMPARED)
+        for name, before, after in rows:
+            ratio = after / before if before else float('nan')
+            worse |= ratio > 1.2
+            print(f"{size:<8}{name:<40}{before:>12.2f}{after:>12.2f}{ratio:>8.2f}")
+    return 1 if worse else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Suite de rendimiento sobre datos sintéticos')
+    parser.add_argument('--sizes', nargs='+', default=['244k'], choices=list(synthetic.SIZES))
+    parser.add_argument('--combos', type=int, default=50,
+                        help='combinaciones de filtros por tamaño')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workdir', default=os.path.join(ROOT, 'data', 'synthetic'))
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NUEVO'),
+                        help='comparar dos archivos de resultados')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--child-background', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(args.combos, args.seed)
+        return 0
+    if args.child_background:
+        run_background_child()
+        return 0
+    if args.compare:
+        return compare(*args.compare)
+
+    results = {'meta': metadata(args.seed, args.combos), 'sizes': {}}
+    for size in args.sizes:
+        anexos = prepare(size, args.workdir, args.seed)
+        cold = measure(anexos, 0, args.seed, cold=True)
+        warm = measure(anexos, args.combos, args.seed, cold=False)
+        background = measure_background(anexos)
+        imports = measure_imports(anexos)
+        results['sizes'][size] = {'cold': cold, 'warm': warm, 'background': background,
+                                  'import_profile': imports}
+
+        print(f"{size}: {warm['rows']:,} registros, {warm['cube_cells']:,} celdas del cubo, "
+              f"df_mortality {warm['frame_bytes'] / 1e6:.1f} MB, RSS máximo {warm['max_rss_bytes'] / 1e6:.0f} MB")
+        print(f"  arranque: {cold['import_seconds']:.1f} s en frío, {warm['import_seconds']:.1f} s en caliente")
+        print(f"  en segundo plano: /healthz a los {background['healthz_seconds']:.2f} s, "
+              f"/readyz a los {background['ready_seconds']:.2f} s")
+        print("  importaciones más lentas (ms acumulados): " +
+              ', '.join(f"{row['module']} {row['cumulative_ms']:.0f}" for row in imports[1:6]))
+        print(f"  {'función':<28}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'media ms':>10}")
+        for name, stats in warm['callbacks'].items():
+            print(f"  {name:<28}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+                  f"{stats['p99_ms']:>10.2f}{stats['mean_ms']:>10.2f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Bytes en la red por salida: JSON sin comprimir vs. gzip/brotli y 304.
+
+Hace solicitudes reales a ``_dash-update-component`` (cliente de pruebas de
+Flask) para combinaciones aleatorias de filtros y reparte la respuesta del
+callback del tablero por salida (``total-muertes``, ``mapa-departamentos``,
+etc.), midiendo cada una sin comprimir, con gzip y con brotli (si está
+instalado). Mide también la respuesta completa tal como viaja (con y sin
+``Accept-Encoding``), la repetición con ``If-None-Match`` (304) y las
+respuestas de la página (``/``, ``_dash-layout`` y ``_dash-dependencies``).
+
+Uso::
+
+    python -m benchmarks.bench_wire --combos 50 --output resultados.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.responses import compress, encodings  # noqa: E402
+
+FILTER_IDS = ('departamento-filter', 'sexo-filter', 'edad-filter', 'anio-filter', 'municipio-filter')
+
+
+def callback_body(dependencies, values):
+    """Cuerpo de la solicitud que envía el navegador para el callback del tablero."""
+    dependency = next(d for d in dependencies if 'total-muertes.children' in d['output'])
+    outputs = [dict(zip(('id', 'property'), output.rsplit('.', 1)))
+               for output in dependency['output'].strip('.').split('...')]
+    return {
+        'output': dependency['output'],
+        'outputs': outputs,
+        'inputs': [{'id': id_, 'property': 'value', 'value': value} for id_, value in zip(FILTER_IDS, values)],
+        'changedPropIds': [f'{FILTER_IDS[0]}.value'],
+        'state': [],
+    }
+
+
+def sizes(data):
+    result = {'identity': len(data)}
+    for encoding in encodings():
+        result[encoding] = len(compress(data, encoding))
+    return result
+
+
+def mean(values):
+    return float(np.mean(values)) if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Bytes por salida con y sin compresión')
+    parser.add_argument('--combos', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    import app as dashboard
+
+    client = dashboard.app.server.test_client()
+    prefix = dashboard.app.config.routes_pathname_prefix
+    accept = {'Accept-Encoding': ', '.join(encodings())}
+    dependencies = client.get(prefix + '_dash-dependencies').get_json()
+
+    rng = random.Random(args.seed)
+    combos = rng.sample(dashboard.filter_combinations(), min(args.combos, len(dashboard.filter_combinations())))
+
+    per_output, totals = {}, {'identity': [], 'wire': [], 'not_modified': []}
+    for departamento, sexo, edad, year in combos:
+        body = callback_body(dependencies, [
+            [] if departamento == 'all' else [departamento],
+            [] if sexo == 'all' else [sexo],
+            [] if edad == 'all' else [int(edad)],
+            int(year),
+            [],
+        ])
+        plain = client.post(prefix + '_dash-update-component', json=body)
+        wire = client.post(prefix + '_dash-update-component', json=body, headers=accept)
+        repeat = client.post(prefix + '_dash-update-component', json=body,
+                             headers=dict(accept, **{'If-None-Match': wire.headers.get('ETag', '')}))
+        totals['identity'].append(len(plain.data))
+        totals['wire'].append(len(wire.data))
+        totals['not_modified'].append(len(repeat.data) if repeat.status_code == 304 else len(wire.data))
+
+        for component, props in plain.get_json()['response'].items():
+            for prop, value in props.items():
+                data = json.dumps(value, separators=(',', ':')).encode('utf-8')
+                for encoding, size in sizes(data).items():
+                    per_output.setdefault(f'{component}.{prop}', {}).setdefault(encoding, []).append(size)
+
+    results = {'encodings': list(encodings()), 'combos': len(combos), 'outputs': {}, 'page': {}}
+    columns = ('identity',) + encodings()
+    print(f"{'salida':<38}" + ''.join(f'{name + " B":>12}' for name in columns))
+    for output, by_encoding in per_output.items():
+        results['outputs'][output] = {encoding: mean(values) for encoding, values in by_encoding.items()}
+        print(f'{output:<38}' + ''.join(f'{results["outputs"][output][e]:>12,.0f}' for e in columns))
+
+    results['callback'] = {name: mean(values) for name, values in totals.items()}
+    print(f"\nrespuesta del callback (media): {results['callback']['identity']:,.0f} B sin comprimir, "
+          f"{results['callback']['wire']:,.0f} B comprimida, {results['callback']['not_modified']:,.0f} B al repetir (304)")
+
+    for path in ('', '_dash-layout', '_dash-dependencies'):
+        plain = client.get(prefix + path)
+        wire = client.get(prefix + path, headers=accept)
+        again = client.get(prefix + path, headers=dict(accept, **{'If-None-Match': wire.headers.get('ETag', '')}))
+        results['page'][path or '/'] = {'identity': len(plain.data), 'wire': len(wire.data),
+                                        'not_modified': len(again.data), 'status_repeat': again.status_code}
+        print(f"{path or '/':<20}{len(plain.data):>12,} B sin comprimir{len(wire.data):>10,} B comprimida"
+              f"   repetida: {again.status_code}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,191 @@
+"""Generador de datos sintéticos con la forma del Anexo1 de mortalidad del DANE.
+
+Produce registros con las columnas del Anexo1 (``COD_DEPARTAMENTO``,
+``COD_MUNICIPIO``, ``AREA_DEFUNCION``, ``AÑO``, ``MES``, ``SEXO``,
+``GRUPO_EDAD1``, ``MANERA_MUERTE``, ``COD_MUERTE``) usando solo códigos
+válidos: los municipios salen de la Divipola y las causas del catálogo
+CIE-10 del Anexo2. Las distribuciones imitan el sesgo de los datos reales:
+
+- municipios con pesos de Zipf (las capitales concentran las muertes)
+- causas con pesos de Zipf sobre el catálogo, más una proporción de
+  homicidios (``X95*``) que varía por municipio y se concentra en hombres
+  jóvenes
+- edades cargadas hacia los adultos mayores, ~56 % de hombres y algunos
+  registros de sexo indeterminado, y meses con una estacionalidad leve
+
+La generación es por bloques (memoria acotada) y reproducible con
+``--seed``. El resultado es un CSV ``nofetal<año>.csv`` que la aplicación
+descubre como cualquier otro año (ver mortality/partitions.py); Excel no
+admite más de 1.048.575 filas por hoja.
+
+Uso::
+
+    python -m benchmarks.synthetic --rows 2.5m --output data/synthetic/nofetal2019.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mortality.dataset import load_reference  # noqa: E402
+
+# Tamaños de referencia: el año 2019 real, ~10 años y ~100 años de registros
+SIZES = {
+    '244k': 244_355,
+    '2.5m': 2_500_000,
+    '25m': 25_000_000,
+}
+
+COLUMNS = ('COD_DEPARTAMENTO', 'COD_MUNICIPIO', 'AREA_DEFUNCION', 'AÑO', 'MES',
+           'SEXO', 'GRUPO_EDAD1', 'MANERA_MUERTE', 'COD_MUERTE')
+
+CHUNK_SIZE = 500_000
+
+# Pesos relativos de GRUPO_EDAD1 (0-29): pocas muertes perinatales e
+# infantiles, mínimo entre 5 y 14 años, aumento con la edad hasta los 80-89
+AGE_WEIGHTS = np.array([
+    0.3, 0.5, 0.6, 0.6, 0.8, 1.2, 0.6, 0.4, 0.3, 0.3,
+    0.4, 1.2, 2.0, 2.2, 2.4, 2.6, 3.0, 3.8, 4.8, 6.0,
+    7.2, 8.4, 9.6, 10.4, 10.8, 9.6, 6.0, 2.4, 0.8, 0.1,
+])
+
+# Homicidios: grupos de 15 a 44 años
+HOMICIDE_AGES = np.arange(11, 17)
+
+SEX_CODES = np.array([1, 2, 3])
+SEX_WEIGHTS = np.array([0.555, 0.4445, 0.0005])
+HOMICIDE_SEX_WEIGHTS = np.array([0.915, 0.085, 0.0])
+
+AREA_CODES = np.array([1, 2, 3, 9])
+AREA_WEIGHTS = np.array([0.78, 0.08, 0.13, 0.01])
+
+MANNER_CODES = np.arange(1, 8)
+MANNER_WEIGHTS = np.array([0.86, 0.04, 0.03, 0.02, 0.01, 0.01, 0.03])
+HOMICIDE_MANNER = 2
+
+# Proporción media de homicidios sobre el total de defunciones
+HOMICIDE_SHARE = 0.045
+
+
+def _normalized(weights):
+    weights = np.asarray(weights, dtype=np.float64)
+    return weights / weights.sum()
+
+
+def _zipf_weights(size, exponent, rng):
+    # Pesos de Zipf asignados a un orden aleatorio (reproducible con la semilla)
+    weights = 1.0 / np.arange(1, size + 1) ** exponent
+    return _normalized(weights[rng.permutation(size)])
+
+
+class Generator:
+    """Muestreador de registros con códigos válidos de la Divipola y el Anexo2."""
+
+    def __init__(self, reference, year=2019, seed=0):
+        rng = np.random.default_rng(seed)
+        self.year = year
+        self.seed = seed
+
+        divipola = reference.divipola[['COD_DPTO', 'COD_MUNIC']].dropna().drop_duplicates()
+        self.departments = divipola['COD_DPTO'].to_numpy(dtype=np.int64)
+        self.municipalities = divipola['COD_MUNIC'].to_numpy(dtype=np.int64)
+        if not len(self.municipalities):
+            raise ValueError('La Divipola no tiene municipios')
+        # Las capitales (municipio 001) ocupan los primeros lugares del Zipf
+        order = np.argsort(rng.random(len(self.municipalities)) - (self.municipalities == 1))
+        weights = np.empty(len(order))
+        weights[order] = 1.0 / np.arange(1, len(order) + 1) ** 1.1
+        self.municipality_weights = _normalized(weights)
+        # Proporción de homicidios por municipio (gamma con media HOMICIDE_SHARE)
+        self.homicide_share = np.minimum(rng.gamma(1.5, HOMICIDE_SHARE / 1.5, len(self.municipalities)), 0.5)
+
+        codes = reference.cause_catalog.codes
+        codes = codes[np.char.str_len(codes) == 4]
+        homicide = np.char.startswith(codes, 'X95')
+        self.causes = codes[~homicide]
+        self.homicide_causes = codes[homicide] if homicide.any() else np.array(['X954'])
+        if not len(self.causes):
+            raise ValueError('El catálogo CIE-10 no tiene códigos de cuatro caracteres')
+        self.cause_weights = _zipf_weights(len(self.causes), 1.3, rng)
+
+        month = np.arange(1, 13)
+        # Estacionalidad leve: más defunciones a mitad y a final de año
+        self.month_weights = _normalized(1 + 0.06 * np.cos((month - 6.5) * np.pi / 3))
+
+    def chunk(self, rows, rng):
+        """DataFrame de ``rows`` registros con las columnas del Anexo1."""
+        place = rng.choice(len(self.municipalities), size=rows, p=self.municipality_weights)
+        homicide = rng.random(rows) < self.homicide_share[place]
+        n_homicides = int(homicide.sum())
+
+        causes = self.causes[rng.choice(len(self.causes), size=rows, p=self.cause_weights)].astype(object)
+        causes[homicide] = rng.choice(self.homicide_causes, size=n_homicides)
+        sex = rng.choice(SEX_CODES, size=rows, p=SEX_WEIGHTS)
+        sex[homicide] = rng.choice(SEX_CODES, size=n_homicides, p=HOMICIDE_SEX_WEIGHTS)
+        age = rng.choice(len(AGE_WEIGHTS), size=rows, p=_normalized(AGE_WEIGHTS))
+        age[homicide] = rng.choice(HOMICIDE_AGES, size=n_homicides)
+        manner = rng.choice(MANNER_CODES, size=rows, p=MANNER_WEIGHTS)
+        manner[homicide] = HOMICIDE_MANNER
+
+        return pd.DataFrame({
+            'COD_DEPARTAMENTO': self.departments[place],
+            'COD_MUNICIPIO': self.municipalities[place],
+            'AREA_DEFUNCION': rng.choice(AREA_CODES, size=rows, p=AREA_WEIGHTS),
+            'AÑO': np.full(rows, self.year),
+            'MES': rng.choice(np.arange(1, 13), size=rows, p=self.month_weights),
+            'SEXO': sex,
+            'GRUPO_EDAD1': age,
+            'MANERA_MUERTE': manner,
+            'COD_MUERTE': causes,
+        }, columns=list(COLUMNS))
+
+    def chunks(self, rows, chunk_size=CHUNK_SIZE):
+        """Bloques de a lo sumo ``chunk_size`` registros que suman ``rows``."""
+        rng = np.random.default_rng([self.seed, self.year])
+        for start in range(0, rows, chunk_size):
+            yield self.chunk(min(chunk_size, rows - start), rng)
+
+
+def parse_rows(value):
+    """Número de filas: un tamaño de :data:`SIZES` (``'2.5m'``) o un entero."""
+    if value.lower() in SIZES:
+        return SIZES[value.lower()]
+    return int(float(value.replace('_', '')))
+
+
+def write(path, rows, reference=None, year=2019, seed=0, chunk_size=CHUNK_SIZE):
+    """Escribe ``rows`` registros sintéticos en ``path`` (CSV) y devuelve la ruta."""
+    generator = Generator(reference or load_reference(), year=year, seed=seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8', newline='') as fh:
+        for i, chunk in enumerate(generator.chunks(rows, chunk_size)):
+            chunk.to_csv(fh, header=i == 0, index=False)
+    os.replace(tmp, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Anexo1 sintético con códigos DANE válidos')
+    parser.add_argument('--rows', default='244k', help=f"filas: {', '.join(SIZES)} o un entero")
+    parser.add_argument('--year', type=int, default=2019)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='archivo CSV (por defecto data/synthetic/nofetal<año>.csv)')
+    args = parser.parse_args(argv)
+
+    rows = parse_rows(args.rows)
+    output = args.output or os.path.join('data', 'synthetic', f'nofetal{args.year}.csv')
+    start = time.perf_counter()
+    write(output, rows, year=args.year, seed=args.seed)
+    print(f"{output}: {rows:,} registros en {time.perf_counter() - start:.1f} s "
+          f"({os.path.getsize(output) / 1e6:,.0f} MB)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""PSS/USS por proceso de gunicorn, con y sin modo preload.
+
+Lee ``/proc/<pid>/smaps_rollup`` (Linux) del maestro y de cada worker:
+
+* RSS: páginas residentes, contando las compartidas completas.
+* PSS: páginas compartidas repartidas entre los procesos que las usan.
+* USS: páginas privadas del proceso (lo que se liberaría al terminarlo).
+
+Si el modo preload funciona, el USS de cada worker es pequeño frente a su
+RSS y la suma de PSS es mucho menor que la suma de RSS.
+
+Uso::
+
+    # Medir un gunicorn que ya está corriendo
+    python -m benchmarks.worker_memory --pid <pid del maestro>
+
+    # Levantar gunicorn con y sin preload y comparar
+    python -m benchmarks.worker_memory --spawn --workers 3
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_rollup(pid):
+    """Campos de smaps_rollup en kB."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as fh:
+        for line in fh:
+            parts = line.split()
+            if len(parts) >= 3 and parts[-1] == 'kB':
+                values[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss_kb': values.get('Rss', 0),
+        'pss_kb': values.get('Pss', 0),
+        'uss_kb': values.get('Private_Clean', 0) + values.get('Private_Dirty', 0),
+        'shared_kb': values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0),
+    }
+
+
+def children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as fh:
+            return [int(p) for p in fh.read().split()]
+    except FileNotFoundError:
+        return []
+
+
+def measure(master_pid):
+    rows = [{'pid': master_pid, 'role': 'master', **read_rollup(master_pid)}]
+    for pid in children(master_pid):
+        rows.append({'pid': pid, 'role': 'worker', **read_rollup(pid)})
+    return rows
+
+
+def print_table(title, rows):
+    print(title)
+    print(f"{'pid':>8} {'rol':>7} {'RSS MB':>9} {'PSS MB':>9} {'USS MB':>9}")
+    for row in rows:
+        print(f"{row['pid']:>8} {row['role']:>7} {row['rss_kb'] / 1024:>9.1f} "
+              f"{row['pss_kb'] / 1024:>9.1f} {row['uss_kb'] / 1024:>9.1f}")
+    total_pss = sum(r['pss_kb'] for r in rows) / 1024
+    total_rss = sum(r['rss_kb'] for r in rows) / 1024
+    print(f"{'total':>16} {total_rss:>9.1f} {total_pss:>9.1f}\n")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_and_measure(preload, workers, timeout):
+    port = _free_port()
+    env = dict(os.environ, MORTALIDAD_PRELOAD='1' if preload else '0', WEB_CONCURRENCY=str(workers))
+    proc = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--bind', f'127.0.0.1:{port}', 'wsgi:application'],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = time.time() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(f'http://127.0.0.1:{port}/', timeout=5).read()
+                if len(children(proc.pid)) >= workers:
+                    break
+            except OSError:
+                pass
+            if time.time() > deadline or proc.poll() is not None:
+                raise RuntimeError('gunicorn no respondió a tiempo')
+            time.sleep(0.5)
+        # Algunas solicitudes para que cada worker toque los datos
+        for _ in range(workers * 4):
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/_dash-layout', timeout=30).read()
+        time.sleep(1)
+        return measure(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='PSS/USS de los procesos de gunicorn')
+    parser.add_argument('--pid', type=int, help='PID del maestro de gunicorn a medir')
+    parser.add_argument('--spawn', action='store_true', help='levantar gunicorn con y sin preload')
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=300)
+    parser.add_argument('--output', help='archivo JSON donde guardar los resultados')
+    args = parser.parse_args(argv)
+
+    results = {}
+    if args.pid:
+        results['running'] = measure(args.pid)
+        print_table(f'gunicorn (pid {args.pid})', results['running'])
+    if args.spawn:
+        for preload in (False, True):
+            name = 'preload' if preload else 'sin-preload'
+            results[name] = spawn_and_measure(preload, args.workers, args.timeout)
+            print_table(f'{name} ({args.workers} workers)', results[name])
+    if not results:
+        parser.error('indique --pid o --spawn')
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == '__main__':
+    main()
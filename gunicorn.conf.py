@@ -0,0 +1,34 @@
+"""Configuración de gunicorn (se carga automáticamente desde el directorio de trabajo).
+
+Con ``MORTALIDAD_PRELOAD=1`` (valor por defecto) el maestro importa
+``wsgi:application`` -y con ello carga los datos- antes de crear los
+workers, que comparten esas páginas de memoria por copy-on-write. El
+recolector de basura se desactiva durante la carga y los objetos cargados
+se congelan antes del fork para que los workers no escriban en ellos.
+
+Con ``MORTALIDAD_BACKGROUND_LOAD=1`` no hay preload: el hilo de carga no
+sobreviviría al fork, así que cada worker carga sus datos en segundo plano
+mientras ya atiende ``/healthz`` (ver mortality/readiness.py).
+"""
+import gc
+import os
+
+from mortality.config import BACKGROUND_LOAD, PRELOAD
+
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+preload_app = PRELOAD and not BACKGROUND_LOAD
+
+if preload_app:
+    gc.disable()
+
+
+def when_ready(server):
+    # El maestro ya importó la aplicación; se congela antes del primer fork
+    if preload_app:
+        from mortality.dataset import freeze
+        freeze()
+
+
+def post_fork(server, worker):
+    if preload_app:
+        gc.enable()
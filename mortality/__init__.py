@@ -0,0 +1 @@
+"""Capa de datos del tablero de mortalidad en Colombia."""
@@ -0,0 +1,119 @@
+"""Conteos intermedios compartidos por las salidas del tablero.
+
+Un cambio en los filtros del Panel de Control actualiza todas las gráficas
+a la vez. :class:`SelectionAggregates` agrupa los conteos que necesitan
+esas gráficas para una selección (departamento, municipio, sexo, edad); cada conteo
+se calcula la primera vez que se pide y se reutiliza en el resto de la
+misma solicitud.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from mortality.cube import COUNT
+from mortality.filters import ALL
+from mortality.labels import count_by_age_group
+from mortality.municipalities import DIMENSION as MUNICIPALITY_DIMENSION, municipality_keys
+
+
+class SelectionAggregates:
+    """Conteos de una selección de filtros, calculados a demanda."""
+
+    def __init__(self, cube, departamento=ALL, sexo=ALL, edad=ALL, homicide_cells=None, year=None,
+                 municipio=ALL):
+        self.cube = cube
+        self.year = year
+        self.departamento = departamento
+        self.sexo = sexo
+        self.edad = edad
+        self.municipio = municipio
+        self.homicide_cells = homicide_cells
+
+    @property
+    def selection(self):
+        return self.departamento, self.sexo, self.edad
+
+    @cached_property
+    def municipality_cells(self):
+        # Máscara de celdas del filtro de municipio (None si no filtra). No es una
+        # dimensión de filtro del cubo, así que estas consultas no usan rollups.
+        keys = municipality_keys(self.municipio)
+        if keys is ALL:
+            return None
+        labels = np.asarray(self.cube.labels[MUNICIPALITY_DIMENSION], dtype=np.int64)
+        return self.cube.cells_where(MUNICIPALITY_DIMENSION, np.isin(labels, keys))
+
+    def count(self, by, where=None):
+        """Conteos por ``by`` (dimensiones del cubo) para esta selección."""
+        cells = self.municipality_cells
+        if cells is not None:
+            where = cells if where is None else where & cells
+        return self.cube.count(by, *self.selection, where=where)
+
+    @cached_property
+    def total(self):
+        if self.municipality_cells is not None:
+            return int(self.count([])[COUNT].iloc[0])
+        return self.cube.total(*self.selection)
+
+    @cached_property
+    def by_sex(self):
+        return self.count(['SEXO']).set_index('SEXO')[COUNT]
+
+    @cached_property
+    def by_department(self):
+        return self.count(['COD_DPTO'])
+
+    @cached_property
+    def by_department_all(self):
+        # El mapa muestra todos los departamentos aunque haya uno (o un municipio) seleccionado
+        return self.cube.count(['COD_DPTO'], ALL, self.sexo, self.edad)
+
+    @cached_property
+    def by_department_sex(self):
+        return self.count(['COD_DPTO', 'SEXO'])
+
+    @cached_property
+    def by_month(self):
+        return self.count(['MES'])
+
+    @cached_property
+    def by_municipality(self):
+        return self.count(['COD_DPTO', 'COD_MUNIC'])
+
+    @cached_property
+    def by_municipality_all(self):
+        # Capa de municipios del mapa (todos los departamentos, como by_department_all)
+        return self.cube.count(['COD_DPTO', 'COD_MUNIC'], ALL, self.sexo, self.edad)
+
+    def by_municipality_where(self, cells):
+        """Defunciones por municipio dentro de una máscara de celdas (p. ej. una familia de causas)."""
+        return self.count(['COD_DPTO', 'COD_MUNIC'], where=cells)
+
+    @cached_property
+    def homicides_by_municipality(self):
+        return self.by_municipality_where(self.homicide_cells)
+
+    @cached_property
+    def by_cause(self):
+        return self.count(['CAUSA_DEFUNCION'])
+
+    @cached_property
+    def cause_totals(self):
+        # Conteos por causa alineados con las etiquetas del cubo (ver mortality/cause_table.py)
+        labels = self.cube.labels['CAUSA_DEFUNCION']
+        causes = self.by_cause
+        totals = np.zeros(len(labels), dtype=np.int64)
+        totals[pd.Index(labels).get_indexer(causes['CAUSA_DEFUNCION'])] = causes[COUNT].to_numpy()
+        return totals
+
+    @cached_property
+    def by_age_code(self):
+        return self.count(['GRUPO_EDAD1'])
+
+    @cached_property
+    def by_age_group(self):
+        # Arreglo alineado con labels.AGE_GROUPS
+        ages = self.by_age_code
+        return count_by_age_group(ages['GRUPO_EDAD1'].to_numpy(), ages[COUNT].to_numpy())
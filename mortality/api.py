@@ -0,0 +1,163 @@
+"""API de solo lectura con los conteos del tablero.
+
+Otros equipos necesitan los mismos números que muestran las gráficas sin
+pasar por los callbacks de Dash (que arman figuras de Plotly). ``/api/v1/counts``
+devuelve conteos de defunciones agrupados por cualquier subconjunto de las
+dimensiones del cubo, con los mismos filtros del Panel de Control y el mismo
+motor (:class:`~mortality.aggregates.SelectionAggregates`) y caché de
+resultados que el tablero::
+
+    /api/v1/counts?by=dpto,sexo&edad=25&edad=26&departamento=ANTIOQUIA&anio=2019
+
+- ``by``: dimensiones separadas por coma (ver :data:`DIMENSIONS`); vacío
+  para el total. ``munic`` requiere ``dpto`` (el código de municipio se
+  repite entre departamentos); ``municipio`` es el código DIVIPOLA
+  completo (``departamento * 1000 + municipio``).
+- ``departamento``, ``sexo``, ``edad``, ``municipio``: filtros, con el
+  parámetro repetido para varios valores (los nombres de departamento
+  pueden tener comas). ``sexo``, ``edad`` y ``municipio`` también aceptan
+  valores separados por coma; ``municipio`` lleva códigos DIVIPOLA de cinco
+  dígitos, como el filtro del tablero (ver mortality/municipalities.py).
+- ``anio``: año (por defecto el del tablero); 400 si no está disponible.
+- ``format``: ``json`` (por defecto) o ``arrow``. También se puede pedir
+  Arrow con ``Accept: application/vnd.apache.arrow.stream``.
+
+La respuesta JSON es columnar: ``data`` tiene un arreglo por dimensión más
+``count``. En Arrow se envía la misma tabla en el formato IPC de streaming,
+con el año y la versión de los datos en los metadatos del esquema; requiere
+el paquete opcional ``pyarrow`` (406 si no está instalado).
+"""
+import json
+
+import flask
+
+from mortality.cube import COUNT
+from mortality.filters import ALL, canonical, normalize
+from mortality.municipalities import DIMENSION as MUNICIPALITY_DIMENSION
+
+try:
+    import pyarrow as pa
+except ImportError:  # opcional: sin él solo se sirve JSON
+    pa = None
+
+FORMAT_VERSION = 2
+
+# Nombre en la API -> dimensión del cubo
+DIMENSIONS = {
+    'departamento': 'NOM_DPTO',
+    'dpto': 'COD_DPTO',
+    'munic': 'COD_MUNIC',
+    'municipio': MUNICIPALITY_DIMENSION,
+    'sexo': 'SEXO',
+    'edad': 'GRUPO_EDAD1',
+    'mes': 'MES',
+    'causa': 'CAUSA_DEFUNCION',
+}
+
+ARROW_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+
+class ApiError(ValueError):
+    """Parámetros inválidos (respuesta 400)."""
+
+
+def parse_by(value):
+    """Dimensiones pedidas en ``by``, sin repetir y en el orden dado."""
+    names = []
+    for name in (value or '').split(','):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in DIMENSIONS:
+            raise ApiError(f"Dimensión desconocida '{name}'; válidas: {', '.join(DIMENSIONS)}")
+        names.append(name)
+    if 'munic' in names and 'dpto' not in names:
+        raise ApiError("'munic' requiere agrupar también por 'dpto'")
+    return names
+
+
+def _values(args, name, split=True):
+    values = args.getlist(name)
+    if split:
+        values = [v.strip() for value in values for v in value.split(',')]
+    return canonical([v for v in values if v != ''])
+
+
+def _municipalities(args):
+    # Códigos DIVIPOLA de municipio, como los valores del filtro del tablero
+    values = _values(args, 'municipio')
+    keys = normalize(values)
+    for key in () if keys == ALL else keys:
+        if not key.isdigit():
+            raise ApiError(f"Código de municipio inválido '{key}'; se esperan códigos DIVIPOLA como 05001")
+    return values
+
+
+def payload(agg, by, version):
+    """Respuesta de ``/counts`` para la selección ``agg``: conteos por ``by`` (nombres de la API), en columnas."""
+    frame = agg.count([DIMENSIONS[name] for name in by])
+    data = {name: frame[DIMENSIONS[name]].tolist() for name in by}
+    data['count'] = frame[COUNT].tolist()
+    return {
+        'year': agg.year,
+        'version': version,
+        'by': by,
+        'filters': dict(zip(('departamento', 'sexo', 'edad', 'municipio'), (*agg.selection, agg.municipio))),
+        'data': data,
+    }
+
+
+def to_arrow(payload):
+    """Tabla de ``payload`` en el formato IPC de streaming de Arrow."""
+    metadata = {'year': str(payload['year']), 'version': payload['version'],
+                'filters': json.dumps(payload['filters'], ensure_ascii=False)}
+    table = pa.table(payload['data']).replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _wants_arrow(request):
+    requested = request.args.get('format')
+    if requested is not None:
+        if requested not in ('json', 'arrow'):
+            raise ApiError("format debe ser 'json' o 'arrow'")
+        return requested == 'arrow'
+    return request.accept_mimetypes[ARROW_MIMETYPE] > request.accept_mimetypes['application/json']
+
+
+def install(server, query, years, prefix='/api/v1'):
+    """Publica ``<prefix>/counts``.
+
+    ``query(by, departamento, sexo, edad, year, municipio)`` devuelve la respuesta de
+    :func:`payload` (en la aplicación, a través de la caché de resultados;
+    ``year`` es ``None`` para el año por defecto) y ``years()`` los años
+    disponibles.
+    """
+
+    @server.route(prefix + '/counts')
+    def api_counts():
+        request = flask.request
+        try:
+            arrow = _wants_arrow(request)
+            by = parse_by(request.args.get('by'))
+            departamento = _values(request.args, 'departamento', split=False)
+            sexo = _values(request.args, 'sexo')
+            edad = _values(request.args, 'edad')
+            municipio = _municipalities(request.args)
+            year = request.args.get('anio')
+            available = list(years())
+            if year is not None and (not year.isdigit() or int(year) not in available):
+                raise ApiError(f"Año no disponible: {year}; disponibles: {', '.join(map(str, available))}")
+        except ApiError as e:
+            return flask.jsonify({'error': str(e)}), 400
+        if arrow and pa is None:
+            return flask.jsonify({'error': 'El formato Arrow requiere el paquete pyarrow'}), 406
+
+        result = query(by, departamento, sexo, edad, int(year) if year is not None else None, municipio)
+        if arrow:
+            return flask.Response(to_arrow(result), mimetype=ARROW_MIMETYPE)
+        return flask.jsonify(result)
+
+    return api_counts
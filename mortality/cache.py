@@ -0,0 +1,220 @@
+"""Caché columnar de los libros de Excel (y archivos CSV/TXT) del DANE.
+
+Leer los anexos obliga a openpyxl a recorrer todas las celdas del libro, lo
+que toma decenas de segundos en cada arranque de un worker. Este módulo
+convierte cada libro en un directorio con una columna por archivo ``.npy``
+y un ``manifest.json``; el directorio queda identificado por el hash
+SHA-256 del archivo fuente, de modo que solo se vuelve a leer el archivo
+fuente (por lotes, ver :mod:`mortality.ingest`) cuando cambia.
+
+Las columnas numéricas y de fecha se cargan con ``mmap_mode='r'``. Las
+columnas de texto se guardan como categorías (códigos enteros más la lista
+de categorías en el manifiesto) y se cargan como ``pd.Categorical`` sobre
+los códigos mapeados, sin copiarlos ni crear un objeto Python por registro.
+
+Uso como paso de construcción (por ejemplo en ``render.yaml``)::
+
+    python -m mortality.cache
+"""
+import glob
+import hashlib
+import json
+import os
+import shutil
+import sys
+
+import numpy as np
+import pandas as pd
+
+from mortality import config
+from mortality.ingest import read_table
+from mortality.metrics import startup
+
+MANIFEST = 'manifest.json'
+FORMAT_VERSION = 2
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """Calcula el SHA-256 del archivo leyéndolo por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _cache_key(path, read_kwargs):
+    # Los argumentos de lectura (hoja, encabezado...) también cambian el resultado
+    digest = hashlib.sha256(file_hash(path).encode())
+    digest.update(_options(read_kwargs).encode())
+    return digest.hexdigest()[:20]
+
+
+def _entry_prefix(path):
+    return os.path.splitext(os.path.basename(path))[0] + '-'
+
+
+def dataset_version(paths):
+    """Identificador corto de la versión de los datos (hash de los archivos fuente)."""
+    digest = hashlib.sha256()
+    for path in paths:
+        if os.path.exists(path):
+            digest.update(file_hash(path).encode())
+    return digest.hexdigest()[:12]
+
+
+def _options(read_kwargs):
+    return json.dumps(read_kwargs, sort_keys=True, default=str)
+
+
+def _categories(categories):
+    """Categorías como valores JSON (``str``, ``int``, ``float`` o ``bool``)."""
+    values = []
+    for value in categories:
+        if isinstance(value, (np.integer, np.floating, np.bool_)):
+            value = value.item()
+        if not isinstance(value, (str, int, float, bool)):
+            raise TypeError(f'tipo no soportado en la caché: {type(value).__name__}')
+        values.append(value)
+    return values
+
+
+def write_frame(df, directory, source_hash=None, source=None):
+    """Escribe ``df`` en ``directory`` de forma atómica.
+
+    ``source`` (ruta del archivo fuente y argumentos de lectura) queda en el
+    manifiesto para saber qué entradas reemplaza (ver :func:`_prune`).
+    """
+    tmp_dir = directory + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = []
+    for i, name in enumerate(df.columns):
+        series = df[name]
+        entry = {'name': name, 'file': f'c{i}.npy'}
+        if series.dtype == object:
+            # Categorías ordenadas como en astype('category') (el esquema compacto
+            # y el cubo dependen de ese orden); los códigos quedan con el tipo
+            # entero de pandas para cargarlos sin conversión
+            series = series.astype('category')
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            np.save(os.path.join(tmp_dir, entry['file']), series.cat.codes.to_numpy())
+            entry.update(kind='category', categories=_categories(series.cat.categories))
+        else:
+            np.save(os.path.join(tmp_dir, entry['file']), series.to_numpy())
+            entry.update(kind='array')
+        columns.append(entry)
+
+    manifest = {
+        'format': FORMAT_VERSION,
+        'source_hash': source_hash,
+        'source': source,
+        'rows': len(df),
+        'columns': columns,
+    }
+    with open(os.path.join(tmp_dir, MANIFEST), 'w', encoding='utf-8') as fh:
+        json.dump(manifest, fh, ensure_ascii=False)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(tmp_dir, directory)
+
+
+def read_frame(directory, mmap=True):
+    """Carga un directorio escrito por :func:`write_frame`.
+
+    Las columnas de texto son ``pd.Categorical`` cuyos códigos son el mismo
+    arreglo mapeado del disco (el código -1 es el valor faltante).
+    """
+    with open(os.path.join(directory, MANIFEST), encoding='utf-8') as fh:
+        manifest = json.load(fh)
+    if manifest.get('format') != FORMAT_VERSION:
+        raise ValueError(f'formato de caché incompatible en {directory}')
+
+    mmap_mode = 'r' if mmap else None
+    data = {}
+    for entry in manifest['columns']:
+        values = np.load(os.path.join(directory, entry['file']), mmap_mode=mmap_mode)
+        if entry['kind'] == 'category':
+            # Los códigos se validaron al escribirlos: validate=False evita recorrerlos
+            values = pd.Categorical.from_codes(values, categories=pd.Index(entry['categories'], dtype=object),
+                                               validate=False)
+        data[entry['name']] = values
+    # copy=False conserva los memmaps en lugar de consolidarlos en memoria
+    return pd.DataFrame(data, copy=False)
+
+
+def read_table_cached(path, cache_dir=None, **read_kwargs):
+    """Equivalente a ``pd.read_excel(path, **read_kwargs)`` con caché en disco.
+
+    Si existe una entrada de caché para el hash actual del archivo se carga
+    desde allí; en caso contrario se lee el archivo con
+    :func:`mortality.ingest.read_table` (Excel, CSV o TXT) y se guarda la
+    caché para los siguientes arranques. Los errores al escribir la caché no
+    impiden devolver los datos.
+    """
+    cache_dir = cache_dir or config.CACHE_DIR
+    source = {'path': os.path.abspath(path), 'options': _options(read_kwargs)}
+    with startup('hash', source=os.path.basename(path)):
+        key = _cache_key(path, read_kwargs)
+    directory = os.path.join(cache_dir, _entry_prefix(path) + key)
+
+    if os.path.exists(os.path.join(directory, MANIFEST)):
+        try:
+            with startup('read_cache', source=os.path.basename(path)):
+                return read_frame(directory)
+        except Exception as e:
+            print(f"Caché inválida en {directory}, se vuelve a leer el archivo: {e}")
+
+    print(f"Leyendo {os.path.basename(path)} por lotes (sin caché)")
+    with startup('read', source=os.path.basename(path)):
+        df = read_table(path, **read_kwargs)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        write_frame(df, directory, source_hash=key, source=source)
+        _prune(cache_dir, path, source, keep=directory)
+    except Exception as e:
+        print(f"No se pudo escribir la caché de {os.path.basename(path)}: {e}")
+    return df
+
+
+def _entry_source(directory):
+    # Fuente registrada en el manifiesto (None si no se puede leer o es de otro formato)
+    try:
+        with open(os.path.join(directory, MANIFEST), encoding='utf-8') as fh:
+            manifest = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    return manifest.get('source') if manifest.get('format') == FORMAT_VERSION else None
+
+
+def _prune(cache_dir, path, source, keep):
+    # Elimina las entradas antiguas del mismo archivo leído con los mismos
+    # argumentos; las de otros argumentos (u otro archivo con el mismo nombre)
+    # se conservan. Las entradas ilegibles o de otro formato ya no sirven.
+    prefix = _entry_prefix(path)
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if not name.startswith(prefix) or full == keep or not os.path.isdir(full) or name.endswith('.tmp'):
+            continue
+        entry_source = _entry_source(full)
+        if entry_source is None or entry_source == source:
+            shutil.rmtree(full, ignore_errors=True)
+
+
+def build(paths=None, cache_dir=None):
+    """Construye la caché de los anexos del DANE que existan en disco (todos los años)."""
+    if not paths:
+        years = [path for path in sorted(glob.glob(os.path.join(config.ANEXOS_DIR, config.MORTALITY_GLOB)))
+                 if path.lower().endswith(config.MORTALITY_EXTENSIONS)]
+        paths = (years or [config.MORTALITY_FILE]) + [config.CODES_FILE, config.DIVIPOLA_FILE]
+    for path in paths:
+        if not os.path.exists(path):
+            print(f"Se omite {path}: no existe")
+            continue
+        read_table_cached(path, cache_dir=cache_dir)
+        print(f"Caché lista para {os.path.basename(path)}")
+
+
+if __name__ == '__main__':
+    build(sys.argv[1:] or None)
@@ -0,0 +1,284 @@
+"""Tabla de causas de muerte con paginación, orden y búsqueda en el servidor.
+
+La tabla ``tabla-causas`` muestra el ranking completo de códigos CIE-10 de
+la selección (miles de filas), pero el navegador solo recibe la página
+visible: el DataTable usa ``page_action``, ``sort_action`` y
+``filter_action`` en ``'custom'`` y cada cambio de página, de orden o de
+búsqueda es una solicitud al callback de la tabla.
+
+:class:`CauseTable` se construye una vez por año a partir del cubo: las
+etiquetas de causa con su descripción, el orden por código y por
+descripción, y dos índices de prefijos (arreglos ordenados resueltos con
+``np.searchsorted``, como en mortality/prefixes.py):
+
+- por código normalizado: ``I2`` encuentra ``I20`` a ``I259``;
+- por palabra de la descripción (sin tildes ni mayúsculas): ``tumor
+  malig`` encuentra las descripciones con una palabra que empiece por
+  ``TUMOR`` y otra que empiece por ``MALIG``.
+
+:class:`CauseRanking` guarda los conteos de una selección; los órdenes por
+columna se calculan la primera vez que se piden y los rankings recientes se
+guardan en una caché LRU, así que una página sin búsqueda es un corte del
+orden ya calculado.
+"""
+import math
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from mortality.causes import normalize_codes, normalize_text
+from mortality.prefixes import HIGHEST
+
+# Columnas del DataTable
+COLUMNS = ('codigo', 'causa', 'total')
+
+# Orden inicial: más casos primero (el antiguo top 10)
+DEFAULT_SORT = ('total', True)
+
+# Operadores del filtro del DataTable (símbolos y nombres) -> operador interno
+OPERATORS = {
+    '=': 'eq', 'eq': 'eq', '!=': 'ne', 'ne': 'ne',
+    '<': 'lt', 'lt': 'lt', '<=': 'le', 'le': 'le',
+    '>': 'gt', 'gt': 'gt', '>=': 'ge', 'ge': 'ge',
+    'contains': 'contains',
+}
+
+# Condición del filter_query: {columna} operador valor
+CONDITION = re.compile(r'^\{(?P<column>[^}]+)\}\s+(?P<op>[^\s]+)\s*(?P<value>.*)$', re.DOTALL)
+
+WORD = re.compile(r'[A-Z0-9]+')
+
+
+def _unquote(value):
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'`':
+        value = value[1:-1].replace('\\' + value[0], value[0])
+    return value
+
+
+def parse_filter(query):
+    """Condiciones ``(columna, operador, valor)`` de un ``filter_query`` del DataTable.
+
+    El DataTable une las condiciones de cada columna con ``&&``. Los
+    operadores con prefijo ``i``/``s`` (mayúsculas sí o no) se tratan igual:
+    la búsqueda no distingue mayúsculas ni tildes. Se ignoran las columnas,
+    operadores y valores que no aplican (p. ej. texto en ``total``).
+    """
+    conditions = []
+    for part in (query or '').split(' && '):
+        match = CONDITION.match(part.strip())
+        if match is None:
+            continue
+        column, op = match['column'], match['op'].lower()
+        if op not in OPERATORS and op[:1] in 'is' and op[1:] in OPERATORS:
+            op = op[1:]
+        op = OPERATORS.get(op)
+        value = _unquote(match['value'])
+        if column not in COLUMNS or op is None or value == '':
+            continue
+        if column == 'total':
+            try:
+                value = float(value)
+            except ValueError:
+                continue
+            if op == 'contains':
+                op = 'eq'
+        elif op not in ('contains', 'eq'):
+            continue
+        conditions.append((column, op, value))
+    return conditions
+
+
+def parse_sort(sort_by):
+    """``(columna, descendente)`` del ``sort_by`` del DataTable (orden simple)."""
+    for item in sort_by or []:
+        if item.get('column_id') in COLUMNS:
+            return item['column_id'], item.get('direction') == 'desc'
+    return DEFAULT_SORT
+
+
+def _prefix_range(keys, prefix):
+    # Tramo [lo, hi) de ``keys`` (ordenado) con el prefijo dado
+    lo = int(np.searchsorted(keys, prefix, side='left'))
+    hi = int(np.searchsorted(keys, prefix + HIGHEST, side='right'))
+    return lo, max(lo, hi)
+
+
+def _exact_range(keys, value):
+    return int(np.searchsorted(keys, value, side='left')), int(np.searchsorted(keys, value, side='right'))
+
+
+class CauseTable:
+    """Causas de un cubo con su descripción, órdenes e índices de prefijos."""
+
+    def __init__(self, codes, descriptions, cache_size=64):
+        # codes[i]: etiqueta de la causa i en el cubo (el id de la causa es su posición)
+        self.codes = np.asarray(codes, dtype=object)
+        self.descriptions = np.asarray(descriptions, dtype=object)
+        self.cache_size = cache_size
+        self._rankings = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Índice de códigos: claves normalizadas ordenadas y el id de cada una
+        code_keys = normalize_codes(self.codes)
+        self.code_order = np.argsort(code_keys, kind='stable')
+        self._code_keys = code_keys[self.code_order]
+
+        # Orden por descripción (sin tildes) y, a igual descripción, por código
+        text = np.array([normalize_text(d) for d in self.descriptions], dtype=str)
+        self.description_order = np.lexsort((code_keys, text))
+        self._text_keys = text[self.description_order]
+
+        # Índice de palabras: cada palabra de cada descripción con el id de su causa
+        words, owners = [], []
+        for i, description in enumerate(text):
+            for word in set(WORD.findall(description)):
+                words.append(word)
+                owners.append(i)
+        words = np.array(words, dtype=str)
+        word_order = np.argsort(words, kind='stable')
+        self._words = words[word_order]
+        self._word_owners = np.asarray(owners, dtype=np.int32)[word_order]
+
+    @classmethod
+    def from_cube(cls, cube, catalog, dim='CAUSA_DEFUNCION'):
+        """Construye la tabla con las etiquetas de ``dim`` y las descripciones del catálogo."""
+        codes = cube.labels[dim]
+        return cls(codes, catalog.describe(codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def order(self, column):
+        """Ids de todas las causas en orden ascendente de ``column`` (``codigo`` o ``causa``)."""
+        return self.code_order if column == 'codigo' else self.description_order
+
+    def search(self, column, op, value):
+        """Ids (ordenados) de las causas cuyo código o descripción cumple la condición.
+
+        ``contains`` busca por prefijo: del código en ``codigo`` y de cada
+        palabra en ``causa`` (todas las palabras buscadas deben aparecer).
+        ``eq`` compara el código o la descripción completa.
+        """
+        if column == 'codigo':
+            key = ''.join(normalize_text(value).split())
+            lo, hi = (_prefix_range if op == 'contains' else _exact_range)(self._code_keys, key)
+            return np.sort(self.code_order[lo:hi])
+        if op == 'eq':
+            lo, hi = _exact_range(self._text_keys, normalize_text(value))
+            return np.sort(self.description_order[lo:hi])
+        ids = None
+        for word in WORD.findall(normalize_text(value)):
+            lo, hi = _prefix_range(self._words, word)
+            found = np.unique(self._word_owners[lo:hi])
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        return ids if ids is not None else np.arange(len(self.codes))
+
+    def ranking(self, selection, totals):
+        """Ranking de una selección (clave hashable) desde la caché LRU.
+
+        ``totals()`` devuelve los conteos por causa (alineados con
+        ``codes``) y solo se llama si la selección no está en la caché.
+        """
+        with self._lock:
+            if selection in self._rankings:
+                self._rankings.move_to_end(selection)
+                return self._rankings[selection]
+        ranking = CauseRanking(self, totals())
+        with self._lock:
+            self._rankings[selection] = ranking
+            if len(self._rankings) > self.cache_size:
+                self._rankings.popitem(last=False)
+        return ranking
+
+    def records(self, ids, totals):
+        """Filas del DataTable para los ids dados."""
+        return [{'codigo': code, 'causa': description, 'total': total}
+                for code, description, total in zip(self.codes[ids].tolist(), self.descriptions[ids].tolist(),
+                                                    totals[ids].tolist())]
+
+
+class CauseRanking:
+    """Causas presentes en una selección, con sus órdenes por columna calculados a demanda."""
+
+    def __init__(self, table, totals):
+        self.table = table
+        self.totals = np.asarray(totals, dtype=np.int64)
+        self.present = np.flatnonzero(self.totals > 0)
+        self._orders = {}
+        self._ranks = {}
+
+    def __len__(self):
+        return len(self.present)
+
+    def order(self, column, descending):
+        """Ids de las causas presentes en el orden de ``column``.
+
+        El orden por total es estable (a igual total, por código), como
+        ``nlargest`` sobre los conteos por causa.
+        """
+        key = (column, descending)
+        order = self._orders.get(key)
+        if order is None:
+            if column == 'total':
+                totals = self.totals[self.present]
+                order = self.present[np.argsort(-totals if descending else totals, kind='stable')]
+            else:
+                order = self.table.order(column)
+                order = order[self.totals[order] > 0]
+                if descending:
+                    order = order[::-1]
+            self._orders[key] = order
+        return order
+
+    def rank(self, column, descending):
+        """Posición de cada causa en :meth:`order` (para ordenar un subconjunto)."""
+        key = (column, descending)
+        rank = self._ranks.get(key)
+        if rank is None:
+            order = self.order(column, descending)
+            rank = np.full(len(self.totals), len(order), dtype=np.int32)
+            rank[order] = np.arange(len(order), dtype=np.int32)
+            self._ranks[key] = rank
+        return rank
+
+    def _compare(self, op, value):
+        # Ids con total que cumple la comparación, sobre el orden ascendente por total
+        order = self.order('total', False)
+        values = self.totals[order]
+        left = int(np.searchsorted(values, value, side='left'))
+        right = int(np.searchsorted(values, value, side='right'))
+        ranges = {
+            'eq': [(left, right)], 'ne': [(0, left), (right, len(order))],
+            'lt': [(0, left)], 'le': [(0, right)],
+            'gt': [(right, len(order))], 'ge': [(left, len(order))],
+        }[op]
+        return np.sort(np.concatenate([order[lo:hi] for lo, hi in ranges]))
+
+    def matches(self, conditions):
+        """Ids (ordenados) de las causas presentes que cumplen todas las condiciones."""
+        ids = None
+        for column, op, value in conditions:
+            found = self._compare(op, value) if column == 'total' else self.table.search(column, op, value)
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        return ids[self.totals[ids] > 0]
+
+    def page(self, page, size, sort=DEFAULT_SORT, conditions=()):
+        """Filas de una página, la página efectiva y el número de páginas.
+
+        Sin condiciones la página es un corte del orden de la columna; con
+        condiciones solo se ordenan las causas que las cumplen. ``page`` se
+        ajusta a la última página si la selección tiene menos filas.
+        """
+        size = max(1, int(size or 1))
+        if conditions:
+            ids = self.matches(conditions)
+            order = ids[np.argsort(self.rank(*sort)[ids], kind='stable')]
+        else:
+            order = self.order(*sort)
+        pages = max(1, math.ceil(len(order) / size))
+        page = min(max(0, int(page or 0)), pages - 1)
+        rows = order[page * size:(page + 1) * size]
+        return self.table.records(rows, self.totals), page, pages
@@ -0,0 +1,246 @@
+"""Catálogo de causas de muerte CIE-10 (Anexo2 del DANE).
+
+El libro de códigos trae varias filas de título antes del encabezado real,
+por lo que ``pd.read_excel`` lo entrega con columnas ``Unnamed: n``. Aquí
+se localiza el encabezado una sola vez al cargar los datos, se identifican
+las columnas por su texto (capítulo, código y descripción a tres y cuatro
+caracteres) y se construyen arreglos ordenados por código. Las consultas
+de descripción son búsquedas binarias vectorizadas (``np.searchsorted``) y
+la jerarquía código → grupo de tres caracteres → capítulo queda
+precalculada como enteros, así que agregar conteos por grupo o por capítulo
+es un ``np.bincount``. Las familias de causas (por ejemplo homicidios) se
+resuelven por prefijo en mortality/prefixes.py.
+"""
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN_DESCRIPTION = 'Causa no especificada'
+
+# Descripciones de respaldo cuando el catálogo no se pudo leer o no trae el código
+FALLBACK_DESCRIPTIONS = {
+    'I219': 'Infarto agudo del miocardio',
+    'J449': 'Enfermedad pulmonar obstructiva crónica',
+    'C349': 'Cáncer de pulmón',
+    'I64': 'Accidente cerebrovascular',
+    'I10': 'Hipertensión esencial',
+    'C509': 'Cáncer de mama',
+    'C61': 'Cáncer de próstata',
+    'E149': 'Diabetes mellitus no especificada',
+    'K729': 'Enfermedad hepática',
+    'X95': 'Homicidio',
+    'J440': 'Enfermedad pulmonar obstructiva crónica con exacerbación aguda',
+    'J189': 'Neumonía, no especificada',
+    'C169': 'Cáncer de estómago, parte no especificada',
+    'X954': 'Homicidio y lesiones por intervención legal, no especificadas',
+}
+
+# Roles de columna: palabra inicial del encabezado y palabras que debe contener
+COLUMN_ROLES = {
+    'chapter': ('CAPITULO',),
+    'chapter_name': ('NOMBRE', 'CAPITULO'),
+    'code3': ('CODIGO', 'TRES'),
+    'desc3': ('DESCRIPCION', 'TRES'),
+    'code4': ('CODIGO', 'CUATRO'),
+    'desc4': ('DESCRIPCION', 'CUATRO'),
+}
+
+# Encabezados de un catálogo ya aplanado a dos columnas
+FLAT_COLUMNS = {'code4': 'CODIGO_CIE10', 'desc4': 'DESCRIPCION_CIE10'}
+
+HEADER_SCAN_ROWS = 30
+
+# Niveles de la jerarquía CIE-10 para :meth:`CauseCatalog.rollup`
+LEVELS = ('grupo', 'capitulo')
+
+
+def normalize_text(text):
+    """Texto en mayúsculas, sin tildes y con los espacios colapsados (para comparar y buscar)."""
+    text = unicodedata.normalize('NFKD', str(text))
+    if not text.isascii():
+        text = ''.join(c for c in text if not unicodedata.combining(c))
+    return ' '.join(text.upper().split())
+
+
+def normalize_codes(values):
+    """Códigos como texto sin espacios ni valores faltantes ('' si falta)."""
+    series = pd.Series(values, copy=False)
+    return series.where(series.notna(), '').astype(str).str.strip().str.upper().to_numpy(dtype=str)
+
+
+def _match_role(header):
+    words = normalize_text(header)
+    for role, (first, *rest) in COLUMN_ROLES.items():
+        if words.startswith(first) and all(marker in words for marker in rest):
+            return role
+    return None
+
+
+def resolve_schema(df_codes):
+    """Devuelve ``(tabla, columnas)`` con las filas de datos y el rol de cada columna.
+
+    Acepta tanto el libro original del DANE (encabezado en una fila
+    intermedia) como un catálogo con columnas ``CODIGO_CIE10`` y
+    ``DESCRIPCION_CIE10``.
+    """
+    if all(col in df_codes.columns for col in FLAT_COLUMNS.values()):
+        return df_codes, dict(FLAT_COLUMNS)
+
+    candidates = [(-1, list(df_codes.columns))]
+    candidates += [(i, list(row)) for i, row in enumerate(df_codes.head(HEADER_SCAN_ROWS).itertuples(index=False))]
+    for position, headers in candidates:
+        roles = {}
+        for column, header in zip(df_codes.columns, headers):
+            role = _match_role(header) if pd.notna(header) else None
+            if role and role not in roles:
+                roles[role] = column
+        if 'code4' in roles or 'code3' in roles:
+            table = df_codes.iloc[position + 1:]
+            return table, roles
+    return df_codes.iloc[0:0], {}
+
+
+def _level_ids(keys):
+    # Claves distintas (ordenadas, sin vacíos) y la posición de cada clave entre ellas (-1 si está vacía)
+    unique = np.unique(keys[keys != ''])
+    ids = np.where(keys != '', np.searchsorted(unique, keys), -1)
+    return unique, ids.astype(np.int32)
+
+
+class CauseCatalog:
+    """Códigos CIE-10 ordenados con su descripción, grupo y capítulo."""
+
+    def __init__(self, codes, descriptions, groups, chapters, chapter_names):
+        order = np.argsort(codes, kind='stable')
+        self.codes = np.asarray(codes, dtype=str)[order]
+        self.descriptions = np.asarray(descriptions, dtype=object)[order]
+        self.groups = np.asarray(groups, dtype=str)[order]
+        self.chapters = np.asarray(chapters, dtype=object)[order]
+        self.chapter_names = np.asarray(chapter_names, dtype=object)[order]
+
+        # Jerarquía como enteros: cada código apunta a su grupo y cada grupo a su capítulo
+        self.group_codes, self.group_of = _level_ids(normalize_codes(self.groups))
+        chapter_codes, chapter_of = _level_ids(normalize_codes(self.chapters))
+        # Capítulos en el orden de sus códigos ('2' antes que '10'), no como texto
+        with_chapter = np.flatnonzero(chapter_of >= 0)
+        first = np.full(len(chapter_codes), len(self.codes))
+        np.minimum.at(first, chapter_of[with_chapter], with_chapter)
+        chapter_order = np.argsort(first, kind='stable')
+        rank = np.empty(len(chapter_codes), dtype=np.int32)
+        rank[chapter_order] = np.arange(len(chapter_codes), dtype=np.int32)
+        self.chapter_codes = chapter_codes[chapter_order]
+        chapter_of[with_chapter] = rank[chapter_of[with_chapter]]
+        self.group_chapter = np.full(len(self.group_codes), -1, dtype=np.int32)
+        grouped = self.group_of >= 0
+        np.maximum.at(self.group_chapter, self.group_of[grouped], chapter_of[grouped])
+        self.chapter_titles = np.full(len(self.chapter_codes), None, dtype=object)
+        named = (chapter_of >= 0) & pd.notna(self.chapter_names)
+        self.chapter_titles[chapter_of[named][::-1]] = self.chapter_names[named][::-1]
+
+    @classmethod
+    def from_frame(cls, df_codes, fallback=None):
+        """Construye el catálogo a partir del DataFrame leído del Anexo2."""
+        table, roles = resolve_schema(df_codes)
+        parts = []
+
+        def column(role):
+            if role in roles:
+                return table[roles[role]].to_numpy()
+            return np.full(len(table), np.nan, dtype=object)
+
+        # Códigos de cuatro caracteres y de tres caracteres (grupos)
+        for code_role, desc_role in (('code4', 'desc4'), ('code3', 'desc3')):
+            if code_role not in roles:
+                continue
+            codes = normalize_codes(column(code_role))
+            part = pd.DataFrame({
+                'code': codes,
+                'description': pd.Series(column(desc_role)).astype(str).str.strip().to_numpy(),
+                'group': normalize_codes(column('code3')) if 'code3' in roles else codes.astype('U3'),
+                'chapter': column('chapter'),
+                'chapter_name': column('chapter_name'),
+            })
+            part.loc[pd.isna(column(desc_role)), 'description'] = None
+            parts.append(part[part['code'] != ''])
+
+        entries = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(
+            columns=['code', 'description', 'group', 'chapter', 'chapter_name'])
+        entries = entries.drop_duplicates('code', keep='first')
+        entries.loc[entries['description'].isin(['', 'nan']), 'description'] = None
+
+        # Respaldo: solo para códigos ausentes o sin descripción en el catálogo
+        fallback = pd.Series(fallback if fallback is not None else FALLBACK_DESCRIPTIONS, dtype=object)
+        entries['description'] = entries['description'].fillna(entries['code'].map(fallback))
+        extra = fallback[~fallback.index.isin(entries['code'])]
+        if len(extra):
+            entries = pd.concat([entries, pd.DataFrame({
+                'code': extra.index, 'description': extra.to_numpy(),
+                'group': extra.index.str[:3], 'chapter': None, 'chapter_name': None,
+            })], ignore_index=True)
+
+        return cls(entries['code'].to_numpy(dtype=str),
+                   entries['description'].to_numpy(dtype=object),
+                   entries['group'].to_numpy(dtype=str),
+                   entries['chapter'].to_numpy(dtype=object),
+                   entries['chapter_name'].to_numpy(dtype=object))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def encode(self, values):
+        """Posición en el catálogo de cada código de ``values`` (-1 si no existe)."""
+        keys = normalize_codes(values)
+        if not len(self.codes):
+            return np.full(len(keys), -1, dtype=np.int32)
+        positions = np.searchsorted(self.codes, keys)
+        positions = np.minimum(positions, len(self.codes) - 1)
+        found = self.codes[positions] == keys
+        return np.where(found, positions, -1).astype(np.int32)
+
+    def _take(self, array, positions, default):
+        result = np.empty(len(positions), dtype=object)
+        result[:] = default
+        found = positions >= 0
+        result[found] = array[positions[found]]
+        if default is not None:
+            result[pd.isna(result)] = default
+        return result
+
+    def describe(self, values, default=UNKNOWN_DESCRIPTION):
+        """Descripción de cada código de ``values``, vectorizado."""
+        return self._take(self.descriptions, self.encode(values), default)
+
+    def levels(self, values):
+        """Posición del grupo y del capítulo de cada código de ``values`` (-1 si no se conoce).
+
+        Un código fuera del catálogo se asigna al grupo de sus tres primeros
+        caracteres cuando ese grupo existe. Se calcula una vez por arreglo de
+        etiquetas (ver ``Dataset.cause_levels``) y :meth:`rollup` lo reutiliza.
+        """
+        positions = self.encode(values)
+        groups = np.full(len(positions), -1, dtype=np.int32)
+        found = positions >= 0
+        groups[found] = self.group_of[positions[found]]
+        missing = np.flatnonzero(groups < 0)
+        if len(missing) and len(self.group_codes):
+            prefixes = normalize_codes(values)[missing].astype('U3')
+            candidates = np.minimum(np.searchsorted(self.group_codes, prefixes), len(self.group_codes) - 1)
+            groups[missing] = np.where(self.group_codes[candidates] == prefixes, candidates, -1)
+        chapters = np.full(len(positions), -1, dtype=np.int32)
+        grouped = groups >= 0
+        chapters[grouped] = self.group_chapter[groups[grouped]]
+        return {'grupo': groups, 'capitulo': chapters}
+
+    def rollup(self, ids, counts, level='grupo'):
+        """Suma ``counts`` por grupo o capítulo; ``ids`` es el nivel correspondiente de :meth:`levels`."""
+        if level not in LEVELS:
+            raise ValueError(f"Nivel desconocido '{level}'; válidos: {', '.join(LEVELS)}")
+        keys = self.group_codes if level == 'grupo' else self.chapter_codes
+        ids = np.asarray(ids)
+        counts = np.asarray(counts)
+        known = ids >= 0
+        totals = np.bincount(ids[known], weights=counts[known], minlength=len(keys)).astype(np.int64)
+        present = np.flatnonzero(totals)
+        names = self.describe(keys[present], None) if level == 'grupo' else self.chapter_titles[present]
+        return pd.DataFrame({level: keys[present], 'descripcion': names, 'total': totals[present]})
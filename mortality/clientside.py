@@ -0,0 +1,117 @@
+"""Conteos precalculados para el modo de filtros en el navegador.
+
+Con ``MORTALIDAD_CLIENTSIDE=1`` los cambios de filtro no llegan al
+servidor: la página descarga una vez por año un JSON compacto con conteos
+agregados del cubo y el callback del tablero corre en JavaScript
+(``assets/mortalidad.js``) sumando y ordenando esos arreglos.
+
+Cada tabla es columnar: por dimensión, un arreglo con la posición de la
+etiqueta en su lista (-1 = faltante), más el arreglo ``n`` de conteos.
+
+- ``base``: departamento (filtro) × departamento (código) × sexo × edad × mes
+- ``municipios`` y ``homicidios``: departamento (filtro) × municipio × sexo × edad
+
+La tabla de causas no se calcula en el navegador: tiene miles de filas y
+se pagina, ordena y busca en el servidor (ver mortality/cause_table.py).
+
+Las etiquetas (nombres de departamentos, municipios y meses) se resuelven
+aquí, así que el navegador no necesita la Divipola.
+"""
+import json
+
+import numpy as np
+import pandas as pd
+import plotly.io as pio
+from plotly.colors import sequential
+from plotly.io.json import to_json_plotly
+
+from mortality.cube import CountCube
+from mortality.labels import AGE_GROUPS, age_group_index, month_names
+
+
+def _values(values):
+    # Valores JSON: enteros de NumPy a int y NaN a null
+    series = pd.Series(np.asarray(values, dtype=object))
+    return [None if pd.isna(v) else (v.item() if isinstance(v, np.generic) else v) for v in series]
+
+
+def _table(cube, columns):
+    """Tabla columnar ``{columna: códigos}`` de un rollup del cubo."""
+    rolled = cube.rollup(list(columns.values()))
+    table = {name: rolled.codes[dim].astype(np.int64) for name, dim in columns.items()}
+    table['n'] = rolled.counts
+    return table
+
+
+def _subset(cube, cells):
+    # Cubo con las mismas dimensiones y solo las celdas de la máscara
+    return CountCube(cube.labels, {dim: codes[cells] for dim, codes in cube.codes.items()},
+                     cube.counts[cells])
+
+
+def _pairs(table, width):
+    """Saca de ``table`` el par (departamento, municipio) como una sola clave (-1 si falta)."""
+    dpto, munic = table.pop('dpto'), table.pop('munic')
+    return np.where((dpto >= 0) & (munic >= 0), dpto * width + munic, -1)
+
+
+def _municipality_index(pair, pairs):
+    # Posición de cada clave en ``pairs`` (ordenado); -1 si falta
+    index = np.searchsorted(pairs, pair)
+    index[pair < 0] = -1
+    return index
+
+
+def _encode(table):
+    return {name: np.asarray(values).tolist() for name, values in table.items()}
+
+
+def client_payload(dataset):
+    """Conteos y etiquetas de un año para el callback en el navegador."""
+    cube = dataset.cube
+    labels = cube.labels
+    geography = dataset.geography
+
+    base = _table(cube, {'f': 'NOM_DPTO', 'd': 'COD_DPTO', 's': 'SEXO', 'a': 'GRUPO_EDAD1', 'm': 'MES'})
+
+    municipal_columns = {'f': 'NOM_DPTO', 'dpto': 'COD_DPTO', 'munic': 'COD_MUNIC', 's': 'SEXO', 'a': 'GRUPO_EDAD1'}
+    width = len(labels['COD_MUNIC'])
+    municipal = _table(cube, municipal_columns)
+    municipal_pair = _pairs(municipal, width)
+    pairs = np.unique(municipal_pair[municipal_pair >= 0])
+    municipal['u'] = _municipality_index(municipal_pair, pairs)
+    # Los homicidios son un subconjunto de las celdas: mismo índice de municipio
+    homicides = _table(_subset(cube, dataset.homicide_cells), municipal_columns)
+    homicides['u'] = _municipality_index(_pairs(homicides, width), pairs)
+    dpto_codes = labels['COD_DPTO'][pairs // width]
+    munic_codes = labels['COD_MUNIC'][pairs % width]
+
+    return {
+        'year': dataset.year,
+        'labels': {
+            'f': _values(labels['NOM_DPTO']),
+            'd': _values(labels['COD_DPTO']),
+            'd_nombre': _values(geography.department_names(labels['COD_DPTO'])),
+            's': _values(labels['SEXO']),
+            'a': _values(labels['GRUPO_EDAD1']),
+            'a_grupo': age_group_index(labels['GRUPO_EDAD1']).tolist(),
+            'grupos_edad': AGE_GROUPS.tolist(),
+            'm': _values(labels['MES']),
+            'm_nombre': _values(month_names(labels['MES'])),
+            'u_dpto': _values(dpto_codes),
+            'u_munic': _values(munic_codes),
+            'u_nombre': _values(geography.municipality_names(dpto_codes, munic_codes)),
+        },
+        'base': _encode(base),
+        'municipios': _encode(municipal),
+        'homicidios': _encode(homicides),
+    }
+
+
+def figure_style():
+    """Plantilla y escalas de color de las figuras, para que el navegador dibuje igual."""
+    return {
+        'template': json.loads(to_json_plotly(pio.templates[pio.templates.default])),
+        'Reds': sequential.Reds,
+        'Viridis': sequential.Viridis,
+    }
@@ -0,0 +1,60 @@
+"""Rutas y parámetros de configuración de la aplicación.
+
+Todos los valores se pueden sobrescribir con variables de entorno
+``MORTALIDAD_*`` para desplegar en Render o ejecutar localmente.
+"""
+import os
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Libros de Excel publicados por el DANE
+ANEXOS_DIR = os.environ.get('MORTALIDAD_ANEXOS_DIR', os.path.join(BASE_DIR, 'Anexos'))
+MORTALITY_FILE = os.path.join(ANEXOS_DIR, 'Anexo1.NoFetal2019_CE_15-03-23.xlsx')
+# Un archivo de mortalidad por año: Anexo1.NoFetal<año>_*.xlsx o los microdatos
+# nofetal<año>.csv/.txt (ver mortality/partitions.py)
+MORTALITY_GLOB = '*[Nn][Oo][Ff][Ee][Tt][Aa][Ll]*'
+MORTALITY_EXTENSIONS = ('.xlsx', '.xlsm', '.xls', '.csv', '.txt')
+CODES_FILE = os.path.join(ANEXOS_DIR, 'Anexo2.CodigosDeMuerte_CE_15-03-23.xlsx')
+DIVIPOLA_FILE = os.path.join(ANEXOS_DIR, 'Divipola_CE_.xlsx')
+
+# Caché columnar generada a partir de los libros (ver mortality/cache.py)
+CACHE_DIR = os.environ.get('MORTALIDAD_CACHE_DIR', os.path.join(BASE_DIR, 'data', 'cache'))
+
+# Año que se muestra al abrir el tablero (por defecto, el más reciente) y
+# máximo de años cargados a la vez en cada worker
+DEFAULT_YEAR = os.environ.get('MORTALIDAD_DEFAULT_YEAR')
+MAX_YEAR_PARTITIONS = int(os.environ.get('MORTALIDAD_MAX_YEARS', '3'))
+
+# Modo preload: el maestro de gunicorn carga los datos una vez y los workers
+# los comparten por copy-on-write (ver gunicorn.conf.py). 0 para desactivarlo.
+PRELOAD = os.environ.get('MORTALIDAD_PRELOAD', '1') == '1'
+
+# Carga de datos en segundo plano: el servidor responde /healthz de inmediato y
+# /readyz cuando termina la carga (ver mortality/readiness.py). Desactiva el preload.
+BACKGROUND_LOAD = os.environ.get('MORTALIDAD_BACKGROUND_LOAD', '0') == '1'
+
+# Caché de resultados de los callbacks (ver mortality/result_cache.py):
+# 'sqlite' (compartida entre workers), 'memory' (por worker) u 'off'
+RESULT_CACHE = os.environ.get('MORTALIDAD_RESULT_CACHE', 'sqlite')
+RESULT_CACHE_PATH = os.environ.get('MORTALIDAD_RESULT_CACHE_PATH', os.path.join(CACHE_DIR, 'results.sqlite'))
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('MORTALIDAD_RESULT_CACHE_MAX_ENTRIES', '2048'))
+RESULT_CACHE_TTL = float(os.environ.get('MORTALIDAD_RESULT_CACHE_TTL', '86400'))
+
+# Salidas precalculadas con 'python -m mortality.prerender' (vacío para no usarlas)
+PRERENDER_PATH = os.environ.get('MORTALIDAD_PRERENDER_PATH', os.path.join(CACHE_DIR, 'prerender.sqlite'))
+
+# Geometría de departamentos y municipios en GeoJSON (ver mortality/geometry.py)
+# y nivel de simplificación que usa el mapa para cada capa
+GEO_DIR = os.environ.get('MORTALIDAD_GEO_DIR', os.path.join(ANEXOS_DIR, 'geo'))
+DEPARTMENTS_GEOJSON = os.path.join(GEO_DIR, 'departamentos.geojson')
+MUNICIPALITIES_GEOJSON = os.path.join(GEO_DIR, 'municipios.geojson')
+MAP_DETAIL_DEPARTMENTS = os.environ.get('MORTALIDAD_MAP_DETAIL_DEPARTMENTS', 'media')
+MAP_DETAIL_MUNICIPALITIES = os.environ.get('MORTALIDAD_MAP_DETAIL_MUNICIPALITIES', 'baja')
+
+# Modo de filtros en el navegador: los cambios de filtro corren como callback
+# de JavaScript sobre conteos precalculados (ver mortality/clientside.py)
+CLIENTSIDE = os.environ.get('MORTALIDAD_CLIENTSIDE', '0') == '1'
+
+# Compresión gzip/brotli de las respuestas (ver mortality/responses.py); 0 si la
+# hace un proxy delante de gunicorn
+COMPRESSION = os.environ.get('MORTALIDAD_COMPRESSION', '1') == '1'
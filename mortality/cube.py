@@ -0,0 +1,184 @@
+"""Cubo OLAP de conteos de defunciones.
+
+Todas las gráficas del tablero son conteos de defunciones agrupados por
+algún subconjunto de las mismas dimensiones. El cubo se construye una sola
+vez al cargar los datos: cada combinación distinta de valores de las
+dimensiones es una celda con su número de defunciones (representación
+dispersa, ya que el producto cartesiano completo sería enorme).
+
+Las consultas filtran celdas con un :class:`~mortality.filters.FilterEngine`
+y suman conteos con ``np.bincount``, de modo que su costo depende del
+número de celdas y no del número de registros. Para las gráficas que no
+necesitan municipio ni causa se usan agregaciones (``rollup``) del cubo con
+muchas menos celdas.
+"""
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+from mortality.filters import ALL, FILTER_COLUMNS, FilterEngine
+from mortality.metrics import phase
+
+# Dimensiones del cubo completo, tomadas de los registros. El nombre del
+# departamento (NOM_DPTO, con el que filtra el Panel de Control) se agrega
+# después con :meth:`CountCube.derive` a partir de los códigos DIVIPOLA.
+DIMENSIONS = ('COD_DPTO', 'COD_MUNIC', 'SEXO', 'GRUPO_EDAD1', 'MES', 'CAUSA_DEFUNCION')
+
+COUNT = 'count'
+
+# Máximo de combinaciones para agrupar con un arreglo denso de bincount
+DENSE_LIMIT = 5_000_000
+
+
+def _smallest_int(max_value):
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class CountCube:
+    """Cubo disperso: coordenadas codificadas por celda más su conteo."""
+
+    def __init__(self, labels, codes, counts):
+        # labels[dim]: valores ordenados de la dimensión
+        # codes[dim]: posición en labels de cada celda (-1 = faltante)
+        self.dimensions = tuple(labels)
+        self.labels = labels
+        self.codes = codes
+        self.counts = counts
+        self._rollups = {}
+
+    @cached_property
+    def cells(self):
+        # Las columnas de filtro se exponen como categorías sobre los mismos
+        # códigos enteros (sin arreglos object que dupliquen las etiquetas)
+        return pd.DataFrame(
+            {dim: pd.Categorical.from_codes(self.codes[dim], categories=self.labels[dim])
+             for dim in self.dimensions if dim in FILTER_COLUMNS.values()},
+            copy=False
+        )
+
+    @cached_property
+    def filters(self):
+        # Se construye en la primera consulta (ver derive)
+        return FilterEngine(self.cells)
+
+    @classmethod
+    def from_frame(cls, df, dimensions=DIMENSIONS):
+        """Construye el cubo a partir de los registros de mortalidad."""
+        labels, row_codes = {}, []
+        for dim in dimensions:
+            codes, uniques = pd.factorize(df[dim], sort=True)
+            labels[dim] = np.asarray(uniques)
+            row_codes.append(codes)
+        return cls._aggregate(labels, row_codes, weights=None)
+
+    @classmethod
+    def _aggregate(cls, labels, codes, weights):
+        dims = tuple(labels)
+        # El código -1 (faltante) se desplaza a 0 para poder combinar las claves
+        shape = tuple(len(labels[dim]) + 1 for dim in dims)
+        key = np.ravel_multi_index(tuple(c + 1 for c in codes), shape)
+        cell_keys, inverse = np.unique(key, return_inverse=True)
+        counts = np.bincount(inverse, weights=weights, minlength=len(cell_keys))
+        cell_codes = np.unravel_index(cell_keys, shape)
+
+        coords = {}
+        for dim, c, size in zip(dims, cell_codes, shape):
+            coords[dim] = (c - 1).astype(_smallest_int(size))
+        return cls(labels, coords, counts.astype(np.int64))
+
+    def __len__(self):
+        return len(self.counts)
+
+    def cell_labels(self, dim):
+        """Valor de ``dim`` en cada celda (``NaN`` donde falta)."""
+        labels = np.append(np.asarray(self.labels[dim], dtype=object), np.nan)
+        return labels[self.codes[dim]]
+
+    def derive(self, dim, values):
+        """Cubo con una dimensión más, dada por ``values`` (uno por celda).
+
+        ``values`` debe depender solo de las dimensiones existentes (por
+        ejemplo, el nombre del departamento a partir de los códigos), así
+        que el número de celdas no cambia.
+        """
+        codes, uniques = pd.factorize(np.asarray(values, dtype=object), sort=True)
+        labels = dict(self.labels)
+        labels[dim] = np.asarray(uniques)
+        cell_codes = dict(self.codes)
+        cell_codes[dim] = codes.astype(_smallest_int(len(uniques) + 1))
+        return CountCube(labels, cell_codes, self.counts)
+
+    def rollup(self, dimensions):
+        """Cubo agregado sobre ``dimensions`` (más las dimensiones de filtro)."""
+        keep = [dim for dim in self.dimensions
+                if dim in dimensions or dim in FILTER_COLUMNS.values()]
+        key = tuple(keep)
+        if key == self.dimensions:
+            return self
+        if key not in self._rollups:
+            labels = {dim: self.labels[dim] for dim in keep}
+            codes = [self.codes[dim].astype(np.int64) for dim in keep]
+            self._rollups[key] = self._aggregate(labels, codes, weights=self.counts)
+        return self._rollups[key]
+
+    def count(self, by=(), departamento=ALL, sexo=ALL, edad=ALL, where=None):
+        """Número de defunciones por combinación de ``by`` bajo los filtros.
+
+        Equivale a ``filtered_df.groupby(by).size()`` sobre los registros:
+        devuelve un DataFrame con las columnas de ``by`` (ordenadas como en
+        ``groupby``) y la columna ``count``, sin grupos vacíos ni valores
+        faltantes. Cada filtro es un valor o una lista de valores (ver
+        :class:`~mortality.filters.FilterEngine`). ``where`` es una máscara
+        booleana opcional sobre las celdas de este cubo; cuando se usa, la
+        consulta no se delega a un ``rollup``.
+        """
+        by = list(by)
+        with phase('aggregate'):
+            cube = self if where is not None else self.rollup(by)
+        with phase('filter'):
+            rows = cube.filters.rows(departamento, sexo, edad)
+            if where is not None:
+                rows = np.flatnonzero(where) if rows is None else rows[where[rows]]
+
+        with phase('aggregate'):
+            counts = cube.counts if rows is None else cube.counts[rows]
+            if not by:
+                return pd.DataFrame({COUNT: [int(counts.sum())]})
+
+            codes = [cube.codes[dim] if rows is None else cube.codes[dim][rows] for dim in by]
+            valid = np.ones(len(counts), dtype=bool)
+            for c in codes:
+                valid &= c >= 0
+            shape = tuple(len(cube.labels[dim]) for dim in by)
+            key = np.ravel_multi_index(tuple(c[valid].astype(np.int64) for c in codes), shape)
+            if np.prod(shape, dtype=np.float64) <= DENSE_LIMIT:
+                totals = np.bincount(key, weights=counts[valid], minlength=int(np.prod(shape)))
+                present = np.flatnonzero(totals)
+                totals = totals[present]
+            else:
+                # Demasiadas combinaciones posibles para un arreglo denso
+                present, inverse = np.unique(key, return_inverse=True)
+                totals = np.bincount(inverse, weights=counts[valid], minlength=len(present))
+
+            result = {dim: cube.labels[dim][c]
+                      for dim, c in zip(by, np.unravel_index(present, shape))}
+            result[COUNT] = totals.astype(np.int64)
+            return pd.DataFrame(result)
+
+    def cells_where(self, dim, label_mask):
+        """Máscara sobre las celdas cuyo valor de ``dim`` cumple ``label_mask``.
+
+        ``label_mask`` es un arreglo booleano alineado con ``labels[dim]``,
+        por lo que la condición se evalúa una vez por valor distinto y no
+        por registro.
+        """
+        codes = self.codes[dim]
+        return np.asarray(label_mask, dtype=bool)[np.maximum(codes, 0)] & (codes >= 0)
+
+    def total(self, departamento=ALL, sexo=ALL, edad=ALL):
+        """Total de defunciones bajo los filtros."""
+        return int(self.count((), departamento, sexo, edad)[COUNT].iloc[0])
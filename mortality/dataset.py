@@ -0,0 +1,201 @@
+"""Carga de los datos del tablero en un único objeto de solo lectura.
+
+Todo lo que los callbacks consultan (registros compactos, catálogo CIE-10,
+Divipola y el cubo de conteos) se construye aquí una sola vez por proceso y
+por año (:func:`load_year`; las tablas comunes a todos los años se leen con
+:func:`load_reference`). Con gunicorn en modo ``--preload`` (ver
+``gunicorn.conf.py``) el proceso maestro carga el año por defecto antes de
+crear los workers, y estos comparten las páginas de memoria por
+copy-on-write. Para que esas páginas no se copien, los datos grandes son
+arreglos NumPy (códigos enteros y categorías) y no columnas ``object``, y
+:func:`freeze` saca los objetos ya cargados del recolector de basura para
+que no escriba en ellos.
+"""
+import gc
+import os
+from functools import cached_property
+
+import pandas as pd
+
+from mortality import config
+from mortality.aggregates import SelectionAggregates
+from mortality.cache import dataset_version, read_table_cached
+from mortality.cause_table import CauseTable
+from mortality.causes import CauseCatalog
+from mortality.cube import CountCube
+from mortality.dimensions import Geography, municipality_key
+from mortality.metrics import startup
+from mortality.municipalities import DIMENSION as MUNICIPALITY_DIMENSION, MunicipalityIndex
+from mortality.prefixes import CausePrefixIndex
+from mortality.schema import compact_mortality, format_report, memory_report
+
+
+class Dataset:
+    """Datos cargados y estructuras derivadas, compartidos por los callbacks."""
+
+    def __init__(self, mortality, codes, divipola, version, cause_catalog=None, year=None,
+                 geography=None):
+        self.mortality = mortality
+        self.codes = codes
+        self.divipola = divipola
+        self.version = version
+        self.year = year
+
+        # Catálogo CIE-10 del Anexo2: el esquema del libro se resuelve una sola vez
+        # (y se comparte entre los años si ya viene construido)
+        if cause_catalog is None:
+            cause_catalog = CauseCatalog.from_frame(codes)
+            print(f"Catálogo CIE-10: {len(cause_catalog)} códigos")
+        self.cause_catalog = cause_catalog
+
+        # Nombres de departamentos y municipios por código DIVIPOLA
+        self.geography = geography or Geography.from_divipola(divipola)
+
+        # Cubo de conteos compartido por los callbacks: las consultas suman celdas
+        # precalculadas en lugar de agrupar los registros en cada solicitud. El
+        # nombre del departamento se resuelve por celda, no por registro (lo
+        # que antes era la unión con la Divipola).
+        with startup('cube', year=year):
+            cube = CountCube.from_frame(mortality)
+        with startup('departments', year=year):
+            cube = cube.derive('NOM_DPTO', self.geography.municipality_departments(
+                cube.cell_labels('COD_DPTO'), cube.cell_labels('COD_MUNIC')))
+        # Código DIVIPOLA de municipio por celda, para el filtro de municipio
+        # (ver mortality/municipalities.py)
+        with startup('municipalities', year=year):
+            self.cube = cube.derive(MUNICIPALITY_DIMENSION, municipality_key(
+                cube.cell_labels('COD_DPTO'), cube.cell_labels('COD_MUNIC')))
+        print(f"Cubo de conteos: {len(self.cube)} celdas")
+
+        # Índice de prefijos CIE-10: cada familia de causas es un tramo del
+        # arreglo ordenado de códigos (ver mortality/prefixes.py)
+        with startup('cause_index', year=year):
+            self.cause_index = CausePrefixIndex.from_cube(self.cube)
+
+        # Celdas de homicidios (códigos que empiecen con X95)
+        self.homicide_cells = self.cause_index.family('homicidios')
+
+        # Tabla de causas paginada en el servidor: órdenes e índices de prefijos
+        # por código y por descripción (ver mortality/cause_table.py)
+        with startup('cause_table', year=year):
+            self.cause_table = CauseTable.from_cube(self.cube, cause_catalog)
+
+        # Grupo y capítulo CIE-10 de cada causa del cubo: los conteos por
+        # grupo o capítulo son un bincount de ``cause_totals`` (ver causes.py)
+        self.cause_levels = cause_catalog.levels(self.cube.labels['CAUSA_DEFUNCION'])
+
+    def cause_rollup(self, agg, level='grupo'):
+        """Conteos de la selección ``agg`` por grupo de tres caracteres o por capítulo CIE-10."""
+        return self.cause_catalog.rollup(self.cause_levels[level], agg.cause_totals, level)
+
+    def warm(self):
+        """Construye por adelantado los rollups del cubo que usan los callbacks.
+
+        Llamado en el proceso maestro, deja esas estructuras en páginas
+        compartidas en lugar de que cada worker construya su propia copia
+        en la primera solicitud.
+        """
+        agg = SelectionAggregates(self.cube, homicide_cells=self.homicide_cells)
+        for name, value in vars(SelectionAggregates).items():
+            if isinstance(value, cached_property):
+                getattr(agg, name)
+
+
+class Reference:
+    """Tablas comunes a todos los años: códigos CIE-10 y Divipola."""
+
+    def __init__(self, codes, divipola, files):
+        self.codes = codes
+        self.divipola = divipola
+        self.files = files
+        with startup('cause_catalog'):
+            self.cause_catalog = CauseCatalog.from_frame(codes)
+        print(f"Catálogo CIE-10: {len(self.cause_catalog)} códigos")
+        with startup('geography'):
+            self.geography = Geography.from_divipola(divipola)
+        # Búsqueda de municipios por nombre para el filtro del Panel de Control
+        with startup('municipality_index'):
+            self.municipality_index = MunicipalityIndex.from_geography(self.geography)
+
+
+def load_reference(codes_file=None, divipola_file=None):
+    """Lee el catálogo de causas y la Divipola (desde la caché columnar si existe)."""
+    codes_file = codes_file or config.CODES_FILE
+    divipola_file = divipola_file or config.DIVIPOLA_FILE
+
+    # Códigos de causas de muerte - ajustar según estructura real
+    try:
+        df_codes = read_table_cached(codes_file)
+        print(f"Códigos de causas cargados: {len(df_codes)} registros")
+    except Exception as e:
+        print(f"Error cargando códigos de causas: {e}")
+        df_codes = pd.DataFrame()  # DataFrame vacío como fallback
+
+    # División político-administrativa
+    df_divipola = read_table_cached(divipola_file)
+    print(f"Registros Divipola: {len(df_divipola)}")
+
+    # Renombrar columnas para consistencia
+    df_divipola = df_divipola.rename(columns={
+        'COD_DEPARTAMENTO': 'COD_DPTO',
+        'DEPARTAMENTO': 'NOM_DPTO',
+        'COD_MUNICIPIO': 'COD_MUNIC',
+        'MUNICIPIO': 'NOM_MUNIC'
+    })
+    return Reference(df_codes, df_divipola, [codes_file, divipola_file])
+
+
+def load_year(mortality_file, reference, year=None):
+    """Lee el Anexo1 de un año y prepara su Dataset sobre las tablas comunes."""
+    print(f"Cargando datos de mortalidad: {os.path.basename(mortality_file)}")
+
+    # Datos de mortalidad no fetal del año
+    df_mortality = read_table_cached(mortality_file)
+    print(f"Registros de mortalidad: {len(df_mortality)}")
+
+    # Ajustar nombres de columnas en df_mortality (anexos en Excel y
+    # microdatos CSV/TXT del DANE)
+    df_mortality = df_mortality.rename(columns={
+        'COD_DEPARTAMENTO': 'COD_DPTO',
+        'COD_MUNICIPIO': 'COD_MUNIC',
+        'AO': 'ANO',
+        'COD_MUERTE': 'CAUSA_DEFUNCION',
+        'A_O': 'ANO',
+        'GRU_ED1': 'GRUPO_EDAD1',
+        'C_BAS1': 'CAUSA_DEFUNCION'
+    })
+
+    # Los nombres de departamento y municipio no se unen a cada registro: se
+    # resuelven desde la Divipola por código (ver mortality/dimensions.py)
+
+    # Esquema compacto: solo las columnas usadas, códigos enteros pequeños y
+    # nombres/causas como categorías (menos memoria por worker)
+    with startup('compact', year=year):
+        df_compact = compact_mortality(df_mortality)
+    print("Memoria de df_mortality por columna (bytes):")
+    print(format_report(memory_report(df_mortality, df_compact)))
+
+    version = dataset_version([mortality_file] + reference.files)
+    dataset = Dataset(df_compact, reference.codes, reference.divipola, version,
+                      cause_catalog=reference.cause_catalog, year=year,
+                      geography=reference.geography)
+    with startup('warm', year=year):
+        dataset.warm()
+    return dataset
+
+
+def load_dataset(mortality_file=None, codes_file=None, divipola_file=None):
+    """Lee los anexos de un solo año (desde la caché columnar si existe) y prepara el Dataset."""
+    reference = load_reference(codes_file, divipola_file)
+    return load_year(mortality_file or config.MORTALITY_FILE, reference)
+
+
+def freeze():
+    """Excluye del recolector de basura los objetos cargados hasta ahora.
+
+    Se llama en el proceso maestro justo antes de crear los workers: así
+    las pasadas del recolector en cada worker no modifican los encabezados
+    de esos objetos y sus páginas siguen compartidas.
+    """
+    gc.collect()
+    gc.freeze()
@@ -0,0 +1,94 @@
+"""Dimensión geográfica (Divipola) como arreglos indexados por código.
+
+Los registros de mortalidad solo traen los códigos DIVIPOLA de
+departamento y municipio. En lugar de unir la Divipola a cada registro (y
+volver a unirla a los conteos en cada solicitud), :class:`Geography`
+construye una sola vez arreglos de nombres indexados directamente por
+código: ``departamento`` (0-99) y ``departamento * 1000 + municipio``
+(0-99999). Resolver un nombre es indexar un arreglo, y solo se hace para
+las pocas filas que muestra cada gráfica.
+"""
+import numpy as np
+import pandas as pd
+
+UNKNOWN = 'Desconocido'
+
+# Tamaño de los arreglos: códigos DIVIPOLA de dos (departamento) y tres (municipio) dígitos
+DEPARTMENT_SLOTS = 100
+MUNICIPALITY_SLOTS = 1000
+
+
+def _valid_code(values, slots):
+    return (values >= 0) & (values < slots) & (values == np.floor(values))
+
+
+def department_key(departamento):
+    """Código DIVIPOLA de departamento como entero; -1 si falta o no es válido."""
+    dpto = np.asarray(departamento, dtype=np.float64)
+    valid = _valid_code(dpto, DEPARTMENT_SLOTS)
+    keys = np.full(dpto.shape, -1, dtype=np.int64)
+    keys[valid] = dpto[valid].astype(np.int64)
+    return keys
+
+
+def municipality_key(departamento, municipio):
+    """Código DIVIPOLA de municipio (departamento * 1000 + municipio); -1 si falta."""
+    dpto = np.asarray(departamento, dtype=np.float64)
+    munic = np.asarray(municipio, dtype=np.float64)
+    valid = _valid_code(dpto, DEPARTMENT_SLOTS) & _valid_code(munic, MUNICIPALITY_SLOTS)
+    keys = np.full(dpto.shape, -1, dtype=np.int64)
+    keys[valid] = dpto[valid].astype(np.int64) * MUNICIPALITY_SLOTS + munic[valid].astype(np.int64)
+    return keys
+
+
+def _take(table, keys):
+    # NaN para los códigos fuera de rango o ausentes de la Divipola
+    keys = np.asarray(keys)
+    result = np.full(keys.shape, np.nan, dtype=object)
+    valid = (keys >= 0) & (keys < len(table))
+    result[valid] = table[keys[valid]]
+    return result
+
+
+class Geography:
+    """Nombres de departamentos y municipios por código DIVIPOLA."""
+
+    def __init__(self, department_names, municipality_names, municipality_departments):
+        self.department_table = department_names
+        self.municipality_table = municipality_names
+        self.municipality_department_table = municipality_departments
+
+    @classmethod
+    def from_divipola(cls, df_divipola):
+        """Construye los arreglos a partir de la Divipola (columnas ya renombradas)."""
+        departments = np.full(DEPARTMENT_SLOTS, np.nan, dtype=object)
+        municipalities = np.full(DEPARTMENT_SLOTS * MUNICIPALITY_SLOTS, np.nan, dtype=object)
+        municipality_departments = municipalities.copy()
+        if not {'COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC'} <= set(df_divipola.columns):
+            return cls(departments, municipalities, municipality_departments)
+
+        table = df_divipola[['COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC']]
+        # Primer nombre de cada código, como quedaría tras drop_duplicates()
+        dpto = table.drop_duplicates('COD_DPTO')
+        keys = department_key(dpto['COD_DPTO'])
+        departments[keys[keys >= 0]] = dpto['NOM_DPTO'].to_numpy()[keys >= 0]
+
+        munic = table.drop_duplicates(['COD_DPTO', 'COD_MUNIC'])
+        keys = municipality_key(munic['COD_DPTO'], munic['COD_MUNIC'])
+        municipalities[keys[keys >= 0]] = munic['NOM_MUNIC'].to_numpy()[keys >= 0]
+        municipality_departments[keys[keys >= 0]] = munic['NOM_DPTO'].to_numpy()[keys >= 0]
+        return cls(departments, municipalities, municipality_departments)
+
+    def department_names(self, departamento):
+        """Nombre de cada código de departamento (``NaN`` si no está en la Divipola)."""
+        return _take(self.department_table, department_key(departamento))
+
+    def municipality_names(self, departamento, municipio):
+        """Nombre de cada municipio (``NaN`` si el par de códigos no está en la Divipola)."""
+        return _take(self.municipality_table, municipality_key(departamento, municipio))
+
+    def municipality_departments(self, departamento, municipio, default=UNKNOWN):
+        """Departamento de cada municipio según la Divipola; ``default`` si el par no existe."""
+        names = _take(self.municipality_department_table, municipality_key(departamento, municipio))
+        names[pd.isna(names)] = default
+        return names
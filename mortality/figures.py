@@ -0,0 +1,168 @@
+"""Plantillas de las figuras del tablero.
+
+Cada figura se construye una sola vez al cargar la aplicación como un
+``go.Figure`` sin datos, con las mismas trazas, ejes, escalas de color y
+textos que generaba Plotly Express. La plantilla va en el layout inicial de
+cada ``dcc.Graph``; los callbacks devuelven un ``dash.Patch`` que solo
+reemplaza los arreglos de la selección (``x``/``y``/``values`` y el título
+cuando cambia), de modo que en cada solicitud no se construye ni se
+valida ninguna figura y la respuesta lleva solo los datos.
+
+Las funciones ``fill_*`` arman esos Patch. Los índices de las trazas son
+fijos: el gráfico apilado tiene siempre una traza por código de sexo
+(:data:`SEX_CODES`) y oculta las que no tienen datos.
+"""
+import dash
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.colors import sequential
+
+from mortality.labels import SEX_NAMES
+
+# Forma de las salidas de los callbacks (parte de la versión de las cachés de resultados)
+FORMAT_VERSION = 2
+
+# Códigos de sexo con traza propia en el gráfico apilado, en orden
+SEX_CODES = (1, 2, 3)
+
+
+def _axes(x_title, y_title):
+    return {
+        'xaxis': {'anchor': 'y', 'domain': [0.0, 1.0], 'title': {'text': x_title}},
+        'yaxis': {'anchor': 'x', 'domain': [0.0, 1.0], 'title': {'text': y_title}},
+    }
+
+
+def _colorscale(colors):
+    return [[i / (len(colors) - 1), color] for i, color in enumerate(colors)]
+
+
+def _color_bars(x_name, y_name, colors, title, x_title, y_title, **layout):
+    """Barras coloreadas por su valor (como ``px.bar(..., color=y)``)."""
+    fig = go.Figure(go.Bar(
+        x=[], y=[], orientation='v', name='', legendgroup='', showlegend=False,
+        textposition='auto', xaxis='x', yaxis='y',
+        marker={'color': [], 'coloraxis': 'coloraxis', 'pattern': {'shape': ''}},
+        hovertemplate=f'{x_name}=%{{x}}<br>{y_name}=%{{marker.color}}<extra></extra>'
+    ))
+    fig.update_layout(
+        **_axes(x_title, y_title),
+        coloraxis={'colorbar': {'title': {'text': y_name}}, 'colorscale': _colorscale(colors)},
+        legend={'tracegroupgap': 0},
+        margin={'t': 60},
+        barmode='relative',
+        title=title,
+        showlegend=False,
+        **layout
+    )
+    return fig
+
+
+def department_bars():
+    """Barras por departamento del mapa cuando no hay GeoJSON."""
+    fig = _color_bars('NOM_DPTO', 'muertes', sequential.Reds, 'Distribución de Muertes por Departamento',
+                      'Departamento', 'Número de Muertes')
+    fig.update_xaxes(tickangle=45)
+    return fig
+
+
+def monthly_line():
+    """Línea de muertes por mes; el título (con el año) lo fija :func:`fill_line`."""
+    fig = go.Figure(go.Scatter(
+        x=[], y=[], mode='lines+markers', orientation='v', name='', legendgroup='',
+        showlegend=False, xaxis='x', yaxis='y',
+        line={'color': '#636efa', 'dash': 'solid'}, marker={'symbol': 'circle'},
+        hovertemplate='mes_nombre=%{x}<br>muertes=%{y}<extra></extra>'
+    ))
+    fig.update_layout(**_axes('Mes', 'Número de Muertes'), legend={'tracegroupgap': 0},
+                      margin={'t': 60}, title='Muertes por Mes', showlegend=False)
+    return fig
+
+
+def violent_cities():
+    """Barras de los municipios con más homicidios."""
+    return _color_bars('NOM_MUNIC', 'homicidios', sequential.Reds, '5 Ciudades Más Violentas (Homicidios)',
+                       'Ciudad', 'Número de Homicidios')
+
+
+def low_mortality_pie():
+    """Torta de los municipios con menos muertes."""
+    fig = go.Figure(go.Pie(
+        labels=[], values=[], domain={'x': [0.0, 1.0], 'y': [0.0, 1.0]}, name='', legendgroup='',
+        showlegend=True, textposition='inside', textinfo='label+value+percent', textfont={'size': 12},
+        hovertemplate='<b>%{label}</b><br>Muertes: %{value}<br>Porcentaje: %{percent}<extra></extra>'
+    ))
+    fig.update_layout(legend={'tracegroupgap': 0}, margin={'t': 60},
+                      title='10 Ciudades con Menor Índice de Mortalidad', showlegend=True)
+    return fig
+
+
+def sex_stack():
+    """Barras apiladas por departamento con una traza por sexo."""
+    colorway = pio.templates[pio.templates.default].layout.colorway
+    fig = go.Figure([
+        go.Bar(
+            x=[], y=[], name=SEX_NAMES[code], legendgroup=SEX_NAMES[code], orientation='v',
+            showlegend=True, textposition='auto', xaxis='x', yaxis='y',
+            marker={'color': colorway[i % len(colorway)], 'pattern': {'shape': ''}},
+            hovertemplate=f'SEXO={SEX_NAMES[code]}<br>NOM_DPTO=%{{x}}<br>muertes=%{{y}}<extra></extra>'
+        )
+        for i, code in enumerate(SEX_CODES)
+    ])
+    fig.update_layout(**_axes('Departamento', 'Número de Muertes'),
+                      legend={'title': {'text': 'SEXO'}, 'tracegroupgap': 0},
+                      margin={'t': 60}, barmode='stack', title='Muertes por Sexo y Departamento')
+    return fig
+
+
+def age_bars():
+    """Barras por grupo de edad."""
+    fig = _color_bars('grupo', 'muertes', sequential.Viridis, 'Distribución de Muertes por Grupos de Edad',
+                      'Grupo de Edad', 'Número de Muertes', plot_bgcolor='white', paper_bgcolor='white')
+    fig.update_xaxes(tickangle=45, gridcolor='lightgray')
+    fig.update_yaxes(gridcolor='lightgray')
+    return fig
+
+
+def _list(values):
+    return values.tolist() if hasattr(values, 'tolist') else list(values)
+
+
+def fill_bars(x, y):
+    """Patch de una plantilla de barras coloreadas por valor."""
+    y = _list(y)
+    patch = dash.Patch()
+    patch['data'][0]['x'] = _list(x)
+    patch['data'][0]['y'] = y
+    patch['data'][0]['marker']['color'] = y
+    return patch
+
+
+def fill_line(x, y, title):
+    """Patch de :func:`monthly_line`."""
+    patch = dash.Patch()
+    patch['data'][0]['x'] = _list(x)
+    patch['data'][0]['y'] = _list(y)
+    patch['layout']['title']['text'] = title
+    return patch
+
+
+def fill_pie(labels, values):
+    """Patch de :func:`low_mortality_pie`."""
+    patch = dash.Patch()
+    patch['data'][0]['labels'] = _list(labels)
+    patch['data'][0]['values'] = _list(values)
+    return patch
+
+
+def fill_stack(x, y, sexes):
+    """Patch de :func:`sex_stack`: reparte las filas por código de sexo y oculta las trazas vacías."""
+    x, y, sexes = np.asarray(x, dtype=object), np.asarray(y), np.asarray(sexes)
+    patch = dash.Patch()
+    for i, code in enumerate(SEX_CODES):
+        rows = sexes == code
+        patch['data'][i]['x'] = x[rows].tolist()
+        patch['data'][i]['y'] = y[rows].tolist()
+        patch['data'][i]['visible'] = bool(rows.any())
+    return patch
@@ -0,0 +1,148 @@
+"""Motor de filtros compartido por los callbacks del tablero.
+
+En lugar de copiar ``df_mortality`` y volver a comparar columnas completas
+en cada callback, se precalcula para cada valor de cada dimensión filtrable
+(departamento, sexo y grupo de edad) un mapa de bits empaquetado
+(``np.packbits``, un bit por fila) con las filas que tienen ese valor.
+
+Los filtros del Panel de Control admiten varios valores: una combinación se
+resuelve con un OR de los mapas de bits de los valores elegidos dentro de
+cada dimensión y un AND entre dimensiones, operando sobre bytes (ocho filas
+por operación). El resultado se guarda en una caché LRU para que todos los
+callbacks de la misma selección lo reutilicen.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+ALL = 'all'
+
+# Columna del DataFrame asociada a cada filtro del Panel de Control
+FILTER_COLUMNS = {
+    'departamento': 'NOM_DPTO',
+    'sexo': 'SEXO',
+    'edad': 'GRUPO_EDAD1',
+}
+
+
+def _key(value):
+    # Los dropdowns envían texto ('1') o números (25); se comparan como texto
+    return str(value)
+
+
+def normalize(value):
+    """Forma canónica del valor de un filtro: ``ALL`` o una tupla ordenada de textos.
+
+    Acepta un valor suelto o una lista (dropdowns con ``multi=True``). Una
+    lista vacía, ``None`` o una lista que incluya ``'all'`` equivalen a no
+    filtrar.
+    """
+    if value is None:
+        return ALL
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        keys = {_key(v) for v in value}
+        if not keys or ALL in keys:
+            return ALL
+        return tuple(sorted(keys))
+    key = _key(value)
+    return ALL if key == ALL else (key,)
+
+
+def canonical(value):
+    """Valor de un filtro para claves de caché: ``'all'``, un texto o una lista ordenada de textos.
+
+    Una selección de un solo valor queda igual que en un dropdown simple,
+    así que comparte entradas con el precalculado (mortality/prerender.py).
+    """
+    keys = normalize(value)
+    if keys == ALL:
+        return ALL
+    return keys[0] if len(keys) == 1 else list(keys)
+
+
+class FilterEngine:
+    """Resuelve combinaciones (departamento, sexo, edad) a filas de ``df``."""
+
+    def __init__(self, df, columns=None, cache_size=64):
+        self.columns = dict(columns or FILTER_COLUMNS)
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = len(df)
+
+        self._index_dtype = np.int32 if len(df) < np.iinfo(np.int32).max else np.int64
+        self._bitmaps = {}
+        for name, column in self.columns.items():
+            groups = df.groupby(column, sort=False, observed=True).indices
+            bitmaps = {}
+            for value, rows in groups.items():
+                bits = np.zeros(self._size, dtype=bool)
+                bits[rows] = True
+                bitmaps[_key(value)] = np.packbits(bits)
+            self._bitmaps[name] = bitmaps
+        self._empty = np.empty(0, dtype=self._index_dtype)
+
+    def values(self, name):
+        """Valores disponibles para el filtro ``name``."""
+        return list(self._bitmaps[name])
+
+    @property
+    def nbytes(self):
+        """Memoria ocupada por los mapas de bits."""
+        return sum(bits.nbytes for bitmaps in self._bitmaps.values() for bits in bitmaps.values())
+
+    def rows(self, departamento=ALL, sexo=ALL, edad=ALL):
+        """Posiciones (ordenadas) de las filas que cumplen los filtros.
+
+        Cada filtro puede ser un valor o una lista de valores. Devuelve
+        ``None`` cuando ningún filtro está activo, para que el llamador use
+        el DataFrame completo sin copiarlo.
+        """
+        selection = (normalize(departamento), normalize(sexo), normalize(edad))
+        with self._lock:
+            if selection in self._cache:
+                self._cache.move_to_end(selection)
+                return self._cache[selection]
+
+        bits = self._resolve(dict(zip(('departamento', 'sexo', 'edad'), selection)))
+        if bits is None:
+            result = None
+        else:
+            result = np.flatnonzero(np.unpackbits(bits, count=self._size)).astype(self._index_dtype)
+
+        with self._lock:
+            self._cache[selection] = result
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _resolve(self, selection):
+        # Mapa de bits empaquetado de la selección, o None si no hay filtros
+        result = None
+        for name, keys in selection.items():
+            if keys == ALL:
+                continue
+            bitmaps = [self._bitmaps[name][key] for key in keys if key in self._bitmaps[name]]
+            if not bitmaps:
+                return np.zeros((self._size + 7) // 8, dtype=np.uint8)
+            # OR dentro de la dimensión (sin copiar cuando hay un solo valor)
+            union = bitmaps[0]
+            if len(bitmaps) > 1:
+                union = np.bitwise_or(bitmaps[0], bitmaps[1])
+                for bits in bitmaps[2:]:
+                    union |= bits
+            # AND entre dimensiones (los mapas guardados no se modifican)
+            result = union if result is None else np.bitwise_and(result, union)
+        return result
+
+    def mask(self, departamento=ALL, sexo=ALL, edad=ALL):
+        """Máscara booleana equivalente a :meth:`rows`."""
+        mask = np.zeros(self._size, dtype=bool)
+        rows = self.rows(departamento, sexo, edad)
+        if rows is None:
+            mask[:] = True
+        else:
+            mask[rows] = True
+        return mask
+
@@ -0,0 +1,302 @@
+"""Geometría simplificada de departamentos y municipios para el mapa.
+
+Los GeoJSON oficiales de Colombia (Marco Geoestadístico Nacional del DANE)
+pesan decenas de MB, demasiado para enviarlos al navegador. Este módulo
+simplifica cada capa una sola vez con Douglas-Peucker en varios niveles de
+tolerancia (:data:`TOLERANCES`), redondea las coordenadas a la precisión de
+cada nivel y guarda el resultado como JSON compacto en la caché, identificado
+por el hash del archivo fuente. Cada polígono queda con ``id`` igual a su
+código DIVIPOLA entero (el mismo de :mod:`mortality.dimensions`), sin
+propiedades.
+
+La geometría viaja al navegador una sola vez, en la figura inicial del mapa;
+los callbacks solo envían los conteos por región (ver ``build_map`` en
+``app.py``).
+
+Uso como paso de construcción::
+
+    python -m mortality.geometry
+
+Termina con código de salida 1 si falta alguna capa o no tiene polígonos
+con código DIVIPOLA, para que el despliegue no salga con el mapa de barras
+de respaldo; ``--allow-missing`` solo omite las capas ausentes. El build de
+``render.yaml`` la usa mientras los GeoJSON no estén en el repositorio.
+"""
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from mortality import config
+from mortality.cache import dataset_version, file_hash
+from mortality.dimensions import DEPARTMENT_SLOTS, MUNICIPALITY_SLOTS
+
+FORMAT_VERSION = 1
+
+# Tolerancia de simplificación en grados (~2 km, ~500 m y ~100 m en Colombia)
+TOLERANCES = {
+    'baja': 0.02,
+    'media': 0.005,
+    'alta': 0.001,
+}
+
+LEVELS = ('departamentos', 'municipios')
+
+# Propiedades con el código DIVIPOLA, según la fuente del GeoJSON
+DEPARTMENT_PROPERTIES = ('DPTO_CCDGO', 'DPTO', 'COD_DPTO', 'DPTO_COD')
+MUNICIPALITY_PROPERTIES = ('MPIO_CDPMP', 'COD_DANE', 'COD_MPIO', 'MPIOS')
+MUNICIPALITY_PAIRS = (('DPTO_CCDGO', 'MPIO_CCDGO'), ('DPTO', 'MPIO'), ('COD_DPTO', 'COD_MUNIC'))
+
+
+def source_path(level):
+    """Archivo GeoJSON de una capa."""
+    return {
+        'departamentos': config.DEPARTMENTS_GEOJSON,
+        'municipios': config.MUNICIPALITIES_GEOJSON,
+    }[level]
+
+
+def _as_int(value):
+    try:
+        number = float(str(value).strip())
+    except ValueError:
+        return None
+    return int(number) if number == int(number) else None
+
+
+def geometry_version():
+    """Identificador de los GeoJSON en disco (cambia si se agrega o modifica una capa)."""
+    return dataset_version([source_path(level) for level in LEVELS])
+
+
+def feature_key(properties, level):
+    """Código DIVIPOLA entero de un polígono (como en mortality.dimensions); None si no tiene."""
+    properties = properties or {}
+    if level == 'departamentos':
+        for name in DEPARTMENT_PROPERTIES:
+            key = _as_int(properties.get(name))
+            if key is not None and 0 <= key < DEPARTMENT_SLOTS:
+                return key
+        return None
+
+    # Código completo de cinco dígitos ('05001') o par departamento/municipio
+    for name in MUNICIPALITY_PROPERTIES:
+        key = _as_int(properties.get(name))
+        if key is not None and 0 <= key < DEPARTMENT_SLOTS * MUNICIPALITY_SLOTS:
+            return key
+    for dpto_name, munic_name in MUNICIPALITY_PAIRS:
+        dpto = _as_int(properties.get(dpto_name))
+        munic = _as_int(properties.get(munic_name))
+        if dpto is not None and munic is not None:
+            if munic >= MUNICIPALITY_SLOTS:
+                # Algunas fuentes repiten el departamento en el código del municipio
+                munic %= MUNICIPALITY_SLOTS
+            return dpto * MUNICIPALITY_SLOTS + munic
+    return None
+
+
+def simplify_line(points, tolerance):
+    """Douglas-Peucker iterativo sobre un arreglo ``(n, 2)``; conserva los extremos."""
+    n = len(points)
+    if n <= 2 or tolerance <= 0:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, n - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        a, b = points[start], points[end]
+        inner = points[start + 1:end]
+        dx, dy = b - a
+        norm = math.hypot(dx, dy)
+        if norm == 0:
+            # Anillo cerrado: distancia al punto inicial
+            dist = np.hypot(inner[:, 0] - a[0], inner[:, 1] - a[1])
+        else:
+            dist = np.abs(dx * (inner[:, 1] - a[1]) - dy * (inner[:, 0] - a[0])) / norm
+        i = int(np.argmax(dist))
+        if dist[i] > tolerance:
+            split = start + 1 + i
+            keep[split] = True
+            stack.append((start, split))
+            stack.append((split, end))
+    return points[keep]
+
+
+def _simplify_ring(ring, tolerance, decimals):
+    points = np.round(simplify_line(np.asarray(ring, dtype=np.float64)[:, :2], tolerance), decimals)
+    # Un anillo necesita al menos cuatro puntos (el primero se repite al final)
+    return points.tolist() if len(points) >= 4 else None
+
+
+def _simplify_polygon(rings, tolerance, decimals):
+    exterior = _simplify_ring(rings[0], tolerance, decimals)
+    if exterior is None:
+        return None
+    holes = (_simplify_ring(ring, tolerance, decimals) for ring in rings[1:])
+    return [exterior] + [hole for hole in holes if hole is not None]
+
+
+def simplify_geometry(geometry, tolerance, decimals):
+    """Simplifica un ``Polygon`` o ``MultiPolygon``; descarta las islas que colapsan."""
+    if geometry['type'] == 'Polygon':
+        polygons = [geometry['coordinates']]
+    elif geometry['type'] == 'MultiPolygon':
+        polygons = geometry['coordinates']
+    else:
+        return None
+
+    simplified = [p for p in (_simplify_polygon(rings, tolerance, decimals) for rings in polygons)
+                  if p is not None]
+    if not simplified:
+        # Región más pequeña que la tolerancia: se conserva sin simplificar
+        simplified = [p for p in (_simplify_polygon(rings, 0, decimals) for rings in polygons)
+                      if p is not None]
+    if not simplified:
+        return None
+    if len(simplified) == 1:
+        return {'type': 'Polygon', 'coordinates': simplified[0]}
+    return {'type': 'MultiPolygon', 'coordinates': simplified}
+
+
+def _decimals(tolerance):
+    # Una cifra decimal más que la tolerancia
+    return max(0, math.ceil(-math.log10(tolerance)) + 1)
+
+
+def simplify_geojson(geojson, level, tolerance):
+    """FeatureCollection simplificada, con ``id`` DIVIPOLA y sin propiedades."""
+    decimals = _decimals(tolerance)
+    features = {}
+    for feature in geojson.get('features', []):
+        key = feature_key(feature.get('properties'), level)
+        geometry = feature.get('geometry')
+        if key is None or not geometry or key in features:
+            continue
+        simplified = simplify_geometry(geometry, tolerance, decimals)
+        if simplified is not None:
+            features[key] = {'type': 'Feature', 'id': key, 'geometry': simplified}
+    return {'type': 'FeatureCollection', 'features': [features[key] for key in sorted(features)]}
+
+
+def _entry_prefix(level, detail):
+    return f'geometria-{level}-{detail}-'
+
+
+def _cache_key(path, tolerance):
+    digest = hashlib.sha256(file_hash(path).encode())
+    digest.update(f'{FORMAT_VERSION}:{tolerance}'.encode())
+    return digest.hexdigest()[:20]
+
+
+def _prune(cache_dir, level, detail, keep):
+    # Elimina las versiones anteriores de la misma capa y nivel
+    prefix = _entry_prefix(level, detail)
+    for name in os.listdir(cache_dir):
+        full = os.path.join(cache_dir, name)
+        if name.startswith(prefix) and full != keep:
+            os.remove(full)
+
+
+def build_payload(level, detail, cache_dir=None):
+    """JSON compacto de una capa en un nivel de detalle, leído de la caché o generado.
+
+    Devuelve ``None`` si el GeoJSON fuente no existe.
+    """
+    path = source_path(level)
+    if not os.path.exists(path):
+        return None
+    tolerance = TOLERANCES[detail]
+    cache_dir = cache_dir or config.CACHE_DIR
+    cached = os.path.join(cache_dir, _entry_prefix(level, detail) + _cache_key(path, tolerance) + '.json')
+    if os.path.exists(cached):
+        with open(cached, encoding='utf-8') as fh:
+            return fh.read()
+
+    print(f"Simplificando {os.path.basename(path)} (tolerancia {tolerance}°)")
+    with open(path, encoding='utf-8') as fh:
+        geojson = json.load(fh)
+    payload = json.dumps(simplify_geojson(geojson, level, tolerance), separators=(',', ':'))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(cached + '.tmp', 'w', encoding='utf-8') as fh:
+            fh.write(payload)
+        os.replace(cached + '.tmp', cached)
+        _prune(cache_dir, level, detail, keep=cached)
+    except OSError as e:
+        print(f"No se pudo escribir la caché de geometría: {e}")
+    return payload
+
+
+def load_geometry(level, detail, cache_dir=None):
+    """FeatureCollection simplificada de una capa; ``None`` si no hay GeoJSON."""
+    payload = build_payload(level, detail, cache_dir)
+    return json.loads(payload) if payload is not None else None
+
+
+def feature_keys(geojson):
+    """Códigos DIVIPOLA (ordenados) de los polígonos de una capa simplificada."""
+    return np.array([feature['id'] for feature in geojson['features']], dtype=np.int64)
+
+
+def align(locations, keys, values):
+    """Valores de ``keys`` reordenados según ``locations``; 0 para las regiones sin datos."""
+    result = np.zeros(len(locations), dtype=np.int64)
+    keys = np.asarray(keys)
+    values = np.asarray(values)
+    pos = np.searchsorted(locations, keys)
+    found = (pos < len(locations)) & (locations[np.minimum(pos, len(locations) - 1)] == keys)
+    np.add.at(result, pos[found], values[found])
+    return result
+
+
+def build(cache_dir=None, allow_missing=False):
+    """Genera la caché de todas las capas en todos los niveles de detalle.
+
+    Devuelve la lista de problemas encontrados (capas ausentes o sin
+    polígonos); las capas ausentes se omiten sin error con ``allow_missing``.
+    """
+    problems = []
+    for level in LEVELS:
+        path = source_path(level)
+        if not os.path.exists(path):
+            if allow_missing:
+                print(f"Se omite {path}: no existe")
+            else:
+                problems.append(f"{path}: no existe")
+            continue
+        for detail in TOLERANCES:
+            payload = build_payload(level, detail, cache_dir)
+            features = len(json.loads(payload)['features'])
+            print(f"Geometría {level}/{detail}: {features} polígonos, {len(payload) / 1e3:,.0f} KB")
+            if not features:
+                problems.append(f"{path}: ningún polígono con código DIVIPOLA")
+                break
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Geometría simplificada de departamentos y municipios')
+    parser.add_argument('cache_dir', nargs='?', help='directorio de la caché (por defecto el de config)')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='omitir las capas sin GeoJSON en lugar de fallar')
+    args = parser.parse_args(argv)
+
+    problems = build(args.cache_dir, allow_missing=args.allow_missing)
+    for problem in problems:
+        print(f"ERROR: {problem}")
+    if problems:
+        print(f"Copie los GeoJSON del Marco Geoestadístico Nacional del DANE en {config.GEO_DIR} "
+              f"(o defina MORTALIDAD_GEO_DIR)")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,347 @@
+"""Lectura por lotes de los microdatos del DANE (Excel, CSV o TXT).
+
+``pd.read_excel`` construye en memoria el árbol completo de celdas de
+openpyxl y una lista de filas de Python antes de armar el DataFrame, por
+lo que el pico de memoria es varias veces el tamaño final. Aquí el libro
+se abre en modo ``read_only`` y las filas se recorren con
+``iter_rows(values_only=True)`` en lotes de tamaño fijo; cada lote se
+vuelca en búferes tipados por columna (:class:`ColumnBuffer`):
+
+* números: ``float64`` preasignado con el número de filas que declara la
+  hoja; al final se convierte a ``int64`` si no hubo vacíos ni decimales;
+* texto: códigos ``int32`` más un diccionario de valores distintos;
+* columnas mixtas (texto y números, fechas): ``object``.
+
+Así, el pico de memoria queda acotado por :func:`peak_bound` más el
+DataFrame final: los búferes, la misma cantidad otra vez para la conversión
+de cada columna (o el crecimiento de los búferes si la hoja no declara sus
+dimensiones), un lote de valores de Python y un margen fijo para openpyxl.
+El resultado es equivalente al de ``pd.read_excel(path)``: encabezado en la
+primera fila, ``Unnamed: n`` para encabezados vacíos y sin las filas y
+columnas vacías del final.
+
+Los archivos ``.csv`` y ``.txt`` (distribución de microdatos del DANE) se
+leen con ``pd.read_csv`` por bloques de texto hacia los mismos búferes,
+detectando el separador y la codificación; como en el libro, el tipo de
+cada columna se decide al final, así que el resultado es el mismo que el
+de ``pd.read_csv(path)`` sobre el archivo completo.
+"""
+import csv
+import os
+from collections import defaultdict
+
+import numpy as np
+import pandas as pd
+
+# Filas por lote
+BATCH_SIZE = 50_000
+
+# Bytes estimados por valor de Python en un lote (tupla, objeto y referencia)
+BATCH_BYTES_PER_VALUE = 64
+
+# Margen fijo para las estructuras de openpyxl (cadenas compartidas, estilos)
+WORKBOOK_ALLOWANCE = 8_000_000
+
+EXCEL_EXTENSIONS = ('.xlsx', '.xlsm')
+TEXT_EXTENSIONS = ('.csv', '.txt')
+
+
+def _normalize_object(value):
+    # Mismo criterio que pandas con openpyxl: los números enteros quedan como int
+    if value is None:
+        return np.nan
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _to_numeric(values):
+    """Arreglo numérico si todos los valores son números o texto numérico; si no, ``None``."""
+    try:
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='raise').to_numpy()
+    except (ValueError, TypeError):
+        return None
+
+
+class ColumnBuffer:
+    """Búfer tipado de una columna que crece por lotes."""
+
+    def __init__(self, capacity=0):
+        self.kind = None  # None (solo vacíos), 'number', 'text' u 'object'
+        self.size = 0
+        self.capacity = max(int(capacity), 1)
+        self.data = None
+        self.has_missing = False
+        self.has_fraction = False
+        self.categories = {}
+
+    def _allocate(self, kind, capacity):
+        if kind == 'number':
+            return np.full(capacity, np.nan, dtype=np.float64)
+        if kind == 'text':
+            return np.full(capacity, -1, dtype=np.int32)
+        data = np.empty(capacity, dtype=object)
+        data[:] = np.nan
+        return data
+
+    def _convert(self, kind):
+        data = self._allocate(kind, self.capacity)
+        if self.kind == 'number':
+            # Solo se pasa de número a object
+            data[:self.size] = [_normalize_object(None if np.isnan(v) else v)
+                                for v in self.data[:self.size].tolist()]
+        elif self.kind == 'text':
+            labels = np.empty(len(self.categories) + 1, dtype=object)
+            labels[:-1] = list(self.categories)
+            labels[-1] = np.nan
+            data[:self.size] = labels[self.data[:self.size]]
+            self.categories = {}
+        self.kind = kind
+        self.data = data
+
+    def _reserve(self, n):
+        if self.size + n <= self.capacity:
+            return
+        self.capacity = max(self.capacity * 2, self.size + n)
+        if self.data is not None:
+            grown = self._allocate(self.kind, self.capacity)
+            grown[:self.size] = self.data[:self.size]
+            self.data = grown
+
+    @staticmethod
+    def _batch_kind(values):
+        kinds = set(map(type, values))
+        kinds.discard(type(None))
+        if not kinds:
+            return None
+        if kinds <= {int, float}:
+            return 'number'
+        if kinds == {str}:
+            return 'text'
+        return 'object'
+
+    def extend(self, values):
+        """Agrega una secuencia de valores de Python (``None`` = vacío)."""
+        n = len(values)
+        batch_kind = self._batch_kind(values)
+        if batch_kind is not None and batch_kind != self.kind and self.kind != 'object':
+            self._convert(batch_kind if self.kind is None else 'object')
+        self._reserve(n)
+        start, stop = self.size, self.size + n
+        self.size = stop
+        if self.kind is None:
+            self.has_missing = True
+            return
+
+        if self.kind == 'number':
+            if None in values:
+                self.has_missing = True
+                values = [np.nan if v is None else v for v in values]
+            block = np.asarray(values, dtype=np.float64)
+            self.data[start:stop] = block
+            finite = block[~np.isnan(block)]
+            self.has_fraction = self.has_fraction or bool((finite != np.floor(finite)).any())
+        elif self.kind == 'text':
+            categories = self.categories
+            self.data[start:stop] = [-1 if v is None else categories.setdefault(v, len(categories))
+                                     for v in values]
+        else:
+            self.data[start:stop] = [_normalize_object(v) for v in values]
+
+    def extend_array(self, array):
+        """Agrega un bloque de texto leído por pandas (``NaN`` = vacío)."""
+        array = np.asarray(array, dtype=object)
+        values = array.tolist()
+        missing = pd.isna(array)
+        if missing.any():
+            values = [None if m else v for v, m in zip(values, missing.tolist())]
+        self.extend(values)
+
+    def truncate(self, size):
+        self.size = min(self.size, size)
+
+    def is_empty(self):
+        return self.kind is None
+
+    def finish(self):
+        """Arreglo final de la columna, con los tipos que usaría pandas."""
+        if self.kind is None:
+            return np.full(self.size, np.nan, dtype=np.float64)
+        data = self.data[:self.size]
+        if self.size < len(self.data) and self.kind != 'text':
+            # Se libera la capacidad sobrante
+            data = data.copy()
+        self.data = None
+        if self.kind == 'number':
+            if not self.has_missing and not self.has_fraction:
+                return data.astype(np.int64)
+            return data
+        if self.kind == 'text':
+            # Como el parser de pandas: texto con solo números ('05001') pasa a número
+            numeric = _to_numeric(list(self.categories))
+            if numeric is not None:
+                values = np.append(numeric.astype(np.float64), np.nan)[data]
+                if (data >= 0).all() and numeric.dtype.kind in 'iu':
+                    return values.astype(np.int64)
+                return values
+            labels = np.empty(len(self.categories) + 1, dtype=object)
+            labels[:-1] = list(self.categories)
+            labels[-1] = np.nan
+            return labels[data]
+        numeric = _to_numeric(data)
+        if numeric is not None:
+            return numeric
+        # Columnas object: fechas y booleanos se convierten como en pandas
+        inferred = pd.api.types.infer_dtype(data, skipna=True)
+        if inferred in ('datetime', 'datetime64', 'date'):
+            return pd.to_datetime(data).to_numpy()
+        if inferred == 'boolean' and not pd.isna(data).any():
+            return data.astype(bool)
+        return data
+
+
+def peak_bound(rows, columns, batch_size=BATCH_SIZE):
+    """Bytes máximos que usa la lectura por lotes, además del DataFrame final.
+
+    Búferes de 8 bytes por celda más otro tanto para la conversión final de
+    cada columna, un lote de valores de Python y un margen fijo para la
+    tabla de cadenas compartidas y los estilos que openpyxl carga al abrir
+    el libro.
+    """
+    return (2 * 8 * rows * columns + BATCH_BYTES_PER_VALUE * batch_size * columns
+            + WORKBOOK_ALLOWANCE)
+
+
+def _unique_names(names):
+    # Igual que el parser de pandas: encabezados vacíos como 'Unnamed: n' y
+    # duplicados con sufijo '.n' (saltando los que ya son encabezados), primero
+    # los encabezados con nombre y después los vacíos
+    result = [f'Unnamed: {i}' if name is None else name for i, name in enumerate(names)]
+    unnamed = [i for i, name in enumerate(names) if name is None]
+    counts = defaultdict(int)
+    for i in [i for i, name in enumerate(names) if name is not None] + unnamed:
+        name = original = result[i]
+        count = counts[name]
+        while count > 0:
+            counts[original] = count + 1
+            name = f'{original}.{count}'
+            count = count + 1 if name in result else counts[name]
+        result[i] = name
+        counts[name] = count + 1
+    return result
+
+
+def _build_frame(header, buffers, rows):
+    # Sin filas vacías al final ni columnas vacías (y sin encabezado) a la derecha
+    width = len(buffers)
+    while width and buffers[width - 1].is_empty() and (width > len(header) or header[width - 1] is None):
+        width -= 1
+    names = _unique_names(list(header[:width]) + [None] * (width - len(header)))
+    data = {}
+    for name, buffer in zip(names, buffers[:width]):
+        buffer.truncate(rows)
+        data[name] = buffer.finish()
+    return pd.DataFrame(data, index=pd.RangeIndex(rows), copy=False)
+
+
+def read_xlsx(path, sheet_name=0, batch_size=BATCH_SIZE):
+    """Lee una hoja de un libro ``.xlsx`` fila por fila, en lotes de ``batch_size``."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = (workbook.worksheets[sheet_name] if isinstance(sheet_name, int)
+                 else workbook[sheet_name])
+        declared_rows = sheet.max_row if isinstance(sheet.max_row, int) else None
+        capacity = (declared_rows - 1) if declared_rows and declared_rows > 1 else batch_size
+        rows = sheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        header = list(header) if header else []
+        buffers = [ColumnBuffer(capacity) for _ in header]
+        last_filled = 0  # filas hasta la última con algún valor
+        total = 0
+        batch = []
+
+        def flush():
+            width = max(len(row) for row in batch)
+            while len(buffers) < width:
+                # Celdas a la derecha del encabezado: columna nueva rellena de vacíos
+                buffer = ColumnBuffer(capacity)
+                buffer.extend([None] * total)
+                buffers.append(buffer)
+            columns = zip(*(row + (None,) * (len(buffers) - len(row)) for row in batch))
+            for buffer, values in zip(buffers, columns):
+                buffer.extend(values)
+            batch.clear()
+
+        for row in rows:
+            batch.append(row)
+            if any(value is not None for value in row):
+                last_filled = total + len(batch)
+            if len(batch) >= batch_size:
+                flush()
+                total += batch_size
+        if batch:
+            count = len(batch)
+            flush()
+            total += count
+    finally:
+        workbook.close()
+
+    return _build_frame(header, buffers, last_filled)
+
+
+def sniff_text(path, sample_size=1 << 16):
+    """Codificación y separador de un archivo de texto del DANE."""
+    with open(path, 'rb') as fh:
+        sample = fh.read(sample_size)
+    for encoding in ('utf-8-sig', 'latin-1'):
+        try:
+            text = sample.decode(encoding)
+            break
+        except UnicodeDecodeError:
+            continue
+    try:
+        delimiter = csv.Sniffer().sniff(text.splitlines()[0] if text else ',', delimiters=',;|\t').delimiter
+    except csv.Error:
+        delimiter = ','
+    return encoding, delimiter
+
+
+def read_text(path, batch_size=BATCH_SIZE, sep=None, encoding=None):
+    """Lee un ``.csv``/``.txt`` delimitado por bloques de ``batch_size`` filas."""
+    detected_encoding, detected_sep = sniff_text(path)
+    # Todo como texto: el tipo de cada columna se decide al final sobre el
+    # archivo completo (un bloque numérico seguido de uno con texto da una
+    # columna de texto, como al leer el archivo de una vez)
+    reader = pd.read_csv(path, sep=sep or detected_sep, encoding=encoding or detected_encoding,
+                         chunksize=batch_size, dtype=str)
+    header, buffers, rows = None, None, 0
+    with reader:
+        for chunk in reader:
+            if header is None:
+                header = list(chunk.columns)
+                buffers = [ColumnBuffer(batch_size) for _ in header]
+            for buffer, name in zip(buffers, header):
+                buffer.extend_array(chunk[name].to_numpy())
+            rows += len(chunk)
+    if header is None:
+        return pd.DataFrame()
+    # pandas ya nombró los encabezados vacíos y conserva sus columnas aunque estén vacías
+    return _build_frame(header, buffers, rows)
+
+
+def read_table(path, batch_size=BATCH_SIZE, **read_kwargs):
+    """Lee un archivo del DANE según su extensión, por lotes cuando es posible.
+
+    ``sheet_name`` se acepta para los libros de Excel; cualquier otro
+    argumento (o una extensión distinta, como ``.xls``) se delega a
+    ``pd.read_excel``.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in TEXT_EXTENSIONS:
+        return read_text(path, batch_size=batch_size, **read_kwargs)
+    if extension in EXCEL_EXTENSIONS and set(read_kwargs) <= {'sheet_name'}:
+        return read_xlsx(path, batch_size=batch_size, **read_kwargs)
+    return pd.read_excel(path, **read_kwargs)
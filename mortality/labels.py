@@ -0,0 +1,83 @@
+"""Etiquetas de mes, sexo y grupo de edad como arreglos de consulta.
+
+Los códigos del DANE son enteros pequeños (mes 1-12, sexo 1-3, grupo de
+edad 0-29), así que cada etiqueta se obtiene indexando un arreglo
+construido una sola vez al importar el módulo, en lugar de recorrer los
+valores con ``apply``/``map`` y un diccionario en cada solicitud. Los
+conteos por grupo de edad se suman con ``np.bincount`` sobre el índice del
+grupo.
+"""
+import numpy as np
+
+# Posición 0: mes fuera de 1-12
+MONTH_NAMES = np.array([
+    'Desconocido', 'Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+    'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre',
+], dtype=object)
+
+# Posición 0: sexo fuera de 1-3 (sin etiqueta)
+SEX_NAMES = np.array([np.nan, 'Masculino', 'Femenino', 'Indeterminado'], dtype=object)
+
+# Grupos de edad en el orden del ciclo de vida
+AGE_GROUPS = np.array([
+    'Mortalidad neonatal',
+    'Mortalidad infantil',
+    'Primera infancia',
+    'Niñez',
+    'Adolescencia',
+    'Juventud',
+    'Adultez temprana',
+    'Adultez intermedia',
+    'Vejez',
+    'Longevidad / Centenarios',
+    'Edad desconocida',
+], dtype=object)
+
+# Índice en AGE_GROUPS de cada código GRUPO_EDAD1 (0-29) según especificaciones
+AGE_GROUP_OF_CODE = np.array([
+    0, 0, 0, 0, 0,      # 0-4: neonatal
+    1, 1,               # 5-6: infantil
+    2, 2,               # 7-8: primera infancia
+    3, 3,               # 9-10: niñez
+    4,                  # 11: adolescencia
+    5, 5,               # 12-13: juventud
+    6, 6, 6,            # 14-16: adultez temprana
+    7, 7, 7,            # 17-19: adultez intermedia
+    8, 8, 8, 8, 8,      # 20-24: vejez
+    9, 9, 9, 9,         # 25-28: longevidad
+    10,                 # 29: edad desconocida
+], dtype=np.int8)
+
+
+def _lookup(table, codes):
+    """Posición en ``table`` de cada código; 0 si está fuera de rango o falta."""
+    codes = np.asarray(codes, dtype=np.float64)
+    valid = (codes >= 1) & (codes < len(table)) & (codes == np.floor(codes))
+    return np.where(valid, np.nan_to_num(codes), 0).astype(np.intp)
+
+
+def month_names(months):
+    """Nombre de cada mes; ``'Desconocido'`` fuera de 1-12."""
+    return MONTH_NAMES[_lookup(MONTH_NAMES, months)]
+
+
+def sex_names(sexes):
+    """Etiqueta de cada código de sexo; ``NaN`` fuera de 1-3."""
+    return SEX_NAMES[_lookup(SEX_NAMES, sexes)]
+
+
+def age_group_index(codes):
+    """Índice en :data:`AGE_GROUPS` de cada código de edad (-1 si no tiene grupo)."""
+    codes = np.asarray(codes, dtype=np.float64)
+    valid = (codes >= 0) & (codes < len(AGE_GROUP_OF_CODE)) & (codes == np.floor(codes))
+    index = np.full(len(codes), -1, dtype=np.intp)
+    index[valid] = AGE_GROUP_OF_CODE[codes[valid].astype(np.intp)]
+    return index
+
+
+def count_by_age_group(codes, counts):
+    """Defunciones por grupo de edad, alineadas con :data:`AGE_GROUPS`."""
+    index = age_group_index(codes)
+    valid = index >= 0
+    return np.bincount(index[valid], weights=np.asarray(counts)[valid],
+                       minlength=len(AGE_GROUPS)).astype(np.int64)
@@ -0,0 +1,274 @@
+"""Latencia de los callbacks y tiempos de arranque, en formato Prometheus.
+
+Cada callback de Dash se envuelve con :func:`instrument`, que mide su tiempo
+total repartido en fases exclusivas:
+
+- ``filter``: resolver la selección de filtros a celdas del cubo
+- ``aggregate``: sumar conteos (rollups y ``bincount``)
+- ``cache``: consultas a la caché de resultados y al precalculado
+- ``figure``: el resto del callback (armar figuras y tablas)
+- ``serialize``: lo que tarda Dash después del callback (validar y
+  convertir la respuesta a JSON), medido en el ``after_request`` de Flask
+  antes de comprimir la respuesta (ver mortality/responses.py)
+
+Las fases anidadas se descuentan de la fase que las contiene. Las
+mediciones van a histogramas de buckets fijos (acumulan en O(1) por
+observación, sin guardar muestras) de los que se estiman p50/p95/p99 como
+``histogram_quantile`` de Prometheus, junto con el tamaño de la respuesta
+en bytes sin comprimir. Los tiempos de arranque (lectura de cada anexo,
+construcción del cubo, etc.) se guardan como gauges con :func:`startup`.
+
+``/metrics`` (ver :func:`install`) expone todo en el formato de texto de
+Prometheus. Los valores son por proceso: con varios workers de gunicorn
+cada uno reporta sus propias solicitudes, y los tiempos de arranque del
+maestro (``--preload``) se heredan al crear los workers.
+"""
+import contextvars
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+import flask
+
+# Límites superiores de los buckets de latencia (segundos) y de tamaño (bytes)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+                   0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTE_BUCKETS = (1e3, 5e3, 1e4, 5e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+PREFIX = 'mortalidad'
+
+
+class Histogram:
+    """Histograma acumulativo de buckets fijos."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """Estimación del cuantil ``q`` interpolando dentro del bucket (como Prometheus)."""
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return float('nan')
+        rank = q * total
+        cumulative = 0
+        for i, count in enumerate(counts):
+            if cumulative + count >= rank and count:
+                if i == len(self.buckets):
+                    # Por encima del último límite: se reporta ese límite
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def cumulative(self):
+        with self._lock:
+            counts = list(self.counts)
+            total, value_sum = self.count, self.sum
+        running, result = 0, []
+        for bound, count in zip(self.buckets, counts):
+            running += count
+            result.append((bound, running))
+        return result, total, value_sum
+
+
+class Registry:
+    """Histogramas por callback y fase, y gauges de arranque."""
+
+    def __init__(self):
+        self.latency = {}
+        self.payload = {}
+        self.startup = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, table, key, buckets):
+        histogram = table.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = table.setdefault(key, Histogram(buckets))
+        return histogram
+
+    def observe_latency(self, callback, phase, seconds):
+        self._histogram(self.latency, (callback, phase), LATENCY_BUCKETS).observe(seconds)
+
+    def observe_payload(self, callback, size):
+        self._histogram(self.payload, callback, BYTE_BUCKETS).observe(size)
+
+    def set_startup(self, phase, seconds, **labels):
+        key = (phase,) + tuple(sorted((n, v) for n, v in labels.items() if v is not None))
+        with self._lock:
+            self.startup[key] = self.startup.get(key, 0.0) + seconds
+
+    def render(self):
+        """Texto en el formato de exposición de Prometheus."""
+        lines = []
+
+        def histogram_lines(name, help_text, table, label_names):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for key, histogram in sorted(table.items()):
+                values = key if isinstance(key, tuple) else (key,)
+                labels = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(label_names, values))
+                buckets, total, value_sum = histogram.cumulative()
+                for bound, running in buckets:
+                    lines.append(f'{name}_bucket{{{labels},le="{bound:g}"}} {running}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {total}')
+                lines.append(f'{name}_sum{{{labels}}} {value_sum:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {total}')
+
+        def quantile_lines(name, help_text, table, label_names):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} gauge')
+            for key, histogram in sorted(table.items()):
+                values = key if isinstance(key, tuple) else (key,)
+                labels = ','.join(f'{n}="{_escape(v)}"' for n, v in zip(label_names, values))
+                for q in QUANTILES:
+                    lines.append(f'{name}{{{labels},quantile="{q:g}"}} {histogram.quantile(q):.6f}')
+
+        histogram_lines(f'{PREFIX}_callback_seconds',
+                        'Tiempo de los callbacks de Dash por fase.',
+                        self.latency, ('callback', 'phase'))
+        quantile_lines(f'{PREFIX}_callback_seconds_quantile',
+                       'p50/p95/p99 estimados del tiempo de los callbacks por fase.',
+                       self.latency, ('callback', 'phase'))
+        histogram_lines(f'{PREFIX}_callback_response_bytes',
+                        'Tamaño de la respuesta de los callbacks de Dash.',
+                        self.payload, ('callback',))
+        quantile_lines(f'{PREFIX}_callback_response_bytes_quantile',
+                       'p50/p95/p99 estimados del tamaño de la respuesta.',
+                       self.payload, ('callback',))
+
+        lines.append(f'# HELP {PREFIX}_startup_seconds Tiempo de cada fase de la carga de datos.')
+        lines.append(f'# TYPE {PREFIX}_startup_seconds gauge')
+        with self._lock:
+            startup = sorted(self.startup.items())
+        for (phase, *labels), seconds in startup:
+            label_text = ','.join([f'phase="{_escape(phase)}"'] + [f'{n}="{_escape(v)}"' for n, v in labels])
+            lines.append(f'{PREFIX}_startup_seconds{{{label_text}}} {seconds:.6f}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+REGISTRY = Registry()
+
+
+class _Tracker:
+    # Fases del callback en curso: tiempo exclusivo por fase y pila de fases abiertas
+    def __init__(self):
+        self.phases = {}
+        self.children = [0.0]
+
+
+_active = contextvars.ContextVar('mortalidad_metrics', default=None)
+
+
+@contextmanager
+def phase(name):
+    """Suma el tiempo del bloque a la fase ``name`` del callback en curso.
+
+    Fuera de un callback instrumentado no mide nada.
+    """
+    tracker = _active.get()
+    if tracker is None:
+        yield
+        return
+    tracker.children.append(0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        nested = tracker.children.pop()
+        tracker.phases[name] = tracker.phases.get(name, 0.0) + elapsed - nested
+        tracker.children[-1] += elapsed
+
+
+def instrument(func=None, name=None):
+    """Decorador para callbacks: registra su tiempo por fase (ver el módulo)."""
+    if func is None:
+        return functools.partial(instrument, name=name)
+    name = name or func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        tracker = _Tracker()
+        token = _active.set(tracker)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            _active.reset(token)
+            # Lo que no cayó en otra fase es la construcción de figuras
+            tracker.phases['figure'] = tracker.phases.get('figure', 0.0) + elapsed - tracker.children[0]
+            for phase_name, seconds in tracker.phases.items():
+                REGISTRY.observe_latency(name, phase_name, seconds)
+            if flask.has_request_context():
+                flask.g.mortalidad_callback = (name, elapsed)
+
+    return wrapper
+
+
+@contextmanager
+def startup(phase_name, **labels):
+    """Registra la duración de una fase de la carga de datos."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.set_startup(phase_name, time.perf_counter() - start, **labels)
+
+
+def install(server, path='/metrics'):
+    """Mide la serialización y el tamaño de las respuestas, y publica ``path``.
+
+    Debe llamarse después de :func:`mortality.responses.install`: Flask
+    ejecuta los ``after_request`` en orden inverso al de registro, así que
+    esta medición queda antes de la compresión.
+    """
+
+    @server.before_request
+    def _start_timer():
+        flask.g.mortalidad_request_start = time.perf_counter()
+
+    @server.after_request
+    def _record_response(response):
+        measured = flask.g.pop('mortalidad_callback', None)
+        start = flask.g.pop('mortalidad_request_start', None)
+        if measured is not None and start is not None:
+            name, callback_seconds = measured
+            total = time.perf_counter() - start
+            REGISTRY.observe_latency(name, 'serialize', max(0.0, total - callback_seconds))
+            REGISTRY.observe_latency(name, 'total', total)
+            if not response.direct_passthrough:
+                REGISTRY.observe_payload(name, response.calculate_content_length() or 0)
+        return response
+
+    @server.route(path)
+    def metrics():
+        return flask.Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+    return metrics
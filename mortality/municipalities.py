@@ -0,0 +1,140 @@
+"""Búsqueda de municipios por nombre para el filtro del Panel de Control.
+
+Los ~1.100 municipios de la Divipola no van como opciones fijas del
+dropdown (inflarían el layout inicial): el filtro de municipio pide sus
+opciones a demanda con el ``search_value`` del dropdown y el servidor
+responde solo las coincidencias, limitadas a los departamentos elegidos.
+
+:class:`MunicipalityIndex` se construye una vez a partir de la Divipola
+(es común a todos los años): los municipios ordenados por nombre y un
+índice de prefijos con cada palabra del nombre normalizado (sin tildes ni
+mayúsculas, ver :func:`~mortality.causes.normalize_text`) y el municipio al
+que pertenece. Cada palabra buscada es un tramo del arreglo ordenado de
+palabras (``np.searchsorted``, como en mortality/prefixes.py): ``san
+vic`` encuentra ``SAN VICENTE`` y ``SAN VICENTE DEL CAGUÁN``, ``bogota``
+encuentra ``BOGOTÁ, D.C.``.
+
+El valor de cada opción es el código DIVIPOLA del municipio con cinco
+dígitos (``'05001'``), el mismo que agrega el cubo en la dimensión
+:data:`DIMENSION`.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+from mortality.causes import normalize_text
+from mortality.filters import ALL, normalize
+from mortality.prefixes import HIGHEST
+
+# Dimensión del cubo con el código DIVIPOLA de municipio (departamento * 1000 + municipio)
+DIMENSION = 'COD_DIVIPOLA'
+
+# Máximo de opciones por búsqueda
+LIMIT = 50
+
+WORD = re.compile(r'[A-Z0-9]+')
+
+
+def municipality_value(key):
+    """Valor de la opción del dropdown para un código DIVIPOLA de municipio."""
+    return f'{int(key):05d}'
+
+
+def municipality_keys(values):
+    """Códigos DIVIPOLA (enteros) de los valores del filtro; ``ALL`` si no filtra."""
+    keys = normalize(values)
+    if keys == ALL:
+        return ALL
+    return np.array(sorted({int(key) for key in keys if key.isdigit()}), dtype=np.int64)
+
+
+def search_words(text):
+    """Palabras de ``text`` sin tildes ni mayúsculas, como se indexan y se buscan."""
+    return WORD.findall(normalize_text(text))
+
+
+class MunicipalityIndex:
+    """Municipios ordenados por nombre con un índice de prefijos por palabra."""
+
+    def __init__(self, keys, names, departments):
+        names = np.asarray(names, dtype=object)
+        departments = np.asarray(departments, dtype=object)
+        normalized = np.array([' '.join(search_words(name)) for name in names], dtype=str)
+        # El id de un municipio es su posición en orden alfabético (nombre, departamento)
+        order = np.lexsort((departments.astype(str), normalized))
+        self.keys = np.asarray(keys, dtype=np.int64)[order]
+        self.names = names[order]
+        self.departments = departments[order]
+        self.values = np.array([municipality_value(key) for key in self.keys], dtype=object)
+        self.search_text = normalized[order]
+        self._key_order = np.argsort(self.keys)
+        self._sorted_keys = self.keys[self._key_order]
+
+        # Departamento de cada municipio como posición en la lista de nombres de departamento
+        self._department_names, self._department_of = np.unique(self.departments.astype(str),
+                                                                 return_inverse=True)
+
+        # Índice de palabras: cada palabra del nombre con el id de su municipio
+        words, owners = [], []
+        for i, text in enumerate(self.search_text):
+            for word in set(text.split()):
+                words.append(word)
+                owners.append(i)
+        words = np.array(words, dtype=str)
+        word_order = np.argsort(words, kind='stable')
+        self._words = words[word_order]
+        self._word_owners = np.asarray(owners, dtype=np.int32)[word_order]
+
+    @classmethod
+    def from_geography(cls, geography):
+        """Construye el índice con los municipios de la Divipola (ver :class:`~mortality.dimensions.Geography`)."""
+        keys = np.flatnonzero(pd.notna(geography.municipality_table))
+        return cls(keys, geography.municipality_table[keys], geography.municipality_department_table[keys])
+
+    def __len__(self):
+        return len(self.keys)
+
+    def scope(self, departamento):
+        """Máscara de los municipios de los departamentos elegidos (``None`` si no hay filtro)."""
+        names = normalize(departamento)
+        if names == ALL:
+            return None
+        wanted = np.isin(self._department_names, list(names))
+        return wanted[self._department_of]
+
+    def search(self, text, departamento=ALL, limit=LIMIT):
+        """Ids (en orden alfabético) de los municipios cuyo nombre tiene todas las palabras buscadas como prefijo.
+
+        Sin texto se devuelven los primeros ``limit`` municipios de los
+        departamentos elegidos (ninguno si no hay departamento elegido).
+        """
+        scope = self.scope(departamento)
+        words = search_words(text or '')
+        if not words:
+            return np.flatnonzero(scope)[:limit] if scope is not None else np.empty(0, dtype=np.int64)
+        ids = None
+        for word in words:
+            lo = int(np.searchsorted(self._words, word, side='left'))
+            hi = int(np.searchsorted(self._words, word + HIGHEST, side='right'))
+            found = np.unique(self._word_owners[lo:hi])
+            ids = found if ids is None else np.intersect1d(ids, found, assume_unique=True)
+        if scope is not None:
+            ids = ids[scope[ids]]
+        return ids[:limit]
+
+    def lookup(self, values):
+        """Ids de los municipios con los valores dados (se omiten los que no existen)."""
+        keys = municipality_keys(values)
+        if keys is ALL or not len(self.keys):
+            return np.empty(0, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, keys), len(self.keys) - 1)
+        found = self._sorted_keys[positions] == keys
+        return np.sort(self._key_order[positions[found]])
+
+    def options(self, ids):
+        """Opciones del dropdown: nombre y departamento, con el texto normalizado para la búsqueda del navegador."""
+        return [{'label': f'🏘️ {name} ({department})', 'value': value, 'search': search}
+                for name, department, value, search in zip(self.names[ids].tolist(), self.departments[ids].tolist(),
+                                                           self.values[ids].tolist(),
+                                                           self.search_text[ids].tolist())]
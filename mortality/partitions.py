@@ -0,0 +1,133 @@
+"""Datos de mortalidad particionados por año, cargados a demanda.
+
+El DANE publica un libro Anexo1 por año (``Anexo1.NoFetal<año>_*.xlsx``, o
+los microdatos ``nofetal<año>.csv``). En lugar de concatenar todos los años
+en un solo DataFrame, cada año es una partición independiente (un
+:class:`~mortality.dataset.Dataset` con su propio cubo de conteos) que se
+carga la primera vez que se consulta. Las particiones cargadas se guardan
+en un LRU acotado por ``MORTALIDAD_MAX_YEARS``: cada worker conserva solo
+los años que se están consultando. El año por defecto se carga al iniciar
+(en el maestro de gunicorn con ``--preload``) y queda fijo, ya que sus
+páginas son compartidas y descartarlo no liberaría memoria.
+
+Las tablas comunes (catálogo CIE-10 y Divipola) se leen una sola vez y se
+comparten entre todas las particiones.
+"""
+import glob
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from mortality import config
+from mortality.cache import dataset_version
+from mortality.dataset import load_reference, load_year
+
+YEAR_PATTERN = re.compile(r'nofetal_?(\d{4})', re.IGNORECASE)
+
+
+def discover_years(anexos_dir=None, pattern=None):
+    """``{año: ruta}`` de los libros de mortalidad disponibles."""
+    anexos_dir = anexos_dir or config.ANEXOS_DIR
+    files = {}
+    for path in sorted(glob.glob(os.path.join(anexos_dir, pattern or config.MORTALITY_GLOB))):
+        match = YEAR_PATTERN.search(os.path.basename(path))
+        if match and path.lower().endswith(config.MORTALITY_EXTENSIONS):
+            # Si hay varias versiones del mismo año, gana la última en orden alfabético
+            files[int(match.group(1))] = path
+    return dict(sorted(files.items()))
+
+
+class YearPartitions:
+    """LRU de particiones anuales cargadas a demanda."""
+
+    def __init__(self, files, reference, max_partitions=3, default_year=None, loader=load_year):
+        if not files:
+            raise FileNotFoundError('No se encontraron libros de mortalidad (Anexo1.NoFetal<año>)')
+        self.files = dict(sorted(files.items()))
+        self.reference = reference
+        self.max_partitions = max(1, max_partitions)
+        self.default_year = int(default_year) if default_year else max(self.files)
+        if self.default_year not in self.files:
+            raise KeyError(f'No hay datos de mortalidad para {self.default_year}')
+        self._loader = loader
+        self._partitions = OrderedDict()
+        self._pinned = {self.default_year}
+        self._lock = threading.Lock()
+        self._year_locks = {year: threading.Lock() for year in self.files}
+        self.loads = 0
+        self.evictions = 0
+
+        # Versión del conjunto completo (todos los años más las tablas comunes)
+        self.version = dataset_version(list(self.files.values()) + reference.files)
+
+    @property
+    def years(self):
+        return list(self.files)
+
+    def resolve(self, year):
+        """Año válido a partir del valor del selector (el por defecto si falta)."""
+        try:
+            year = int(year)
+        except (TypeError, ValueError):
+            return self.default_year
+        return year if year in self.files else self.default_year
+
+    def get(self, year=None):
+        """Dataset del año, cargándolo si no está en memoria."""
+        year = self.resolve(year)
+        with self._lock:
+            dataset = self._partitions.get(year)
+            if dataset is not None:
+                self._partitions.move_to_end(year)
+                return dataset
+
+        # Un lock por año: dos solicitudes simultáneas no cargan dos veces el mismo año
+        with self._year_locks[year]:
+            with self._lock:
+                dataset = self._partitions.get(year)
+            if dataset is None:
+                dataset = self._loader(self.files[year], self.reference, year=year)
+                with self._lock:
+                    self.loads += 1
+                    self._partitions[year] = dataset
+                    self._evict()
+            return dataset
+
+    def _evict(self):
+        # Desaloja los años menos usados recientemente, nunca los fijos
+        while len(self._partitions) > self.max_partitions:
+            victim = next((y for y in self._partitions if y not in self._pinned), None)
+            if victim is None:
+                break
+            del self._partitions[victim]
+            self.evictions += 1
+            print(f"Partición {victim} descargada de memoria")
+
+    def loaded(self):
+        with self._lock:
+            return list(self._partitions)
+
+    def stats(self):
+        return {
+            'years': self.years,
+            'default_year': self.default_year,
+            'loaded': self.loaded(),
+            'max_partitions': self.max_partitions,
+            'loads': self.loads,
+            'evictions': self.evictions,
+        }
+
+
+def load_partitions(anexos_dir=None, max_partitions=None, default_year=None):
+    """Descubre los años disponibles y carga el año por defecto."""
+    reference = load_reference()
+    files = discover_years(anexos_dir)
+    partitions = YearPartitions(
+        files, reference,
+        max_partitions=max_partitions or config.MAX_YEAR_PARTITIONS,
+        default_year=default_year or config.DEFAULT_YEAR,
+    )
+    print(f"Años disponibles: {', '.join(map(str, partitions.years))}")
+    partitions.get(partitions.default_year)
+    return partitions
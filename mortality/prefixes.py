@@ -0,0 +1,87 @@
+"""Índice de prefijos de causa CIE-10 sobre las celdas del cubo.
+
+Los códigos CIE-10 son jerárquicos por prefijo (``X95`` agrupa ``X950`` a
+``X959``, el rango ``X85``-``Y09`` agrupa las agresiones), de modo que en
+un arreglo ordenado de códigos cada familia de causas ocupa un tramo
+contiguo. :class:`CausePrefixIndex` guarda los códigos distintos ordenados
+y las celdas del cubo agrupadas por código (en formato CSR: permutación de
+celdas más desplazamientos por código), así que un prefijo o un rango de
+prefijos se resuelve con dos ``np.searchsorted`` y un corte, sin recorrer
+los códigos como texto en cada solicitud.
+"""
+import numpy as np
+
+from mortality.causes import normalize_codes
+
+# Mayor carácter Unicode: 'X95' + HIGHEST queda después de todo código que empiece con 'X95'
+HIGHEST = '\U0010ffff'
+
+# Familias de causas externas (rangos CIE-10 inclusivos por prefijo)
+CAUSE_FAMILIES = {
+    # Panel de ciudades más violentas: agresión con disparo de arma de fuego
+    'homicidios': [('X95', 'X95')],
+    'agresiones': [('X85', 'Y09')],
+    'transporte': [('V01', 'V89')],
+    'suicidios': [('X60', 'X84')],
+}
+
+
+class CausePrefixIndex:
+    """Celdas de un cubo agrupadas por código de causa ordenado."""
+
+    def __init__(self, codes, order, offsets, size):
+        # codes: códigos distintos ordenados
+        # order[offsets[i]:offsets[i + 1]]: celdas con el código codes[i]
+        self.codes = codes
+        self.order = order
+        self.offsets = offsets
+        self.size = size
+
+    @classmethod
+    def from_cube(cls, cube, dim='CAUSA_DEFUNCION'):
+        """Construye el índice a partir de las etiquetas y códigos de ``dim``."""
+        keys = normalize_codes(cube.labels[dim])
+        codes, label_rank = np.unique(keys, return_inverse=True)
+        cell_codes = cube.codes[dim]
+        present = np.flatnonzero(cell_codes >= 0)
+        rank = label_rank[cell_codes[present]]
+        sort = np.argsort(rank, kind='stable')
+        order = present[sort].astype(np.int32 if len(cell_codes) < 2**31 else np.int64)
+        offsets = np.searchsorted(rank[sort], np.arange(len(codes) + 1))
+        return cls(codes, order, offsets, len(cell_codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def code_range(self, first, last=None):
+        """Tramo ``[lo, hi)`` de ``codes`` con prefijo entre ``first`` y ``last``, inclusive."""
+        first = first.strip().upper()
+        last = (last or first).strip().upper()
+        lo = int(np.searchsorted(self.codes, first, side='left'))
+        hi = int(np.searchsorted(self.codes, last + HIGHEST, side='right'))
+        return lo, max(lo, hi)
+
+    def cells(self, *ranges):
+        """Celdas (ordenadas) cuyo código cae en alguno de los rangos de prefijos.
+
+        Cada rango es un prefijo (``'X95'``) o un par ``(primero, último)``
+        (``('X85', 'Y09')``).
+        """
+        parts = []
+        for item in ranges:
+            first, last = (item, None) if isinstance(item, str) else item
+            lo, hi = self.code_range(first, last)
+            parts.append(self.order[self.offsets[lo]:self.offsets[hi]])
+        if not parts:
+            return np.empty(0, dtype=self.order.dtype)
+        return np.unique(np.concatenate(parts))
+
+    def mask(self, *ranges):
+        """Máscara booleana sobre las celdas del cubo (para ``CountCube.count(where=...)``)."""
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.cells(*ranges)] = True
+        return mask
+
+    def family(self, name):
+        """Máscara de una familia de :data:`CAUSE_FAMILIES`."""
+        return self.mask(*CAUSE_FAMILIES[name])
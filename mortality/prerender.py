@@ -0,0 +1,183 @@
+"""Salidas del tablero precalculadas para todas las combinaciones de filtros.
+
+Como el espacio de filtros del Panel de Control es finito, este módulo
+recorre cada combinación (departamento, sexo, edad, año), calcula las
+salidas del callback consolidado (figuras en JSON y KPIs) y las guarda
+comprimidas con zlib en un archivo SQLite. La aplicación sirve esas
+respuestas directamente, sin pasar por pandas ni Plotly Express, siempre
+que la versión de los datos del archivo coincida con la cargada.
+
+Uso::
+
+    python -m mortality.prerender --processes 4
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import closing
+
+from plotly.io.json import to_json_plotly
+
+from mortality import config
+from mortality.metrics import phase
+
+
+def prerender_key(*filters):
+    # Los dropdowns envían texto o números; se normaliza todo a texto
+    return json.dumps([str(value) for value in filters], ensure_ascii=False)
+
+
+class PrerenderStore:
+    """Archivo SQLite de solo lectura con las salidas precalculadas."""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # Conexión de corta duración: open_store corre en el proceso maestro y
+        # ninguna conexión abierta debe heredarse por fork a los workers
+        with closing(self._open()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+        self.version = row[0] if row else None
+
+    def _open(self):
+        return sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False)
+
+    def _connect(self):
+        # Una conexión por hilo y por proceso, abierta en la primera consulta
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, *filters):
+        """Salidas precalculadas de la combinación, o ``None`` si no está."""
+        with phase('cache'):
+            row = self._connect().execute(
+                'SELECT payload FROM outputs WHERE key = ?', (prerender_key(*filters),)
+            ).fetchone()
+            if row is None:
+                return None
+            return json.loads(zlib.decompress(row[0]))
+
+    def __len__(self):
+        with closing(self._open()) as conn:
+            return conn.execute('SELECT COUNT(*) FROM outputs').fetchone()[0]
+
+
+def open_store(path, version):
+    """Abre el archivo precalculado si existe y corresponde a ``version``."""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        store = PrerenderStore(path)
+    except sqlite3.Error as e:
+        print(f"No se pudo abrir {path}: {e}")
+        return None
+    if store.version != version:
+        print(f"Se ignora {path}: precalculado para la versión {store.version}, datos en {version}")
+        return None
+    print(f"Salidas precalculadas: {len(store)} combinaciones")
+    return store
+
+
+def encode_outputs(outputs):
+    """Salidas del callback como JSON de Plotly comprimido con zlib, como se guardan en el archivo."""
+    return zlib.compress(to_json_plotly(list(outputs)).encode('utf-8'), 6)
+
+
+def write_store(path, version, batches):
+    """Escribe de forma atómica un archivo precalculado para ``version``.
+
+    ``batches`` produce listas de ``(clave, payload)`` con claves de
+    :func:`prerender_key` y payloads de :func:`encode_outputs`. Devuelve el
+    número de combinaciones guardadas.
+    """
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    count = 0
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        conn.execute('CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)')
+        conn.execute('CREATE TABLE outputs (key TEXT PRIMARY KEY, payload BLOB NOT NULL)')
+        conn.execute("INSERT INTO meta VALUES ('version', ?)", (version,))
+        for rendered in batches:
+            conn.executemany('INSERT INTO outputs VALUES (?, ?)', rendered)
+            count += len(rendered)
+        conn.commit()
+        conn.execute('VACUUM')
+    os.replace(tmp_path, path)
+    return count
+
+
+def _render_chunk(combos):
+    # Corre en un proceso hijo creado con fork: la aplicación ya está importada
+    import app as dashboard
+
+    return [(prerender_key(*combo), encode_outputs(dashboard.build_dashboard(*combo))) for combo in combos]
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def prerender(path, processes=None, chunk_size=32):
+    """Calcula y guarda las salidas de todas las combinaciones de filtros."""
+    import app as dashboard
+
+    # Con MORTALIDAD_BACKGROUND_LOAD=1 la importación no espera a los datos
+    dashboard.loader.wait()
+    combos = dashboard.filter_combinations()
+    start = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    chunks = list(_chunks(combos, chunk_size))
+    if processes > 1:
+        # fork: los procesos hijos heredan los datos ya cargados
+        pool = multiprocessing.get_context('fork').Pool(processes)
+        results = pool.imap_unordered(_render_chunk, chunks)
+    else:
+        pool = None
+        results = map(_render_chunk, chunks)
+
+    def progress():
+        done = 0
+        for rendered in results:
+            done += len(rendered)
+            print(f"{done}/{len(combos)} combinaciones ({time.perf_counter() - start:.0f} s)")
+            yield rendered
+
+    try:
+        write_store(path, dashboard.OUTPUT_VERSION, progress())
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    size = os.path.getsize(path)
+    print(f"Guardado {path}: {len(combos)} combinaciones, {size / 1e6:.1f} MB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Precalcula las salidas del tablero')
+    parser.add_argument('--output', default=config.PRERENDER_PATH)
+    parser.add_argument('--processes', type=int, default=None,
+                        help='procesos en paralelo (por defecto, uno por CPU)')
+    parser.add_argument('--chunk-size', type=int, default=32)
+    args = parser.parse_args(argv)
+
+    # El cálculo no debe pasar por la caché de resultados ni por un archivo previo
+    config.RESULT_CACHE = 'off'
+    config.PRERENDER_PATH = ''
+    prerender(args.output, processes=args.processes, chunk_size=args.chunk_size)
+
+
+if __name__ == '__main__':
+    main()
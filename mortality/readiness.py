@@ -0,0 +1,101 @@
+"""Carga de datos en segundo plano y endpoints de salud.
+
+Por defecto ``app.py`` carga los anexos al importarse (en el maestro de
+gunicorn con ``--preload``), de modo que el servidor no acepta conexiones
+hasta terminar. Con ``MORTALIDAD_BACKGROUND_LOAD=1`` la carga corre en un
+hilo: el servidor atiende de inmediato, la página muestra un aviso de carga
+que se recarga sola al terminar y los balanceadores consultan:
+
+- ``/healthz``: el proceso está vivo (siempre 200)
+- ``/readyz``: los datos están cargados (200) o no (503, con el estado en
+  JSON: ``cargando`` o ``error``)
+
+Los hilos no sobreviven al ``fork`` de gunicorn, así que la carga en
+segundo plano desactiva el modo preload (ver gunicorn.conf.py): cada worker
+carga sus propios datos.
+"""
+import threading
+import time
+import traceback
+
+import flask
+
+
+class DataLoader:
+    """Ejecuta la carga de datos, en el hilo actual o en uno aparte, y expone su estado."""
+
+    def __init__(self, target):
+        self._target = target
+        self._done = threading.Event()
+        self.error = None
+        self.started = None
+        self.seconds = None
+
+    @property
+    def ready(self):
+        return self._done.is_set() and self.error is None
+
+    def _run(self):
+        self.started = time.perf_counter()
+        try:
+            self._target()
+        except Exception as e:
+            self.error = f'{type(e).__name__}: {e}'
+            raise
+        finally:
+            self.seconds = time.perf_counter() - self.started
+            self._done.set()
+
+    def run(self):
+        """Carga en el hilo actual; los errores se propagan."""
+        self._run()
+
+    def start(self):
+        """Carga en un hilo aparte; los errores quedan en :attr:`error`."""
+        def target():
+            try:
+                self._run()
+            except Exception:
+                traceback.print_exc()
+
+        threading.Thread(target=target, name='mortalidad-carga', daemon=True).start()
+        return self
+
+    def wait(self, timeout=None):
+        """Espera a que termine la carga; ``RuntimeError`` si falló."""
+        if not self._done.wait(timeout):
+            return False
+        if self.error is not None:
+            raise RuntimeError(f'La carga de datos falló: {self.error}')
+        return True
+
+    def status(self):
+        if not self._done.is_set():
+            elapsed = time.perf_counter() - self.started if self.started is not None else 0.0
+            return {'status': 'cargando', 'seconds': round(elapsed, 3)}
+        if self.error is not None:
+            return {'status': 'error', 'error': self.error, 'seconds': round(self.seconds, 3)}
+        return {'status': 'listo', 'seconds': round(self.seconds, 3)}
+
+
+def install(server, loader, guarded=()):
+    """Publica ``/healthz`` y ``/readyz`` para ``loader``.
+
+    Las rutas que empiezan con algún prefijo de ``guarded`` responden 503
+    mientras los datos no estén listos.
+    """
+
+    @server.before_request
+    def _require_data():
+        if guarded and not loader.ready and flask.request.path.startswith(tuple(guarded)):
+            return flask.jsonify(loader.status()), 503
+
+    @server.route('/healthz')
+    def healthz():
+        return {'status': 'ok'}
+
+    @server.route('/readyz')
+    def readyz():
+        return flask.jsonify(loader.status()), 200 if loader.ready else 503
+
+    return healthz, readyz
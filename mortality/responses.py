@@ -0,0 +1,189 @@
+"""Compresión, ETags y cabeceras de caché de las respuestas HTTP.
+
+:func:`install` agrega al servidor Flask de Dash:
+
+- Compresión ``br`` (si está instalado el paquete ``brotli``) o ``gzip``
+  de las respuestas de texto (JSON de los callbacks, layout, HTML, CSS y
+  JS) según el ``Accept-Encoding`` del navegador. Los archivos estáticos se
+  comprimen una vez y se guardan por ETag.
+- ETags deterministas para ``_dash-update-component``: el ETag sale de la
+  versión de los datos y de las entradas del callback (los filtros), así
+  que se conoce antes de ejecutarlo. Si el navegador ya tiene esa respuesta
+  (``If-None-Match``, ver assets/etag.js) se devuelve 304 sin calcular nada.
+- ETags por contenido (y ``Cache-Control: no-cache``) para las respuestas
+  GET de HTML, JSON y Arrow (página, ``_dash-layout``,
+  ``_dash-dependencies``, ``/api/v1``), que se revalidan con 304.
+- ``Cache-Control`` de un año (``immutable``) para los assets que Dash
+  enlaza con su marca de modificación (``?m=``) y para ``assets/vendor/``,
+  cuyas rutas incluyen la versión (ver mortality/vendor.py).
+
+Los ETags son débiles (``W/``): la misma respuesta comprimida o sin
+comprimir es equivalente.
+"""
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import flask
+
+try:
+    import brotli
+except ImportError:  # opcional: sin él solo se usa gzip
+    brotli = None
+
+# Tamaño mínimo para comprimir (por debajo no compensa)
+MIN_BYTES = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE = ('application/json', 'text/html', 'text/css', 'text/plain',
+                'application/javascript', 'text/javascript', 'image/svg+xml',
+                'application/vnd.apache.arrow.stream')
+
+# Respuestas GET dinámicas con ETag por contenido
+REVALIDATED = ('text/html', 'application/json', 'application/vnd.apache.arrow.stream')
+
+# Un año: las URL de estos archivos cambian cuando cambia su contenido
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+# Archivos estáticos comprimidos guardados por (ETag, codificación)
+STATIC_CACHE_SIZE = 64
+
+
+def encodings():
+    """Codificaciones disponibles, en orden de preferencia."""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(data, encoding):
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    # mtime fijo: el mismo contenido produce los mismos bytes
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _digest(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def callback_etag(body, version):
+    """ETag de una solicitud a ``_dash-update-component`` (sin comillas).
+
+    Depende de la versión de los datos y de lo que determina la respuesta:
+    la salida, las entradas y estados (los filtros) y cuál entrada cambió.
+    """
+    parts = [version, body.get('output'), body.get('inputs'), body.get('state'),
+             body.get('changedPropIds')]
+    return _digest(json.dumps(parts, sort_keys=True, separators=(',', ':'),
+                              ensure_ascii=False, default=str).encode('utf-8'))
+
+
+class _StaticCache:
+    """LRU de archivos estáticos ya comprimidos."""
+
+    def __init__(self, size=STATIC_CACHE_SIZE):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, key, data, encoding):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        compressed = compress(data, encoding)
+        with self._lock:
+            self._entries[key] = compressed
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+        return compressed
+
+
+def _encoding(request):
+    for encoding in encodings():
+        if request.accept_encodings[encoding]:
+            return encoding
+    return None
+
+
+def install(server, version, callback_path='/_dash-update-component', static_path='/assets/',
+            compression=True):
+    """Instala compresión, ETags y cabeceras de caché en ``server``.
+
+    ``version`` es una función que devuelve la versión de los datos cargados
+    (``None`` mientras no estén listos, y entonces no se usan ETags de
+    callbacks). ``static_path`` es el prefijo de las URL de los assets.
+    """
+    static_cache = _StaticCache()
+    vendor_path = static_path + 'vendor/'
+
+    @server.before_request
+    def _callback_not_modified():
+        request = flask.request
+        if request.method != 'POST' or request.path != callback_path:
+            return None
+        current = version()
+        body = request.get_json(silent=True)
+        if current is None or not isinstance(body, dict):
+            return None
+        etag = callback_etag(body, current)
+        flask.g.mortalidad_etag = etag
+        if request.if_none_match.contains_weak(etag):
+            response = flask.Response(status=304)
+            response.set_etag(etag, weak=True)
+            return response
+        return None
+
+    @server.after_request
+    def _conditional_and_compressed(response):
+        request = flask.request
+
+        # Assets con la versión en la URL: caché de larga duración
+        if request.path.startswith(static_path) and ('m' in request.args or request.path.startswith(vendor_path)):
+            response.headers['Cache-Control'] = IMMUTABLE
+
+        if response.status_code != 200:
+            return response
+
+        etag = flask.g.pop('mortalidad_etag', None)
+        if etag is not None:
+            response.set_etag(etag, weak=True)
+        elif (request.method == 'GET' and not response.direct_passthrough and 'ETag' not in response.headers
+              and response.mimetype in REVALIDATED):
+            # Layout, página y API: ETag por contenido, revalidado en cada carga
+            response.set_etag(_digest(response.get_data()), weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            response.make_conditional(request)
+            if response.status_code != 200:
+                return response
+
+        if not compression or request.method == 'HEAD' or response.mimetype not in COMPRESSIBLE:
+            return response
+        if 'Content-Encoding' in response.headers:
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = _encoding(request)
+        if encoding is None:
+            return response
+
+        static = response.direct_passthrough
+        if static:
+            # Archivo estático: se lee una vez y se comprime por ETag
+            if 'ETag' not in response.headers:
+                return response
+            response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < MIN_BYTES:
+            return response
+        if static:
+            compressed = static_cache.get_or_compress((response.headers['ETag'], encoding), data, encoding)
+        else:
+            compressed = compress(data, encoding)
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    return _callback_not_modified, _conditional_and_compressed
@@ -0,0 +1,215 @@
+"""Caché de resultados de los callbacks por combinación de filtros.
+
+El espacio de filtros del Panel de Control es finito (unos 33
+departamentos × 4 opciones de sexo × 30 grupos de edad), así que las
+mismas combinaciones se repiten con frecuencia. :class:`ResultCache`
+guarda la salida serializada (JSON) de un callback bajo una clave formada
+por los filtros y la versión de los datos, con desalojo LRU acotado por
+número de entradas y expiración por TTL.
+
+Hay dos backends:
+
+* ``memory``: diccionario ordenado en el proceso (un caché por worker).
+* ``sqlite``: archivo SQLite local en modo WAL, compartido por todos los
+  workers de la máquina.
+
+Los contadores de aciertos y fallos son por proceso.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+from plotly.io.json import to_json_plotly
+
+from mortality.metrics import phase
+
+
+def make_key(*parts):
+    """Clave estable a partir de los filtros y la versión de los datos."""
+    return json.dumps(parts, ensure_ascii=False, default=str)
+
+
+class MemoryBackend:
+    """LRU en memoria con expiración por TTL."""
+
+    def __init__(self, max_entries=512, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created, value = entry
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteBackend:
+    """LRU en un archivo SQLite compartido entre procesos."""
+
+    def __init__(self, path, max_entries=512, ttl=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Conexión de corta duración: con preload_app esto corre en el proceso
+        # maestro y ninguna conexión abierta debe heredarse por fork a los workers
+        with closing(self._open()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                ' key TEXT PRIMARY KEY, value BLOB NOT NULL,'
+                ' created REAL NOT NULL, accessed REAL NOT NULL)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+
+    def _open(self):
+        return sqlite3.connect(self.path, timeout=10, isolation_level=None)
+
+    def _connect(self):
+        # Una conexión por hilo y por proceso, abierta en el primer uso
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        conn = self._connect()
+        row = conn.execute('SELECT value, created FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        now = time.time()
+        if self.ttl is not None and now - created > self.ttl:
+            conn.execute('DELETE FROM results WHERE key = ?', (key,))
+            return None
+        conn.execute('UPDATE results SET accessed = ? WHERE key = ?', (now, key))
+        return value.decode('utf-8') if isinstance(value, bytes) else value
+
+    def set(self, key, value):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            'INSERT OR REPLACE INTO results (key, value, created, accessed) VALUES (?, ?, ?, ?)',
+            (key, value.encode('utf-8'), now, now)
+        )
+        # Desalojo LRU: se conservan las max_entries más recientes
+        conn.execute(
+            'DELETE FROM results WHERE key NOT IN '
+            '(SELECT key FROM results ORDER BY accessed DESC LIMIT ?)',
+            (self.max_entries,)
+        )
+
+    def __len__(self):
+        return self._connect().execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def clear(self):
+        self._connect().execute('DELETE FROM results')
+
+
+class ResultCache:
+    """Memoización de resultados serializados con contadores de aciertos."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def get_or_compute(self, key, compute):
+        """Devuelve el resultado guardado para ``key`` o lo calcula y lo guarda.
+
+        El resultado se guarda como JSON (con el codificador de Plotly), de
+        modo que en un acierto las figuras vuelven como diccionarios, que
+        Dash acepta igual que los objetos ``go.Figure``.
+        """
+        cached = None
+        with phase('cache'):
+            try:
+                cached = self.backend.get(key)
+            except sqlite3.Error as e:
+                print(f"Error leyendo la caché de resultados: {e}")
+            if cached is not None:
+                self._count(hit=True)
+                return json.loads(cached)
+
+        self._count(hit=False)
+        value = compute()
+        with phase('cache'):
+            try:
+                self.backend.set(key, to_json_plotly(value))
+            except sqlite3.Error as e:
+                print(f"Error escribiendo la caché de resultados: {e}")
+        return value
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            'backend': type(self.backend).__name__,
+            'entries': len(self.backend),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+        }
+
+
+class NullCache:
+    """Caché desactivada: siempre calcula."""
+
+    hits = misses = 0
+
+    def get_or_compute(self, key, compute):
+        return compute()
+
+    def stats(self):
+        return {'backend': None, 'entries': 0, 'hits': 0, 'misses': 0, 'hit_ratio': 0.0}
+
+
+def create_cache(kind, path=None, max_entries=512, ttl=None):
+    """Crea la caché configurada; si SQLite falla se usa memoria."""
+    if kind in (None, '', 'off', 'none'):
+        return NullCache()
+    if kind == 'sqlite':
+        try:
+            return ResultCache(SQLiteBackend(path, max_entries=max_entries, ttl=ttl))
+        except (sqlite3.Error, OSError) as e:
+            print(f"No se pudo abrir la caché SQLite en {path}, se usa memoria: {e}")
+    return ResultCache(MemoryBackend(max_entries=max_entries, ttl=ttl))
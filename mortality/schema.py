@@ -0,0 +1,81 @@
+"""Esquema compacto de ``df_mortality``.
+
+Los anexos llegan con los tipos por defecto de pandas: códigos en ``int64``
+y códigos de causa como cadenas ``object`` repetidas en cada registro. Como
+cada worker de gunicorn mantiene su propia copia, aquí se descartan las
+columnas que el tablero no usa, se reducen los códigos al entero más
+pequeño que los contiene y se convierten los textos en categorías.
+"""
+import numpy as np
+import pandas as pd
+
+# Columnas del registro de mortalidad que usa el tablero, después de
+# renombrar (los nombres de departamento y municipio se resuelven por
+# código, ver mortality/dimensions.py)
+USED_COLUMNS = [
+    'COD_DPTO', 'COD_MUNIC', 'ANO', 'MES',
+    'SEXO', 'GRUPO_EDAD1', 'CAUSA_DEFUNCION',
+]
+
+# Columnas de texto con pocos valores distintos
+CATEGORICAL_COLUMNS = ['CAUSA_DEFUNCION']
+
+# Techo de memoria del DataFrame compacto, verificado en tests/test_schema.py
+# (y sobre los datos reales con benchmarks/bench_memory.py): bytes por
+# registro más un margen fijo para las categorías (nombres y códigos
+# distintos)
+MAX_BYTES_PER_ROW = 14
+CATEGORY_ALLOWANCE = 2_000_000
+
+
+def downcast_integer(series):
+    """Entero con signo más pequeño que contiene la columna.
+
+    Las columnas con valores faltantes se dejan en ``float32`` para no
+    introducir ``pd.NA`` en los filtros y agrupaciones.
+    """
+    if not pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+        return series
+    if series.isna().any():
+        return series.astype(np.float32)
+    values = series.to_numpy()
+    if not np.array_equal(values, np.round(values)):
+        return series
+    return pd.to_numeric(series, downcast='integer')
+
+
+def compact_mortality(df, columns=None):
+    """Copia de ``df`` con solo las columnas usadas y tipos compactos."""
+    columns = [col for col in (columns or USED_COLUMNS) if col in df.columns]
+    compact = {}
+    for col in columns:
+        series = df[col]
+        if col in CATEGORICAL_COLUMNS or series.dtype == object:
+            compact[col] = series.astype('category')
+        else:
+            compact[col] = downcast_integer(series)
+    return pd.DataFrame(compact, index=pd.RangeIndex(len(df)))
+
+
+def memory_ceiling(rows):
+    """Bytes máximos esperados para un DataFrame compacto de ``rows`` registros."""
+    return MAX_BYTES_PER_ROW * rows + CATEGORY_ALLOWANCE
+
+
+def memory_report(before, after):
+    """Bytes por columna antes y después de compactar."""
+    report = pd.DataFrame({
+        'antes': before.memory_usage(deep=True, index=False),
+        'despues': after.memory_usage(deep=True, index=False),
+    }).fillna(0).astype(np.int64)
+    report.loc['TOTAL'] = report.sum()
+    report['reduccion'] = 1 - report['despues'] / report['antes'].where(report['antes'] > 0)
+    return report
+
+
+def format_report(report):
+    lines = [f"{'columna':<18}{'antes':>14}{'despues':>14}{'reduccion':>11}"]
+    for name, row in report.iterrows():
+        reduction = '' if pd.isna(row['reduccion']) else f"{row['reduccion']:.0%}"
+        lines.append(f"{name:<18}{int(row['antes']):>14,}{int(row['despues']):>14,}{reduction:>11}")
+    return '\n'.join(lines)
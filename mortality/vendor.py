@@ -0,0 +1,113 @@
+"""Hojas de estilo de terceros servidas desde ``assets/vendor/``.
+
+Bootstrap y Font Awesome se cargaban desde CDN públicos, lo que falla en
+redes sin salida a internet. Sus archivos de distribución (con las fuentes
+que referencia Font Awesome) están versionados en
+``assets/vendor/<nombre>-<versión>/``; Dash incluye automáticamente las
+hojas de estilo de ``assets/`` y :mod:`mortality.responses` las sirve con
+caché de un año, porque la versión forma parte de la ruta.
+
+Si los archivos locales no están (por ejemplo en una copia parcial durante
+el desarrollo), :func:`stylesheets` devuelve las URL del CDN como respaldo.
+El paso de construcción verifica que estén y falla si no::
+
+    python -m mortality.vendor --check
+
+Para actualizar una versión se cambia :data:`STYLESHEETS` y se descargan los
+archivos nuevos en una máquina con acceso a internet::
+
+    python -m mortality.vendor
+"""
+import argparse
+import os
+import re
+import sys
+import urllib.parse
+import urllib.request
+
+from mortality import config
+
+VENDOR_DIR = os.path.join(config.BASE_DIR, 'assets', 'vendor')
+
+# (directorio local, URL del CDN, ruta de la hoja de estilo dentro del directorio)
+STYLESHEETS = (
+    ('bootstrap-4.5.3', 'https://stackpath.bootstrapcdn.com/bootstrap/4.5.3/css/bootstrap.min.css',
+     'css/bootstrap.min.css'),
+    ('fontawesome-5.15.4', 'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css',
+     'css/all.min.css'),
+)
+
+# Referencias url(...) relativas dentro de una hoja de estilo
+_URL = re.compile(r'url\(\s*[\'"]?([^\'")]+?)[\'"]?\s*\)')
+
+
+def local_path(directory, path):
+    return os.path.join(VENDOR_DIR, directory, *path.split('/'))
+
+
+def missing():
+    """Rutas locales de las hojas de estilo que no están en ``assets/vendor/``."""
+    return [local_path(directory, path) for directory, url, path in STYLESHEETS
+            if not os.path.exists(local_path(directory, path))]
+
+
+def stylesheets():
+    """URL del CDN de las hojas de estilo que no están en ``assets/vendor/``."""
+    return [url for directory, url, path in STYLESHEETS if not os.path.exists(local_path(directory, path))]
+
+
+def _fetch(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return response.read()
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def download(force=False):
+    """Descarga las hojas de estilo y sus recursos; devuelve las rutas escritas."""
+    written = []
+    for directory, url, path in STYLESHEETS:
+        target = local_path(directory, path)
+        if os.path.exists(target) and not force:
+            continue
+        css = _fetch(url)
+        # Fuentes e imágenes referenciadas con rutas relativas (../webfonts/...)
+        references = {reference.split('?')[0].split('#')[0] for reference in _URL.findall(css.decode('utf-8'))
+                      if not reference.startswith(('data:', '#')) and not urllib.parse.urlparse(reference).scheme}
+        for reference in sorted(references):
+            relative = os.path.normpath(os.path.join(os.path.dirname(path), reference))
+            if relative.startswith('..'):
+                raise ValueError(f'{url} referencia un archivo fuera de su directorio: {reference}')
+            resource_path = local_path(directory, relative.replace(os.sep, '/'))
+            _write(resource_path, _fetch(urllib.parse.urljoin(url, reference)))
+            written.append(resource_path)
+        # La hoja de estilo al final: su presencia indica que la descarga está completa
+        _write(target, css)
+        written.append(target)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Hojas de estilo de terceros en assets/vendor/')
+    parser.add_argument('--check', action='store_true',
+                        help='solo verificar que los archivos estén (paso de construcción)')
+    parser.add_argument('--force', action='store_true', help='descargar aunque los archivos ya estén')
+    args = parser.parse_args(argv)
+
+    if not args.check:
+        for written_path in download(force=args.force):
+            print(written_path)
+    problems = missing()
+    for problem in problems:
+        print(f"ERROR: falta {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
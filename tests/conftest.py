@@ -0,0 +1,75 @@
+"""Datos de prueba: una Divipola y un catálogo CIE-10 pequeños más registros sintéticos.
+
+Las pruebas no leen los anexos del DANE: las tablas comunes se arman aquí
+y los registros salen de :class:`benchmarks.synthetic.Generator`, que solo
+usa códigos válidos de esas tablas.
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import Generator  # noqa: E402
+from mortality.dataset import Dataset, Reference  # noqa: E402
+from mortality.schema import compact_mortality  # noqa: E402
+
+# Divipola con las columnas ya renombradas (ver mortality/dataset.py)
+DIVIPOLA = pd.DataFrame([
+    (5, 'ANTIOQUIA', 1, 'MEDELLÍN'),
+    (5, 'ANTIOQUIA', 2, 'ABEJORRAL'),
+    (5, 'ANTIOQUIA', 674, 'SAN VICENTE FERRER'),
+    (11, 'BOGOTÁ, D.C.', 1, 'BOGOTÁ, D.C.'),
+    (18, 'CAQUETÁ', 1, 'FLORENCIA'),
+    (18, 'CAQUETÁ', 753, 'SAN VICENTE DEL CAGUÁN'),
+    (76, 'VALLE DEL CAUCA', 1, 'CALI'),
+    (76, 'VALLE DEL CAUCA', 736, 'SEVILLA'),
+], columns=['COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC'])
+
+# Catálogo aplanado a dos columnas (ver FLAT_COLUMNS en mortality/causes.py)
+CODES = pd.DataFrame({
+    'CODIGO_CIE10': ['A099', 'C169', 'C349', 'C509', 'I219', 'I251', 'J189', 'J449', 'X950', 'X954'],
+    'DESCRIPCION_CIE10': [
+        'Diarrea y gastroenteritis de presunto origen infeccioso',
+        'Tumor maligno del estómago, parte no especificada',
+        'Tumor maligno de los bronquios o del pulmón, parte no especificada',
+        'Tumor maligno de la mama, parte no especificada',
+        'Infarto agudo del miocardio, sin otra especificación',
+        'Enfermedad cardiovascular aterosclerótica, así descrita',
+        'Neumonía, no especificada',
+        'Enfermedad pulmonar obstructiva crónica, no especificada',
+        'Agresión con disparo de arma corta, en vivienda',
+        'Agresión con disparo de otras armas de fuego, en calle y carretera',
+    ],
+})
+
+# Nombres del Anexo1 -> nombres del tablero (ver load_year en mortality/dataset.py)
+RENAME = {'COD_DEPARTAMENTO': 'COD_DPTO', 'COD_MUNICIPIO': 'COD_MUNIC', 'COD_MUERTE': 'CAUSA_DEFUNCION'}
+
+
+@pytest.fixture(scope='session')
+def reference():
+    return Reference(CODES, DIVIPOLA, files=[])
+
+
+@pytest.fixture(scope='session')
+def make_records(reference):
+    """``make_records(rows, seed)``: registros sintéticos con los nombres de columna del tablero."""
+    def make(rows, seed=1):
+        generator = Generator(reference, seed=seed)
+        return generator.chunk(rows, np.random.default_rng(seed)).rename(columns=RENAME)
+    return make
+
+
+@pytest.fixture(scope='session')
+def records(make_records):
+    return make_records(20_000)
+
+
+@pytest.fixture(scope='session')
+def dataset(reference, records):
+    return Dataset(compact_mortality(records), reference.codes, reference.divipola, 'prueba',
+                   cause_catalog=reference.cause_catalog, year=2019, geography=reference.geography)
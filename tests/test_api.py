@@ -0,0 +1,124 @@
+import flask
+import pytest
+
+from mortality import api
+from mortality.aggregates import SelectionAggregates
+from mortality.filters import ALL
+
+
+def test_parse_by():
+    assert api.parse_by(None) == []
+    assert api.parse_by('') == []
+    assert api.parse_by(' sexo, dpto ,sexo,') == ['sexo', 'dpto']
+    assert api.parse_by('dpto,munic') == ['dpto', 'munic']
+    assert api.parse_by('municipio') == ['municipio']
+
+
+@pytest.mark.parametrize('value', ['pais', 'sexo,Edad', 'munic', 'munic,sexo'])
+def test_parse_by_rejects(value):
+    with pytest.raises(api.ApiError):
+        api.parse_by(value)
+
+
+def test_payload_total(dataset, records):
+    result = api.payload(SelectionAggregates(dataset.cube, year=2019), [], 'v1')
+
+    assert result['data'] == {'count': [len(records)]}
+    assert result['year'] == 2019
+    assert result['version'] == 'v1'
+    assert result['filters'] == {'departamento': ALL, 'sexo': ALL, 'edad': ALL, 'municipio': ALL}
+
+
+def test_payload_matches_records(dataset, records):
+    edad = ('25', '26')
+    agg = SelectionAggregates(dataset.cube, sexo=('1',), edad=edad, year=2019)
+    result = api.payload(agg, ['dpto', 'munic'], 'v1')
+
+    subset = records[(records['SEXO'] == 1) & records['GRUPO_EDAD1'].astype(str).isin(edad)]
+    expected = subset.groupby(['COD_DPTO', 'COD_MUNIC']).size()
+    data = result['data']
+    assert set(data) == {'dpto', 'munic', 'count'}
+    counts = {(dpto, munic): count for dpto, munic, count in zip(data['dpto'], data['munic'], data['count'])
+              if count}
+    assert counts == expected.to_dict()
+    assert result['filters'] == {'departamento': ALL, 'sexo': ('1',), 'edad': edad, 'municipio': ALL}
+
+
+def test_payload_by_municipality(dataset, records):
+    agg = SelectionAggregates(dataset.cube, year=2019, municipio=['05674', '76736'])
+    result = api.payload(agg, ['municipio', 'sexo'], 'v1')
+
+    subset = records[(records['COD_DPTO'] * 1000 + records['COD_MUNIC']).isin([5674, 76736])]
+    expected = subset.groupby([subset['COD_DPTO'] * 1000 + subset['COD_MUNIC'], 'SEXO']).size()
+    data = result['data']
+    counts = {(key, sexo): count for key, sexo, count in zip(data['municipio'], data['sexo'], data['count'])
+              if count}
+    assert counts == expected.to_dict()
+    assert result['filters']['municipio'] == ['05674', '76736']
+
+
+def test_payload_by_department_name(dataset, records):
+    agg = SelectionAggregates(dataset.cube, departamento=('ANTIOQUIA', 'CAQUETÁ'), year=2019)
+    data = api.payload(agg, ['departamento'], 'v1')['data']
+
+    counts = {name: count for name, count in zip(data['departamento'], data['count']) if count}
+    assert set(counts) == {'ANTIOQUIA', 'CAQUETÁ'}
+    assert counts['ANTIOQUIA'] == int((records['COD_DPTO'] == 5).sum())
+    assert counts['CAQUETÁ'] == int((records['COD_DPTO'] == 18).sum())
+
+
+@pytest.fixture
+def client(dataset):
+    server = flask.Flask(__name__)
+    calls = []
+
+    def query(by, departamento, sexo, edad, year, municipio):
+        calls.append((by, departamento, sexo, edad, year, municipio))
+        agg = SelectionAggregates(dataset.cube, departamento, sexo, edad, year=year or 2019, municipio=municipio)
+        return api.payload(agg, by, 'v1')
+
+    api.install(server, query, years=lambda: [2019])
+    client = server.test_client()
+    client.calls = calls
+    return client
+
+
+def test_counts_route(client, records):
+    response = client.get('/api/v1/counts?by=sexo&departamento=BOGOTÁ, D.C.&edad=26,25&edad=&anio=2019')
+
+    assert response.status_code == 200
+    assert client.calls == [(['sexo'], 'BOGOTÁ, D.C.', ALL, ['25', '26'], 2019, ALL)]
+    data = response.get_json()['data']
+    bogota = records[(records['COD_DPTO'] == 11) & records['GRUPO_EDAD1'].isin([25, 26])]
+    assert sum(data['count']) == len(bogota)
+
+
+def test_counts_route_municipality(client, records):
+    response = client.get('/api/v1/counts?municipio=18753,05001&municipio=')
+
+    assert response.status_code == 200
+    assert client.calls[0][-1] == ['05001', '18753']
+    expected = ((records['COD_DPTO'] == 18) & (records['COD_MUNIC'] == 753)
+                | (records['COD_DPTO'] == 5) & (records['COD_MUNIC'] == 1)).sum()
+    assert response.get_json()['data']['count'] == [expected]
+
+
+@pytest.mark.parametrize('query', ['by=pais', 'by=munic', 'anio=2018', 'anio=dos', 'format=csv',
+                                   'municipio=MEDELLÍN', 'municipio=05001,5-001'])
+def test_counts_route_rejects(client, query):
+    response = client.get('/api/v1/counts?' + query)
+
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+    assert client.calls == []
+
+
+def test_counts_route_arrow(client):
+    response = client.get('/api/v1/counts?by=sexo&format=arrow')
+
+    if api.pa is None:
+        assert response.status_code == 406
+        assert client.calls == []
+    else:
+        assert response.status_code == 200
+        assert response.mimetype == api.ARROW_MIMETYPE
@@ -0,0 +1,130 @@
+import pytest
+
+from mortality.aggregates import SelectionAggregates
+from mortality.cause_table import DEFAULT_SORT, CauseTable, parse_filter, parse_sort
+from mortality.filters import ALL
+
+
+@pytest.fixture
+def table(reference):
+    codes = reference.codes
+    return CauseTable(codes['CODIGO_CIE10'], codes['DESCRIPCION_CIE10'])
+
+
+# Conteos por causa alineados con el catálogo de prueba; C169 no tiene casos en la selección
+TOTALS = [5, 0, 12, 3, 12, 7, 1, 9, 20, 4]
+
+
+@pytest.fixture
+def ranking(table):
+    return table.ranking('prueba', lambda: TOTALS)
+
+
+def codes(rows):
+    return [row['codigo'] for row in rows]
+
+
+def test_parse_filter():
+    assert parse_filter(None) == []
+    assert parse_filter('{codigo} scontains I2 && {causa} icontains "tumor malig"') == [
+        ('codigo', 'contains', 'I2'), ('causa', 'contains', 'tumor malig')]
+    assert parse_filter('{total} >= 10 && {total} contains 3') == [('total', 'ge', 10.0), ('total', 'eq', 3.0)]
+    assert parse_filter("{causa} = 'Neumonía, no especificada'") == [('causa', 'eq', 'Neumonía, no especificada')]
+
+
+@pytest.mark.parametrize('query', ['{total} > mucho', '{causa} < A', '{otra} contains x', '{codigo} contains ',
+                                   'codigo contains I2', '{codigo} like I2'])
+def test_parse_filter_ignores(query):
+    assert parse_filter(query) == []
+
+
+def test_parse_sort():
+    assert parse_sort(None) == DEFAULT_SORT
+    assert parse_sort([]) == DEFAULT_SORT
+    assert parse_sort([{'column_id': 'causa', 'direction': 'asc'}]) == ('causa', False)
+    assert parse_sort([{'column_id': 'otra', 'direction': 'asc'},
+                       {'column_id': 'codigo', 'direction': 'desc'}]) == ('codigo', True)
+
+
+def test_page_default_sort(ranking):
+    rows, page, pages = ranking.page(0, 4)
+
+    # Más casos primero; a igual total, por código (I219 después de C349)
+    assert codes(rows) == ['X950', 'C349', 'I219', 'J449']
+    assert rows[0] == {'codigo': 'X950', 'causa': 'Agresión con disparo de arma corta, en vivienda', 'total': 20}
+    assert (page, pages) == (0, 3)
+    assert len(ranking) == 9
+
+
+def test_page_sort_columns(ranking):
+    rows, _, _ = ranking.page(0, 20, ('codigo', True))
+    assert codes(rows) == ['X954', 'X950', 'J449', 'J189', 'I251', 'I219', 'C509', 'C349', 'A099']
+
+    rows, _, _ = ranking.page(0, 3, ('causa', False))
+    assert codes(rows) == ['X950', 'X954', 'A099']
+
+    rows, _, _ = ranking.page(0, 3, ('total', False))
+    assert codes(rows) == ['J189', 'C509', 'X954']
+
+
+def test_page_clamped(ranking):
+    rows, page, pages = ranking.page(7, 4)
+    assert (page, pages) == (2, 3)
+    assert codes(rows) == ['J189']
+
+    rows, page, pages = ranking.page(-1, 0)
+    assert (page, pages) == (0, 9)
+    assert codes(rows) == ['X950']
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('{codigo} contains i2', ['I219', 'I251']),
+    ('{codigo} contains X95', ['X950', 'X954']),
+    ('{codigo} = x950', ['X950']),
+    ('{codigo} = X95', []),
+    # Prefijo de cada palabra, sin tildes ni mayúsculas; C169 no tiene casos
+    ('{causa} contains tumor malig', ['C349', 'C509']),
+    ('{causa} contains PULMON', ['C349', 'J449']),
+    ('{causa} contains agresion disparo', ['X950', 'X954']),
+    ('{causa} = neumonia, no especificada', ['J189']),
+    ('{total} >= 9', ['X950', 'C349', 'I219', 'J449']),
+    ('{total} = 12', ['C349', 'I219']),
+    ('{total} < 4 && {codigo} contains C', ['C509']),
+    ('{total} != 12 && {causa} contains tumor', ['C509']),
+])
+def test_page_filters(ranking, query, expected):
+    rows, page, pages = ranking.page(0, 20, conditions=parse_filter(query))
+
+    assert codes(rows) == expected
+    assert (page, pages) == (0, 1)
+
+
+def test_page_filter_keeps_sort(ranking):
+    conditions = parse_filter('{codigo} contains I')
+    rows, _, _ = ranking.page(0, 20, ('total', True), conditions)
+    assert codes(rows) == ['I219', 'I251']
+    rows, _, _ = ranking.page(0, 20, ('codigo', True), conditions)
+    assert codes(rows) == ['I251', 'I219']
+
+
+def test_ranking_cached(table):
+    calls = []
+    for _ in range(2):
+        table.ranking(('a',), lambda: calls.append(1) or TOTALS)
+    assert len(calls) == 1
+
+    small = CauseTable(table.codes, table.descriptions, cache_size=1)
+    first = small.ranking(('a',), lambda: TOTALS)
+    small.ranking(('b',), lambda: TOTALS)
+    assert small.ranking(('a',), lambda: TOTALS) is not first
+
+
+def test_dataset_table_matches_records(dataset, records):
+    table = dataset.cause_table
+    ranking = table.ranking((ALL, ('2',), ALL), lambda: SelectionAggregates(dataset.cube, sexo=['2']).cause_totals)
+    rows, _, pages = ranking.page(0, len(table))
+
+    expected = records.loc[records['SEXO'] == 2, 'CAUSA_DEFUNCION'].value_counts()
+    assert pages == 1
+    assert {row['codigo']: row['total'] for row in rows} == expected.to_dict()
+    assert [row['total'] for row in rows] == sorted(expected, reverse=True)
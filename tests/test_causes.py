@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mortality.aggregates import SelectionAggregates
+from mortality.causes import CauseCatalog
+
+# Anexo2 como lo entrega pd.read_excel: filas de título antes del encabezado real
+HEADER = ['Capítulo', 'Nombre capítulo', 'Código de la CIE-10 tres caracteres',
+          'Descripción  de códigos mortalidad a tres caracteres', 'Código de la CIE-10 cuatro caracteres',
+          'Descripcion  de códigos mortalidad a cuatro caracteres']
+ROWS = [
+    (1, 'Ciertas enfermedades infecciosas y parasitarias (A00-B99)', 'A09', 'Otras gastroenteritis', 'A099',
+     'Gastroenteritis no especificada'),
+    (2, 'Tumores [neoplasias] (C00-D48)', 'C34', 'Tumor maligno de los bronquios y del pulmón', 'C340',
+     'Tumor maligno del bronquio principal'),
+    (2, 'Tumores [neoplasias] (C00-D48)', 'C34', 'Tumor maligno de los bronquios y del pulmón', 'C349',
+     'Tumor maligno de los bronquios o del pulmón, parte no especificada'),
+    (9, 'Enfermedades del sistema circulatorio (I00-I99)', 'I21', 'Infarto agudo del miocardio', 'I219',
+     'Infarto agudo del miocardio, sin otra especificación'),
+    (20, 'Causas externas de morbilidad y de mortalidad (V01-Y89)', 'X95', 'Agresión con disparo', 'X954',
+     'Agresión con disparo de otras armas de fuego, en calle y carretera'),
+]
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    frame = pd.DataFrame([['Lista de códigos', None, None, None, None, None], [None] * 6, HEADER] + ROWS,
+                         columns=[f'Unnamed: {i}' for i in range(6)])
+    return CauseCatalog.from_frame(frame, fallback={})
+
+
+def test_hierarchy_precomputed(catalog):
+    assert catalog.group_codes.tolist() == ['A09', 'C34', 'I21', 'X95']
+    # Capítulos en el orden de sus códigos, no como texto ('9' antes que '20')
+    assert catalog.chapter_codes.tolist() == ['1', '2', '9', '20']
+    assert catalog.group_chapter.tolist() == [0, 1, 2, 3]
+    assert catalog.chapter_titles[2] == 'Enfermedades del sistema circulatorio (I00-I99)'
+
+
+def test_levels(catalog):
+    levels = catalog.levels(['C349', 'c34.0', 'C348', 'X95', 'I219', 'Z999', None])
+
+    # C348 no está en el catálogo pero su grupo sí; Z999 y el faltante no tienen grupo
+    assert levels['grupo'].tolist() == [1, 1, 1, 3, 2, -1, -1]
+    assert levels['capitulo'].tolist() == [1, 1, 1, 3, 2, -1, -1]
+
+
+def test_rollup(catalog):
+    values = ['C349', 'C340', 'I219', 'Z999', 'X954', 'A099']
+    counts = [5, 2, 7, 100, 0, 1]
+    levels = catalog.levels(values)
+
+    groups = catalog.rollup(levels['grupo'], counts)
+    assert groups.to_dict('list') == {
+        'grupo': ['A09', 'C34', 'I21'],
+        'descripcion': ['Otras gastroenteritis', 'Tumor maligno de los bronquios y del pulmón',
+                        'Infarto agudo del miocardio'],
+        'total': [1, 7, 7],
+    }
+    chapters = catalog.rollup(levels['capitulo'], counts, 'capitulo')
+    assert chapters['capitulo'].tolist() == ['1', '2', '9']
+    assert chapters['total'].tolist() == [1, 7, 7]
+    assert chapters['descripcion'][1] == 'Tumores [neoplasias] (C00-D48)'
+
+    with pytest.raises(ValueError):
+        catalog.rollup(levels['grupo'], counts, 'codigo')
+
+
+def test_dataset_rollup_matches_records(dataset, records):
+    agg = SelectionAggregates(dataset.cube, sexo=['1'])
+    groups = dataset.cause_rollup(agg)
+
+    subset = records.loc[records['SEXO'] == 1, 'CAUSA_DEFUNCION']
+    expected = subset.str[:3].value_counts().sort_index()
+    assert groups['grupo'].tolist() == expected.index.tolist()
+    np.testing.assert_array_equal(groups['total'].to_numpy(), expected.to_numpy())
+    # El catálogo de prueba no trae capítulos
+    assert dataset.cause_rollup(agg, 'capitulo').empty
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+from mortality.dimensions import UNKNOWN, Geography, department_key, municipality_key
+
+
+def merged(divipola, records):
+    # Unión por fila con la Divipola, como hacía load_year antes de los arreglos por código
+    table = divipola[['COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC']].drop_duplicates(['COD_DPTO', 'COD_MUNIC'])
+    return records[['COD_DPTO', 'COD_MUNIC']].merge(table, on=['COD_DPTO', 'COD_MUNIC'], how='left')
+
+
+def test_keys():
+    dpto = np.array([5, 11, 99, 0, -1, 100, np.nan, 5.5, 76])
+    munic = np.array([1, 1, 999, 0, 1, 1, 1, 1, 1000])
+
+    assert department_key(dpto).tolist() == [5, 11, 99, 0, -1, -1, -1, -1, 76]
+    assert municipality_key(dpto, munic).tolist() == [5001, 11001, 99999, 0, -1, -1, -1, -1, -1]
+    assert department_key(pd.Series([18.0, None])).dtype == np.int64
+
+
+def test_names_match_merge(reference, records):
+    geography = Geography.from_divipola(reference.divipola)
+    expected = merged(reference.divipola, records)
+
+    names = geography.municipality_names(records['COD_DPTO'], records['COD_MUNIC'])
+    pd.testing.assert_series_equal(pd.Series(names), expected['NOM_MUNIC'].astype(object), check_names=False)
+    departments = geography.municipality_departments(records['COD_DPTO'], records['COD_MUNIC'])
+    assert departments.tolist() == expected['NOM_DPTO'].fillna(UNKNOWN).tolist()
+
+
+def test_unknown_codes(reference):
+    geography = Geography.from_divipola(reference.divipola)
+    dpto = pd.Series([5, 5, 13, np.nan, 18], dtype=np.float32)
+    munic = pd.Series([674, 999, 1, 1, np.nan], dtype=np.float32)
+
+    assert pd.isna(geography.municipality_names(dpto, munic)).tolist() == [False, True, True, True, True]
+    assert geography.department_names(dpto).tolist()[:2] == ['ANTIOQUIA', 'ANTIOQUIA']
+    assert pd.isna(geography.department_names(dpto)).tolist() == [False, False, True, True, False]
+    assert geography.municipality_departments(dpto, munic, default='-').tolist() == ['ANTIOQUIA', '-', '-', '-', '-']
+
+
+def test_first_name_wins():
+    # Códigos repetidos en la Divipola: queda el primer nombre, como tras drop_duplicates()
+    divipola = pd.DataFrame([(5, 'ANTIOQUIA', 1, 'MEDELLÍN'), (5, 'OTRO', 1, 'OTRO')],
+                            columns=['COD_DPTO', 'NOM_DPTO', 'COD_MUNIC', 'NOM_MUNIC'])
+    geography = Geography.from_divipola(divipola)
+
+    assert geography.department_names([5]).tolist() == ['ANTIOQUIA']
+    assert geography.municipality_names([5], [1]).tolist() == ['MEDELLÍN']
+
+
+def test_missing_columns():
+    geography = Geography.from_divipola(pd.DataFrame({'COD_DPTO': [5]}))
+
+    assert pd.isna(geography.department_names([5])).all()
+    assert geography.municipality_departments([5], [1]).tolist() == [UNKNOWN]
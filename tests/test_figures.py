@@ -0,0 +1,136 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import pytest
+
+from mortality import figures
+from mortality.labels import SEX_NAMES
+
+
+def plain(value):
+    # Arreglos de numpy y binarios de Plotly (bdata) a listas, para comparar figuras como dict
+    if isinstance(value, dict) and 'bdata' in value:
+        return np.frombuffer(base64.b64decode(value['bdata']), dtype=value['dtype']).tolist()
+    if isinstance(value, dict):
+        return {key: plain(item) for key, item in value.items() if key != 'template'}
+    if isinstance(value, (list, tuple)):
+        return [plain(item) for item in value]
+    if isinstance(value, np.ndarray):
+        return plain(value.tolist())
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def patched(template, patch):
+    """Figura que ve el navegador tras aplicar el Patch a la plantilla."""
+    figure = plain(template.to_dict())
+    for operation in patch.to_plotly_json()['operations']:
+        assert operation['operation'] == 'Assign'
+        *path, last = operation['location']
+        target = figure
+        for key in path:
+            target = target[key]
+        target[last] = plain(operation['params']['value'])
+    return figure
+
+
+def rebuilt(fig):
+    return plain(fig.to_dict())
+
+
+# Figuras completas como las armaban los callbacks con Plotly Express
+def px_color_bars(df, x, y, colors, **layout):
+    fig = px.bar(df, x=x, y=y, color=y, color_continuous_scale=colors)
+    fig.update_layout(**layout)
+    return fig
+
+
+@pytest.fixture
+def departments():
+    return pd.DataFrame({'NOM_DPTO': ['ANTIOQUIA', 'BOGOTÁ, D.C.', 'CAQUETÁ'], 'muertes': [530, 412, 7]})
+
+
+def test_department_bars(departments):
+    fig = px_color_bars(departments, 'NOM_DPTO', 'muertes', 'Reds', title='Distribución de Muertes por Departamento',
+                        xaxis_title='Departamento', yaxis_title='Número de Muertes', showlegend=False)
+    fig.update_xaxes(tickangle=45)
+
+    patch = figures.fill_bars(departments['NOM_DPTO'], departments['muertes'].to_numpy())
+    assert patched(figures.department_bars(), patch) == rebuilt(fig)
+
+
+def test_violent_cities():
+    cities = pd.DataFrame({'NOM_MUNIC': ['CALI', 'MEDELLÍN'], 'homicidios': [98, 61]})
+    fig = px_color_bars(cities, 'NOM_MUNIC', 'homicidios', 'Reds', title='5 Ciudades Más Violentas (Homicidios)',
+                        xaxis_title='Ciudad', yaxis_title='Número de Homicidios', showlegend=False)
+
+    patch = figures.fill_bars(cities['NOM_MUNIC'], cities['homicidios'])
+    assert patched(figures.violent_cities(), patch) == rebuilt(fig)
+
+
+def test_age_bars():
+    ages = pd.DataFrame({'grupo': ['Niñez', 'Vejez'], 'muertes': [3, 250]})
+    fig = px_color_bars(ages, 'grupo', 'muertes', 'Viridis', title='Distribución de Muertes por Grupos de Edad',
+                        xaxis_title='Grupo de Edad', yaxis_title='Número de Muertes', plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        # La plantilla comparte _color_bars: sin efecto, la traza ya no va en la leyenda
+                        showlegend=False)
+    fig.update_xaxes(tickangle=45, gridcolor='lightgray')
+    fig.update_yaxes(gridcolor='lightgray')
+
+    patch = figures.fill_bars(np.array(ages['grupo'], dtype=object), ages['muertes'].to_numpy())
+    assert patched(figures.age_bars(), patch) == rebuilt(fig)
+
+
+def test_monthly_line():
+    months = pd.DataFrame({'mes_nombre': ['Enero', 'Febrero', 'Marzo'], 'muertes': [20, 18, 25]})
+    fig = px.line(months, x='mes_nombre', y='muertes', markers=True)
+    fig.update_layout(title='Muertes por Mes en Colombia 2019', xaxis_title='Mes', yaxis_title='Número de Muertes',
+                      showlegend=False)
+
+    patch = figures.fill_line(months['mes_nombre'], months['muertes'], 'Muertes por Mes en Colombia 2019')
+    assert patched(figures.monthly_line(), patch) == rebuilt(fig)
+
+
+def test_low_mortality_pie():
+    cities = pd.DataFrame({'NOM_MUNIC': ['ABEJORRAL', 'SEVILLA'], 'muertes': [1, 2]})
+    fig = px.pie(cities, values='muertes', names='NOM_MUNIC')
+    fig.update_layout(title='10 Ciudades con Menor Índice de Mortalidad', showlegend=True)
+    fig.update_traces(textposition='inside', textinfo='label+value+percent', textfont_size=12,
+                      hovertemplate='<b>%{label}</b><br>Muertes: %{value}<br>Porcentaje: %{percent}<extra></extra>')
+
+    patch = figures.fill_pie(cities['NOM_MUNIC'], cities['muertes'])
+    assert patched(figures.low_mortality_pie(), patch) == rebuilt(fig)
+
+
+@pytest.mark.parametrize('sexes', [(1, 2, 1, 2), (1, 2, 3, 3), (2, 3, 1, 1), (1, 3, 3, 1), (3, 3, 3, 3)])
+def test_sex_stack(sexes):
+    data = pd.DataFrame({'NOM_DPTO': ['ANTIOQUIA', 'ANTIOQUIA', 'CALDAS', 'CALDAS'], 'SEXO': sexes,
+                         'muertes': [40, 35, 9, 4]})
+    fig = px.bar(data.assign(SEXO=SEX_NAMES[data['SEXO']]), x='NOM_DPTO', y='muertes', color='SEXO',
+                 barmode='stack')
+    fig.update_layout(title='Muertes por Sexo y Departamento', xaxis_title='Departamento',
+                      yaxis_title='Número de Muertes')
+
+    result = patched(figures.sex_stack(), figures.fill_stack(data['NOM_DPTO'], data['muertes'], data['SEXO']))
+    # Plotly Express omite los sexos sin filas; la plantilla las oculta
+    assert [trace['visible'] for trace in result['data']] == [code in sexes for code in figures.SEX_CODES]
+    assert all(trace['x'] == [] for trace in result['data'] if not trace['visible'])
+    result['data'] = [trace for trace in result['data'] if trace.pop('visible')]
+    expected = rebuilt(fig)
+    # Plotly Express ordena las trazas y asigna los colores por orden de aparición; la plantilla
+    # los fija por código de sexo (ver test_sex_stack_fixed_colors)
+    expected['data'].sort(key=lambda trace: SEX_NAMES.tolist().index(trace['name']))
+    for trace in result['data'] + expected['data']:
+        del trace['marker']['color']
+    assert result == expected
+
+
+def test_sex_stack_fixed_colors():
+    # El color de cada sexo no depende de qué sexos tenga la selección
+    colors = [trace.marker.color for trace in figures.sex_stack().data]
+    assert len(set(colors)) == len(figures.SEX_CODES)
+    assert [trace.name for trace in figures.sex_stack().data] == SEX_NAMES[list(figures.SEX_CODES)].tolist()
@@ -0,0 +1,105 @@
+import gc
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mortality.filters import ALL, FilterEngine, canonical, normalize
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'NOM_DPTO': ['ANTIOQUIA', 'ANTIOQUIA', 'CALDAS', 'CAUCA', 'CALDAS', 'ANTIOQUIA', 'CAUCA', 'CALDAS', 'CAUCA'],
+        'SEXO': [1, 2, 1, 2, 2, 1, 1, 3, 2],
+        'GRUPO_EDAD1': [25, 25, 26, 10, 25, 26, 26, 10, 25],
+    })
+
+
+def expected(frame, departamento=ALL, sexo=ALL, edad=ALL):
+    mask = np.ones(len(frame), dtype=bool)
+    for column, values in (('NOM_DPTO', departamento), ('SEXO', sexo), ('GRUPO_EDAD1', edad)):
+        if values != ALL:
+            mask &= frame[column].astype(str).isin([str(v) for v in values]).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def test_normalize():
+    assert normalize(None) == ALL
+    assert normalize([]) == ALL
+    assert normalize(['1', ALL]) == ALL
+    assert normalize(25) == ('25',)
+    assert normalize([2, '1', 1]) == ('1', '2')
+    assert canonical(['CAUCA']) == 'CAUCA'
+    assert canonical(['CAUCA', 'CALDAS']) == ['CALDAS', 'CAUCA']
+
+
+def test_no_filters_returns_none(frame):
+    engine = FilterEngine(frame)
+    assert engine.rows() is None
+    assert engine.rows([], ALL, None) is None
+    assert engine.mask().all()
+
+
+@pytest.mark.parametrize('departamento, sexo, edad', [
+    ('CALDAS', ALL, ALL),
+    (['ANTIOQUIA', 'CAUCA'], ALL, ALL),
+    (ALL, ['1', '3'], ALL),
+    (['ANTIOQUIA', 'CALDAS'], '2', [25, 10]),
+    (['CAUCA'], ['1', '2'], ['26', '25']),
+    (['ANTIOQUIA', 'CALDAS', 'CAUCA'], ['1', '2', '3'], [10, 25, 26]),
+])
+def test_or_within_and_between_dimensions(frame, departamento, sexo, edad):
+    engine = FilterEngine(frame)
+    wanted = expected(frame, normalize(departamento), normalize(sexo), normalize(edad))
+
+    np.testing.assert_array_equal(engine.rows(departamento, sexo, edad), wanted)
+    np.testing.assert_array_equal(np.flatnonzero(engine.mask(departamento, sexo, edad)), wanted)
+
+
+def test_unknown_values(frame):
+    engine = FilterEngine(frame)
+    assert len(engine.rows('NOPE')) == 0
+    # Un valor desconocido en una lista no anula los demás
+    np.testing.assert_array_equal(engine.rows(['NOPE', 'CALDAS']), expected(frame, ('CALDAS',)))
+
+
+def test_selection_order_shares_cache(frame):
+    engine = FilterEngine(frame)
+    first = engine.rows(['CAUCA', 'ANTIOQUIA'], ['2', '1'])
+    assert engine.rows(['ANTIOQUIA', 'CAUCA'], ['1', '2']) is first
+
+
+def test_stored_bitmaps_not_modified(frame):
+    engine = FilterEngine(frame)
+    before = {name: {key: bits.copy() for key, bits in bitmaps.items()} for name, bitmaps in engine._bitmaps.items()}
+    engine.rows(['ANTIOQUIA', 'CALDAS', 'CAUCA'], ['1', '2'], [25, 26])
+    engine.rows('CALDAS', ALL, [25])
+    for name, bitmaps in engine._bitmaps.items():
+        for key, bits in bitmaps.items():
+            np.testing.assert_array_equal(bits, before[name][key])
+
+
+def test_engine_does_not_keep_frame(frame):
+    # El motor solo guarda los bitmaps: el DataFrame puede liberarse
+    df = frame.copy()
+    ref = weakref.ref(df)
+    engine = FilterEngine(df)
+    del df
+    gc.collect()
+    assert ref() is None
+    assert engine.rows('CALDAS').tolist() == [2, 4, 7]
+
+
+def test_cube_filters_match_records(dataset, records):
+    # Conteos del cubo con varios valores por dimensión frente a los registros
+    cube = dataset.cube
+    departments = list(cube.labels['NOM_DPTO'][:2])
+    mask = cube.filters.mask(departments, ['1'], [11, 12, 13])
+    total = int(cube.counts[mask].sum())
+
+    names = dataset.geography.municipality_departments(records['COD_DPTO'], records['COD_MUNIC'])
+    wanted = (pd.Series(names).isin(departments).to_numpy() & (records['SEXO'] == 1).to_numpy()
+              & records['GRUPO_EDAD1'].isin([11, 12, 13]).to_numpy())
+    assert total == int(wanted.sum())
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from mortality import config, geometry
+
+
+def square(x, y, size=1.0, steps=20):
+    # Cuadrado con puntos intermedios colineales en cada lado
+    side = [i * size / steps for i in range(steps)]
+    ring = ([[x + d, y] for d in side] + [[x + size, y + d] for d in side]
+            + [[x + size - d, y + size] for d in side] + [[x, y + size - d] for d in side])
+    return {'type': 'Polygon', 'coordinates': [ring + [ring[0]]]}
+
+
+@pytest.fixture
+def geo_dir(tmp_path, monkeypatch):
+    layers = {
+        'departamentos': [{'type': 'Feature', 'properties': {'DPTO_CCDGO': '05'}, 'geometry': square(-76, 6)}],
+        'municipios': [{'type': 'Feature', 'properties': {'MPIO_CDPMP': '05001'}, 'geometry': square(-75.6, 6.2, 0.1)},
+                       {'type': 'Feature', 'properties': {'NOMBRE': 'sin código'}, 'geometry': square(-75, 6)}],
+    }
+    for level, features in layers.items():
+        path = tmp_path / f'{level}.geojson'
+        path.write_text(json.dumps({'type': 'FeatureCollection', 'features': features}), encoding='utf-8')
+    monkeypatch.setattr(config, 'DEPARTMENTS_GEOJSON', str(tmp_path / 'departamentos.geojson'))
+    monkeypatch.setattr(config, 'MUNICIPALITIES_GEOJSON', str(tmp_path / 'municipios.geojson'))
+    return tmp_path
+
+
+def test_simplified_layers_keep_divipola_ids(geo_dir):
+    assert geometry.build(str(geo_dir / 'cache')) == []
+
+    departments = geometry.load_geometry('departamentos', 'baja', str(geo_dir / 'cache'))
+    assert [feature['id'] for feature in departments['features']] == [5]
+    # Los puntos colineales se eliminan: quedan las cuatro esquinas más el cierre
+    assert len(departments['features'][0]['geometry']['coordinates'][0]) == 5
+    municipalities = geometry.load_geometry('municipios', 'alta', str(geo_dir / 'cache'))
+    assert [feature['id'] for feature in municipalities['features']] == [5001]
+
+
+def test_build_fails_without_geojson(geo_dir):
+    (geo_dir / 'municipios.geojson').unlink()
+
+    assert geometry.build(str(geo_dir / 'cache')) == [f"{config.MUNICIPALITIES_GEOJSON}: no existe"]
+    assert geometry.build(str(geo_dir / 'cache'), allow_missing=True) == []
+    assert geometry.main([str(geo_dir / 'cache')]) == 1
+
+
+def test_build_fails_without_divipola_codes(geo_dir):
+    (geo_dir / 'departamentos.geojson').write_text(
+        json.dumps({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {}, 'geometry': square(-76, 6)}]}), encoding='utf-8')
+
+    problems = geometry.build(str(geo_dir / 'cache'))
+    assert problems == [f"{config.DEPARTMENTS_GEOJSON}: ningún polígono con código DIVIPOLA"]
@@ -0,0 +1,101 @@
+import openpyxl
+import pandas as pd
+import pytest
+from openpyxl.styles import PatternFill
+
+from mortality.ingest import read_table, sniff_text
+
+# Celda con formato pero sin valor: openpyxl la guarda y declara la hoja más grande
+FILL = PatternFill('solid', fgColor='FFFF00')
+
+
+def write_xlsx(path, rows, styled=()):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    for row in rows:
+        sheet.append(list(row))
+    for row, column in styled:
+        sheet.cell(row=row, column=column).fill = FILL
+    workbook.save(path)
+    return str(path)
+
+
+def write_text(path, text, encoding='utf-8'):
+    with open(path, 'w', encoding=encoding, newline='') as fh:
+        fh.write(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('name, text, encoding, sep', [
+    ('punto_y_coma.csv', 'COD_DPTO;NOM_DPTO;VALOR\n05;ANTIOQUIA;1,5\n11;BOGOTÁ, D.C.;2\n91;AMAZONAS;\n',
+     'utf-8', ';'),
+    ('latin1.csv', 'COD_DPTO;NOM_DPTO\n05;ANTIOQUIA\n18;CAQUETÁ\n94;GUAINÍA\n', 'latin-1', ';'),
+    ('tabulador.txt', 'A\tB\tC\n1\tx\t\n2\ty\t3.5\n3\tz\t4\n', 'utf-8', '\t'),
+    ('coma.csv', 'A,B\n1,"uno, dos"\n2,tres\n', 'utf-8', ','),
+])
+def test_text_sniffing(tmp_path, name, text, encoding, sep):
+    path = write_text(tmp_path / name, text, encoding)
+
+    assert sniff_text(path)[1] == sep
+    expected = pd.read_csv(path, sep=sep, encoding='latin-1' if encoding == 'latin-1' else 'utf-8')
+    pd.testing.assert_frame_equal(read_table(path, batch_size=2), expected)
+
+
+def test_text_number_then_text_across_batches(tmp_path):
+    # El primer bloque de A es numérico y el último trae texto; B es texto numérico con ceros a la izquierda
+    text = 'A,B,C\n' + ''.join(f'{i},0500{i},{i}.5\n' for i in range(5)) + 'x,05001,\n'
+    path = write_text(tmp_path / 'mixto.csv', text)
+
+    result = read_table(path, batch_size=2)
+    pd.testing.assert_frame_equal(result, pd.read_csv(path))
+    assert result['A'].tolist() == ['0', '1', '2', '3', '4', 'x']
+
+
+def test_text_trailing_empty_rows_and_columns(tmp_path):
+    path = write_text(tmp_path / 'vacios.csv', 'A,B,\n1,2,\n3,,\n\n\n')
+
+    pd.testing.assert_frame_equal(read_table(path, batch_size=1), pd.read_csv(path))
+
+
+def test_text_duplicate_and_empty_headers(tmp_path):
+    path = write_text(tmp_path / 'encabezados.csv', 'A,A,,B,A.1,\n1,2,3,4,5,6\n7,8,9,10,11,\n')
+
+    result = read_table(path)
+    pd.testing.assert_frame_equal(result, pd.read_csv(path))
+    assert list(result.columns) == ['A', 'A.2', 'Unnamed: 2', 'B', 'A.1', 'Unnamed: 5']
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 100])
+def test_xlsx_number_then_text_across_batches(tmp_path, batch_size):
+    rows = [('A', 'B', 'C')] + [(i, i * 1.5, '0500' + str(i)) for i in range(5)]
+    rows += [('texto', 2, None), (7, None, 'y'), (8, 1, '05001')]
+    path = write_xlsx(tmp_path / 'mixto.xlsx', rows)
+
+    pd.testing.assert_frame_equal(read_table(path, batch_size=batch_size), pd.read_excel(path))
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 100])
+def test_xlsx_trailing_empty_rows_and_columns(tmp_path, batch_size):
+    rows = [('A', 'B', None), (1, 2, None), (3, None, None), (None, None, None), (5, 6, None)]
+    path = write_xlsx(tmp_path / 'vacios.xlsx', rows, styled=[(9, 1), (1, 5), (3, 4)])
+
+    result = read_table(path, batch_size=batch_size)
+    pd.testing.assert_frame_equal(result, pd.read_excel(path))
+    assert result.shape == (4, 2)
+
+
+def test_xlsx_duplicate_and_empty_headers(tmp_path):
+    rows = [('A', 'A', None, 'B', 'A.1', None, 'A'), (1, 2, 3, 4, 5, 6, 7), (1, 2, 3, 4, 5, None, 7)]
+    path = write_xlsx(tmp_path / 'encabezados.xlsx', rows)
+
+    result = read_table(path, batch_size=1)
+    pd.testing.assert_frame_equal(result, pd.read_excel(path))
+    assert list(result.columns) == ['A', 'A.2', 'Unnamed: 2', 'B', 'A.1', 'Unnamed: 5', 'A.3']
+
+
+def test_xlsx_cells_right_of_header(tmp_path):
+    # Valores en columnas sin encabezado a partir de un lote posterior
+    rows = [('A',), (1,), (2,), (3, None, 'x')]
+    path = write_xlsx(tmp_path / 'derecha.xlsx', rows)
+
+    pd.testing.assert_frame_equal(read_table(path, batch_size=2), pd.read_excel(path))
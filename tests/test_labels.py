@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from mortality.labels import AGE_GROUPS, age_group_index, count_by_age_group, month_names, sex_names
+
+MESES = ['Enero', 'Febrero', 'Marzo', 'Abril', 'Mayo', 'Junio',
+         'Julio', 'Agosto', 'Septiembre', 'Octubre', 'Noviembre', 'Diciembre']
+
+# Grupos de edad de GRUPO_EDAD1 según las especificaciones del DANE (el diccionario del callback anterior)
+GRUPOS_EDAD = {
+    **dict.fromkeys(range(0, 5), 'Mortalidad neonatal'),
+    **dict.fromkeys(range(5, 7), 'Mortalidad infantil'),
+    **dict.fromkeys(range(7, 9), 'Primera infancia'),
+    **dict.fromkeys(range(9, 11), 'Niñez'),
+    11: 'Adolescencia',
+    **dict.fromkeys(range(12, 14), 'Juventud'),
+    **dict.fromkeys(range(14, 17), 'Adultez temprana'),
+    **dict.fromkeys(range(17, 20), 'Adultez intermedia'),
+    **dict.fromkeys(range(20, 25), 'Vejez'),
+    **dict.fromkeys(range(25, 29), 'Longevidad / Centenarios'),
+    29: 'Edad desconocida',
+}
+
+
+def test_month_names():
+    months = pd.Series([1, 12, 6, 0, 13, -1])
+    expected = months.apply(lambda x: MESES[x - 1] if 1 <= x <= 12 else 'Desconocido')
+
+    assert month_names(months).tolist() == expected.tolist()
+    # Mes faltante o no entero (columnas float32 del esquema compacto)
+    assert month_names(np.array([3.0, np.nan, 2.5], dtype=np.float32)).tolist() == ['Marzo', 'Desconocido',
+                                                                                     'Desconocido']
+
+
+def test_sex_names():
+    sexes = pd.Series([1, 2, 3, 0, 4, 2], dtype=np.int8)
+    expected = sexes.map({1: 'Masculino', 2: 'Femenino', 3: 'Indeterminado'})
+
+    pd.testing.assert_series_equal(pd.Series(sex_names(sexes)), expected.astype(object), check_names=False)
+
+
+def test_age_group_index():
+    codes = np.arange(-1, 32)
+    index = age_group_index(codes)
+
+    assert [AGE_GROUPS[i] if i >= 0 else None for i in index] == [GRUPOS_EDAD.get(code) for code in codes]
+    assert age_group_index(np.array([np.nan, 4.5, 29.0])).tolist() == [-1, -1, 10]
+
+
+def test_count_by_age_group(records):
+    codes = records['GRUPO_EDAD1']
+    expected = codes.map(GRUPOS_EDAD).value_counts().reindex(AGE_GROUPS, fill_value=0)
+
+    counts = codes.value_counts()
+    result = count_by_age_group(counts.index.to_numpy(), counts.to_numpy())
+    assert result.dtype == np.int64
+    assert result.tolist() == expected.tolist()
+    # Los códigos sin grupo no se cuentan
+    assert count_by_age_group([30, 5, -2], [7, 2, 1]).tolist() == [0, 2] + [0] * (len(AGE_GROUPS) - 2)
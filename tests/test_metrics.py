@@ -0,0 +1,30 @@
+import gzip
+import json
+
+import flask
+
+from mortality import metrics, responses
+
+
+def test_payload_measured_before_compression():
+    server = flask.Flask(__name__)
+    body = json.dumps({'x': list(range(2000))})
+
+    @server.route('/_dash-update-component', methods=['POST'])
+    @metrics.instrument(name='prueba_compresion')
+    def update():
+        return flask.Response(body, mimetype='application/json')
+
+    # Mismo orden que app.py: la medición se instala después de la compresión
+    responses.install(server, version=lambda: None)
+    metrics.install(server)
+
+    response = server.test_client().post('/_dash-update-component', json={},
+                                         headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(response.data).decode() == body
+
+    payload = metrics.REGISTRY.payload['prueba_compresion']
+    assert payload.count == 1
+    assert payload.sum == len(body.encode())
+    assert ('prueba_compresion', 'serialize') in metrics.REGISTRY.latency
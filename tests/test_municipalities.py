@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from mortality.filters import ALL
+from mortality.municipalities import MunicipalityIndex, municipality_keys, municipality_value, search_words
+
+
+@pytest.fixture(scope='module')
+def index(reference):
+    return reference.municipality_index
+
+
+def names(index, ids):
+    return index.names[ids].tolist()
+
+
+def test_values_and_keys():
+    assert municipality_value(5001) == '05001'
+    assert municipality_value('76736') == '76736'
+    assert municipality_keys(None) == ALL
+    assert municipality_keys(['76736', '05001', 'x', '05001']).tolist() == [5001, 76736]
+    assert search_words('Bogotá, D.C.') == ['BOGOTA', 'D', 'C']
+
+
+def test_index_sorted_by_name(index):
+    assert len(index) == 8
+    assert names(index, np.arange(len(index))) == [
+        'ABEJORRAL', 'BOGOTÁ, D.C.', 'CALI', 'FLORENCIA', 'MEDELLÍN', 'SAN VICENTE DEL CAGUÁN',
+        'SAN VICENTE FERRER', 'SEVILLA']
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('san vic', ['SAN VICENTE DEL CAGUÁN', 'SAN VICENTE FERRER']),
+    ('vic san', ['SAN VICENTE DEL CAGUÁN', 'SAN VICENTE FERRER']),
+    ('  S  ', ['SAN VICENTE DEL CAGUÁN', 'SAN VICENTE FERRER', 'SEVILLA']),
+    ('bogota', ['BOGOTÁ, D.C.']),
+    ('medellin', ['MEDELLÍN']),
+    ('caguan', ['SAN VICENTE DEL CAGUÁN']),
+    ('san cali', []),
+    ('zzz', []),
+])
+def test_search(index, text, expected):
+    assert names(index, index.search(text)) == expected
+
+
+def test_search_scope(index):
+    assert names(index, index.search('san', 'CAQUETÁ')) == ['SAN VICENTE DEL CAGUÁN']
+    assert names(index, index.search('s', ['ANTIOQUIA', 'VALLE DEL CAUCA'])) == ['SAN VICENTE FERRER', 'SEVILLA']
+    assert names(index, index.search('s', ['ANTIOQUIA', ALL])) == names(index, index.search('s'))
+
+
+def test_search_without_text(index):
+    # Sin departamento no se listan municipios; con departamento, en el mismo orden que con texto
+    assert index.search('').tolist() == []
+    assert index.search(None, ALL).tolist() == []
+    assert names(index, index.search('', 'ANTIOQUIA')) == ['ABEJORRAL', 'MEDELLÍN', 'SAN VICENTE FERRER']
+    assert names(index, index.search('', 'ANTIOQUIA', limit=2)) == ['ABEJORRAL', 'MEDELLÍN']
+    assert names(index, index.search('', ['ANTIOQUIA', 'VALLE DEL CAUCA'], limit=4)) == [
+        'ABEJORRAL', 'CALI', 'MEDELLÍN', 'SAN VICENTE FERRER']
+
+
+def test_search_limit(index):
+    assert names(index, index.search('s', limit=2)) == ['SAN VICENTE DEL CAGUÁN', 'SAN VICENTE FERRER']
+
+
+def test_lookup_and_options(index):
+    ids = index.lookup(['76736', '05674', '99999', 'otro'])
+
+    assert names(index, ids) == ['SAN VICENTE FERRER', 'SEVILLA']
+    assert index.lookup(ALL).tolist() == []
+    assert index.options(ids) == [
+        {'label': '🏘️ SAN VICENTE FERRER (ANTIOQUIA)', 'value': '05674', 'search': 'SAN VICENTE FERRER'},
+        {'label': '🏘️ SEVILLA (VALLE DEL CAUCA)', 'value': '76736', 'search': 'SEVILLA'},
+    ]
+
+
+def test_same_name_in_two_departments():
+    index = MunicipalityIndex([25001, 5001, 68001], ['ARMENIA', 'ARMENIA', 'BUCARAMANGA'],
+                              ['QUINDÍO', 'ANTIOQUIA', 'SANTANDER'])
+
+    # A igual nombre, por departamento
+    assert index.options(index.search('armenia')) == [
+        {'label': '🏘️ ARMENIA (ANTIOQUIA)', 'value': '05001', 'search': 'ARMENIA'},
+        {'label': '🏘️ ARMENIA (QUINDÍO)', 'value': '25001', 'search': 'ARMENIA'},
+    ]
+    assert index.lookup(['25001']).tolist() == [1]
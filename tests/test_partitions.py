@@ -0,0 +1,104 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from mortality.partitions import YearPartitions, discover_years
+
+YEARS = (2016, 2017, 2018, 2019)
+
+
+@pytest.fixture
+def files(tmp_path):
+    files = {}
+    for year in YEARS:
+        path = tmp_path / f'Anexo1.NoFetal{year}_CE.xlsx'
+        path.write_bytes(str(year).encode())
+        files[year] = str(path)
+    return files
+
+
+def make(files, max_partitions=2, default_year=None, delay=0):
+    loads = []
+
+    def loader(path, reference, year):
+        loads.append(year)
+        time.sleep(delay)
+        return SimpleNamespace(year=year, path=path)
+
+    partitions = YearPartitions(files, SimpleNamespace(files=[]), max_partitions=max_partitions,
+                                default_year=default_year, loader=loader)
+    return partitions, loads
+
+
+def test_discover_years(tmp_path):
+    for name in ('Anexo1.NoFetal2019_CE_15-03-23.xlsx', 'Anexo1.NoFetal2018_CE.xlsx', 'nofetal_2020.csv',
+                 'nofetal2017.pdf', 'Anexo2.CodigosDeMuerte.xlsx'):
+        (tmp_path / name).write_bytes(b'')
+    years = discover_years(str(tmp_path), pattern='*')
+
+    assert list(years) == [2018, 2019, 2020]
+    assert years[2020].endswith('nofetal_2020.csv')
+
+
+def test_resolve(files):
+    partitions, _ = make(files, default_year=2018)
+
+    assert partitions.years == list(YEARS)
+    assert partitions.resolve('2017') == 2017
+    assert partitions.resolve(2019) == 2019
+    for value in (None, '', 'todos', 1999, '2030'):
+        assert partitions.resolve(value) == 2018
+    assert make(files)[0].default_year == 2019
+
+
+def test_lru_eviction_order(files):
+    partitions, loads = make(files, max_partitions=3, default_year=2019)
+    for year in (2019, 2016, 2017):
+        partitions.get(year)
+    # 2016 pasa a ser el más reciente: el próximo en salir es 2017
+    partitions.get(2016)
+    partitions.get(2018)
+
+    assert partitions.loaded() == [2019, 2016, 2018]
+    assert partitions.evictions == 1
+    partitions.get(2017)
+    assert partitions.loaded() == [2019, 2018, 2017]
+    assert loads == [2019, 2016, 2017, 2018, 2017]
+    assert partitions.get(2018).year == 2018
+    assert partitions.loads == 5
+
+
+def test_default_year_never_evicted(files):
+    partitions, loads = make(files, max_partitions=1, default_year=2017)
+    partitions.get()
+    for year in YEARS + YEARS:
+        assert partitions.get(year).year == year
+        assert 2017 in partitions.loaded()
+        assert len(partitions.loaded()) <= 2
+
+    # Con un solo cupo, el año por defecto no se vuelve a cargar
+    assert loads.count(2017) == 1
+    assert partitions.loaded() == [2017]
+    assert partitions.stats()['evictions'] == 6
+
+
+def test_concurrent_get_loads_once(files):
+    partitions, loads = make(files, delay=0.05)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(partitions.get(2016))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert loads == [2016]
+    assert len({id(dataset) for dataset in results}) == 1
+
+
+def test_invalid_configuration(files):
+    with pytest.raises(FileNotFoundError):
+        make({})
+    with pytest.raises(KeyError):
+        make(files, default_year=1999)
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from mortality.cube import CountCube
+from mortality.prefixes import CAUSE_FAMILIES, CausePrefixIndex
+
+CODES = ['A099', 'V010', 'V89', 'V899', 'V90', 'X600', 'X849', 'X850', 'X95', 'X950', 'X954', 'X959', 'X96',
+         'Y09', 'Y090', 'Y10', ' x951 ', None]
+
+
+@pytest.fixture(scope='module')
+def cube():
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame({
+        'SEXO': rng.integers(1, 4, 3000),
+        'CAUSA_DEFUNCION': np.array(CODES, dtype=object)[rng.integers(0, len(CODES), 3000)],
+    })
+    return CountCube.from_frame(frame, dimensions=('SEXO', 'CAUSA_DEFUNCION'))
+
+
+@pytest.fixture(scope='module')
+def index(cube):
+    return CausePrefixIndex.from_cube(cube)
+
+
+def naive(cube, *ranges):
+    # Recorre los códigos de cada celda como texto, como el str.startswith anterior
+    labels = pd.Series(cube.cell_labels('CAUSA_DEFUNCION'))
+    codes = labels.fillna('').astype(str).str.strip().str.upper()
+    mask = np.zeros(len(cube), dtype=bool)
+    for item in ranges:
+        first, last = (item, item) if isinstance(item, str) else item
+        first, last = first.strip().upper(), last.strip().upper()
+        mask |= ((codes >= first) & ((codes < last) | codes.str.startswith(last))).to_numpy()
+    # Las celdas sin código no pertenecen a ninguna familia
+    return mask & labels.notna().to_numpy()
+
+
+@pytest.mark.parametrize('ranges', [
+    ('X95',), ('X9',), ('x95 ',), ('Y',), ('X950',), ('Z',), ('',),
+    (('X85', 'Y09'),), (('V01', 'V89'),), (('X60', 'X84'),), ('A', ('X95', 'X96')),
+])
+def test_mask_matches_startswith(cube, index, ranges):
+    np.testing.assert_array_equal(index.mask(*ranges), naive(cube, *ranges))
+
+
+@pytest.mark.parametrize('name', sorted(CAUSE_FAMILIES))
+def test_families(cube, index, name):
+    np.testing.assert_array_equal(index.family(name), naive(cube, *CAUSE_FAMILIES[name]))
+
+
+def test_csr_layout(cube, index):
+    assert index.codes.tolist() == sorted(index.codes.tolist())
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(index.order)
+    assert np.all(np.diff(index.offsets) >= 0)
+    # Cada celda con código aparece una sola vez, en el tramo de su código
+    assert sorted(index.order.tolist()) == np.flatnonzero(cube.codes['CAUSA_DEFUNCION'] >= 0).tolist()
+    labels = pd.Series(cube.cell_labels('CAUSA_DEFUNCION')).astype(str).str.strip().str.upper().to_numpy()
+    for i, code in enumerate(index.codes):
+        assert set(labels[index.order[index.offsets[i]:index.offsets[i + 1]]]) == {code}
+
+
+def test_cells_sorted_and_empty(index):
+    cells = index.cells('X95', ('X85', 'Y09'))
+    assert np.all(np.diff(cells) > 0)
+    assert len(index.cells()) == 0
+    assert not index.mask().any()
+
+
+def test_dataset_homicides(dataset, records):
+    # Conteo de homicidios del cubo frente a los registros
+    total = int(dataset.cube.counts[dataset.homicide_cells].sum())
+    assert total == int(records['CAUSA_DEFUNCION'].str.startswith('X95').sum())
@@ -0,0 +1,60 @@
+import json
+import os
+import sqlite3
+
+import plotly.graph_objects as go
+import pytest
+from plotly.io.json import to_json_plotly
+
+from mortality.prerender import encode_outputs, open_store, prerender_key, write_store
+
+OUTPUTS = [go.Figure(go.Bar(x=['1', '2'], y=[3, 4])), '1,234', 'ANTIOQUIA']
+
+
+def write(path, version='v1'):
+    # Dos lotes, como llegan del pool de procesos
+    return write_store(str(path), version, [
+        [(prerender_key('all', 'all', 'all', 2019), encode_outputs(OUTPUTS))],
+        [(prerender_key('ANTIOQUIA', 1, 25, 2019), encode_outputs(OUTPUTS[1:]))],
+    ])
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'prerender.sqlite'
+    assert write(path) == 2
+    assert not os.path.exists(str(path) + '.tmp')
+
+    store = open_store(str(path), 'v1')
+    assert len(store) == 2
+    assert store.get('all', 'all', 'all', 2019) == json.loads(to_json_plotly(OUTPUTS))
+    # Los filtros numéricos y de texto comparten la clave
+    assert store.get('ANTIOQUIA', '1', '25', '2019') == ['1,234', 'ANTIOQUIA']
+    assert store.get('CALDAS', 'all', 'all', 2019) is None
+
+
+def test_version_invalidates(tmp_path):
+    path = tmp_path / 'prerender.sqlite'
+    write(path, version='v1')
+
+    assert open_store(str(path), 'v2') is None
+    write(path, version='v2')
+    assert open_store(str(path), 'v2').get('all', 'all', 'all', 2019) is not None
+
+
+def test_missing_or_invalid_store(tmp_path):
+    assert open_store('', 'v1') is None
+    assert open_store(str(tmp_path / 'no-existe.sqlite'), 'v1') is None
+
+    path = tmp_path / 'otro.sqlite'
+    sqlite3.connect(str(path)).close()
+    assert open_store(str(path), 'v1') is None
+
+
+def test_store_is_read_only(tmp_path):
+    path = tmp_path / 'prerender.sqlite'
+    write(path)
+    store = open_store(str(path), 'v1')
+
+    with pytest.raises(sqlite3.OperationalError):
+        store._connect().execute('DELETE FROM outputs')
+    assert len(store) == 2
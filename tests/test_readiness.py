@@ -0,0 +1,61 @@
+import threading
+
+import flask
+import pytest
+
+from mortality import readiness
+
+
+def make_server(target, guarded=('/data/',)):
+    server = flask.Flask(__name__)
+
+    @server.route('/data/years')
+    def years():
+        return {'years': [2019]}
+
+    @server.route('/')
+    def index():
+        return 'cargando'
+
+    loader = readiness.DataLoader(target)
+    readiness.install(server, loader, guarded=guarded)
+    return server.test_client(), loader
+
+
+def test_readyz_before_and_after_load():
+    release = threading.Event()
+    client, loader = make_server(lambda: release.wait(5))
+    assert client.get('/readyz').status_code == 503
+
+    loader.start()
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'cargando'
+    # Las rutas protegidas esperan a los datos; el resto y /healthz responden siempre
+    assert client.get('/data/years').status_code == 503
+    assert client.get('/').status_code == 200
+    assert client.get('/healthz').status_code == 200
+
+    release.set()
+    assert loader.wait(5)
+    response = client.get('/readyz')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'listo'
+    assert client.get('/data/years').get_json() == {'years': [2019]}
+
+
+def test_readyz_after_failed_load():
+    def fail():
+        raise OSError('sin anexos')
+
+    client, loader = make_server(fail)
+    with pytest.raises(OSError):
+        loader.run()
+
+    response = client.get('/readyz')
+    assert response.status_code == 503
+    assert response.get_json()['status'] == 'error'
+    assert response.get_json()['error'] == 'OSError: sin anexos'
+    assert client.get('/data/years').status_code == 503
+    with pytest.raises(RuntimeError):
+        loader.wait(0)
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from mortality.result_cache import ResultCache, SQLiteBackend, make_key
+
+
+def test_sqlite_backend_lru(tmp_path):
+    backend = SQLiteBackend(str(tmp_path / 'results.sqlite'), max_entries=2)
+    for key in ('a', 'b', 'c'):
+        backend.set(key, f'"{key}"')
+    assert len(backend) == 2
+    assert backend.get('a') is None
+    assert backend.get('c') == '"c"'
+
+
+def test_sqlite_backend_keeps_no_connection_open(tmp_path):
+    # Con preload_app el maestro crea la caché: no debe quedar una conexión que heredar
+    backend = SQLiteBackend(str(tmp_path / 'results.sqlite'))
+    assert getattr(backend._local, 'conn', None) is None
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason='requiere fork')
+def test_sqlite_cache_shared_after_fork(tmp_path):
+    cache = ResultCache(SQLiteBackend(str(tmp_path / 'results.sqlite')))
+    key = make_key('dashboard', 'all', '1', 25, 'v1')
+    pid = os.fork()
+    if pid == 0:
+        status = 0
+        try:
+            cache.get_or_compute(key, lambda: {'total': 7})
+        except BaseException:
+            status = 1
+        finally:
+            os._exit(status)
+    _, status = os.waitpid(pid, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert cache.get_or_compute(key, lambda: {'total': 0}) == {'total': 7}
+    assert cache.stats()['hits'] == 1
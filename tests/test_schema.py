@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from mortality.cache import read_frame, write_frame
+from mortality.schema import (CATEGORY_ALLOWANCE, MAX_BYTES_PER_ROW, USED_COLUMNS, compact_mortality,
+                              memory_ceiling, memory_report)
+
+ROWS = 200_000
+
+
+def test_compact_frame_under_memory_ceiling(make_records):
+    df = make_records(ROWS, seed=2)
+    compact = compact_mortality(df)
+
+    report = memory_report(df, compact)
+    assert report.loc['TOTAL', 'despues'] <= MAX_BYTES_PER_ROW * ROWS + CATEGORY_ALLOWANCE
+    assert memory_ceiling(ROWS) == MAX_BYTES_PER_ROW * ROWS + CATEGORY_ALLOWANCE
+    assert list(compact.columns) == [col for col in USED_COLUMNS if col in df.columns]
+    assert isinstance(compact['CAUSA_DEFUNCION'].dtype, pd.CategoricalDtype)
+
+
+def test_compact_frame_keeps_values(records):
+    compact = compact_mortality(records)
+
+    for col in compact.columns:
+        np.testing.assert_array_equal(compact[col].to_numpy(dtype=object), records[col].to_numpy(dtype=object))
+
+
+def test_cached_frame_under_memory_ceiling(make_records, tmp_path):
+    df = make_records(ROWS, seed=2)
+    write_frame(df, str(tmp_path / 'anexo1'))
+    cached = read_frame(str(tmp_path / 'anexo1'))
+
+    # Las columnas de texto vuelven como categorías sobre los códigos mapeados
+    assert isinstance(cached['CAUSA_DEFUNCION'].dtype, pd.CategoricalDtype)
+    compact = compact_mortality(cached)
+    assert memory_report(cached, compact).loc['TOTAL', 'despues'] <= memory_ceiling(ROWS)
+    expected = compact_mortality(df)
+    assert compact.dtypes.equals(expected.dtypes)
+    pd.testing.assert_frame_equal(compact.astype(object), expected.astype(object))
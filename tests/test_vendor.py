@@ -0,0 +1,20 @@
+import os
+
+from mortality import vendor
+
+
+def test_stylesheets_are_vendored():
+    assert vendor.missing() == []
+    assert vendor.stylesheets() == []
+    assert vendor.main(['--check']) == 0
+
+
+def test_vendored_references_exist():
+    for directory, url, path in vendor.STYLESHEETS:
+        with open(vendor.local_path(directory, path), encoding='utf-8') as fh:
+            css = fh.read()
+        for reference in vendor._URL.findall(css):
+            if reference.startswith('data:'):
+                continue
+            relative = os.path.normpath(os.path.join(os.path.dirname(path), reference.split('?')[0].split('#')[0]))
+            assert os.path.exists(vendor.local_path(directory, relative.replace(os.sep, '/'))), reference